@@ -1,6 +1,10 @@
 from top.parser import Parser
+from top.t1250reader import T1250Reader
 from top.stopparser import StopParser
+from top.tcdindex import TcdIndex
 from top.adpparser import AdpParser
+from top.commsspool import (CommsSpool,
+                            SqliteCommsSpool)
 from top.service import Service
 from top.loader import Loader
 from top.reporter import Reporter
@@ -18,7 +22,8 @@ from top.filterdaemon import FilterDaemon
 from top.reporterdaemon import ReporterDaemon
 from top.adpdaemon import AdpDaemon
 from top.podtranslatordaemon import PodTranslatorDaemon
-from top.rest import Rest
+from top.rest import (Rest,
+                      HttpConnectionPool)
 from top.restemailer import RestEmailer
 from top.restsmser import RestSmser
 from top.exporter import Exporter
@@ -40,6 +45,8 @@ from top.ondelivery import OnDelivery
 from top.adp import Adp
 from top.init import Init
 from top.comms import Comms
+from top.commsdispatcher import CommsDispatcher
+from top.commsscheduler import CommsScheduler
 from top.based import BaseD
 from top.mapper import Mapper
 from top.filter import Filter
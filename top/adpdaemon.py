@@ -3,12 +3,12 @@ __all__ = [
 ]
 import signal
 import os
-import time
 
 import top
 from top.utils.log import log
 from top.utils.files import (get_directory_files_list,
                              move_file,
+                             touch_file,
                              xlsx_to_csv_converter)
 from top.utils.setter import (set_scalar,
                               set_list)
@@ -46,6 +46,11 @@ class AdpDaemon(top.DaemonService):
         mode of operation to apply to database.  Defaults to "insert"
         but can also perform an "update"
 
+    .. attribute:: agent_stamp
+
+        file to touch after ``agent`` table changes are committed so
+        that the loader can invalidate its agent lookup cache
+
     """
     _adp = None
     _parser = top.AdpParser()
@@ -54,6 +59,7 @@ class AdpDaemon(top.DaemonService):
     _archive_dir = None
     _code_header = 'TP Code'
     _mode = 'insert'
+    _agent_stamp = None
 
     @property
     def adp(self):
@@ -103,6 +109,14 @@ class AdpDaemon(top.DaemonService):
     def set_mode(self, value):
         pass
 
+    @property
+    def agent_stamp(self):
+        return self._agent_stamp
+
+    @set_scalar
+    def set_agent_stamp(self, value):
+        pass
+
     @property
     def adp_kwargs(self):
         kwargs = {}
@@ -151,6 +165,7 @@ class AdpDaemon(top.DaemonService):
             self.set_archive_dir(self.config.archive_dir)
             self.set_adp_file_formats(self.config.adp_file_formats)
             self.set_code_header(self.config.code_header)
+            self.set_agent_stamp(self.config.agent_stamp)
 
     def _start(self, event):
         """Override the :method:`top.utils.Daemon._start` method.
@@ -209,6 +224,10 @@ class AdpDaemon(top.DaemonService):
                                 dry=self.dry)
                 self.adp.reset(commit=commit)
 
+                # Flag the agent table change to the loader caches.
+                if commit and self.agent_stamp is not None:
+                    touch_file(self.agent_stamp)
+
                 # Archive the files.
                 for f in files:
                     self.archive_file(f, dry=self.dry)
@@ -224,7 +243,7 @@ class AdpDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop, dirs=self.adp_in_dirs)
 
     def get_files(self):
         """Searches the :attr:`adp_in_dirs` directories for TCD report
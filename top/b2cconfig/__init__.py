@@ -58,6 +58,12 @@ class B2CConfig(top.Config):
 
         directory where comms files are kept for further processing
 
+    .. attribute:: comms_spool
+
+        comms event spool backend.  Either ``file`` (default, one empty
+        file per comms event) or ``sqlite`` (single indexed database
+        in the comms directory)
+
     .. attribute:: aggregator_dirs
 
         directory where T1250 loader files are aggregated for further
@@ -67,6 +73,43 @@ class B2CConfig(top.Config):
 
         time (seconds) between loader processing iterations.
 
+    .. attribute:: loader_batch_size (loader)
+
+        number of new job/job_item records to accumulate before they
+        are written to the DB in bulk.  ``0`` (default) writes each
+        record as it is processed
+
+    .. attribute:: loader_workers (loader)
+
+        number of worker processes used to load T1250 files
+        concurrently.  Files are partitioned by Business Unit so no more
+        than one worker per Business Unit is used (default 1).  Needs
+        the Python 2.6+ :mod:`multiprocessing` module, otherwise files
+        are loaded serially
+
+    .. attribute:: loader_checkpoint (loader)
+
+        number of T1250 records between intermediate DB commits.  The
+        file position of each commit is recorded so that an interrupted
+        load resumes from the last checkpoint.  ``0`` (default) only
+        commits at the end of the file
+
+    .. attribute:: agent_cache_size (loader)
+
+        maximum number of agent lookups to cache.  ``0`` disables
+        caching (default 1024)
+
+    .. attribute:: agent_cache_ttl (loader)
+
+        time (seconds) that a cached agent lookup remains valid
+        (default 300)
+
+    .. attribute:: agent_stamp (loader, ADP)
+
+        file that the ADP loader touches whenever the ``agent`` table
+        is changed.  The loader invalidates its agent lookup cache when
+        this file is modified
+
     .. attribute onleilvery_loop (on delivery)
 
         time (seconds) between on delivery processing iterations.
@@ -104,8 +147,15 @@ class B2CConfig(top.Config):
     _archive_dir = None
     _staging_base = None
     _comms_dir = None
+    _comms_spool = 'file'
     _aggregator_dirs = []
     _loader_loop = 30
+    _loader_batch_size = 0
+    _loader_workers = 1
+    _loader_checkpoint = 0
+    _agent_cache_size = 1024
+    _agent_cache_ttl = 300
+    _agent_stamp = None
     _proxy_scheme = 'https'
     _business_units = {}
     _t1250_file_format = 'T1250_TOL.*\.txt'
@@ -161,6 +211,14 @@ class B2CConfig(top.Config):
     def set_comms_dir(self, value):
         pass
 
+    @property
+    def comms_spool(self):
+        return self._comms_spool
+
+    @set_scalar
+    def set_comms_spool(self, value):
+        pass
+
     @property
     def aggregator_dirs(self):
         return self._aggregator_dirs
@@ -177,6 +235,54 @@ class B2CConfig(top.Config):
     def set_loader_loop(self, value):
         pass
 
+    @property
+    def loader_batch_size(self):
+        return self._loader_batch_size
+
+    @set_scalar
+    def set_loader_batch_size(self, value):
+        pass
+
+    @property
+    def loader_workers(self):
+        return self._loader_workers
+
+    @set_scalar
+    def set_loader_workers(self, value):
+        pass
+
+    @property
+    def loader_checkpoint(self):
+        return self._loader_checkpoint
+
+    @set_scalar
+    def set_loader_checkpoint(self, value):
+        pass
+
+    @property
+    def agent_cache_size(self):
+        return self._agent_cache_size
+
+    @set_scalar
+    def set_agent_cache_size(self, value):
+        pass
+
+    @property
+    def agent_cache_ttl(self):
+        return self._agent_cache_ttl
+
+    @set_scalar
+    def set_agent_cache_ttl(self, value):
+        pass
+
+    @property
+    def agent_stamp(self):
+        return self._agent_stamp
+
+    @set_scalar
+    def set_agent_stamp(self, value):
+        pass
+
     @property
     def business_units(self):
         return self._business_units
@@ -338,6 +444,9 @@ class B2CConfig(top.Config):
                           'password': ...,
                           'port': ...}
 
+            The optional ``stmt_cache_size`` item is added if it is set
+            in the configuration.
+
         """
         kwargs = None
 
@@ -356,6 +465,10 @@ class B2CConfig(top.Config):
                       'user': user,
                       'password': password,
                       'port': port}
+
+            if self.has_option('db', 'stmt_cache_size'):
+                kwargs['stmt_cache_size'] = self.getint('db',
+                                                        'stmt_cache_size')
         except (ConfigParser.NoSectionError,
                 ConfigParser.NoOptionError), err:
             log.debug('Missing DB key via config: %s' % err)
@@ -390,6 +503,9 @@ class B2CConfig(top.Config):
                           'port': ...,
                           'sid': ...}
 
+            The optional ``arraysize`` and ``stmt_cache_size`` items
+            are added if they are set in the configuration.
+
         """
         kwargs = None
 
@@ -406,6 +522,11 @@ class B2CConfig(top.Config):
                       'password': password,
                       'port': port,
                       'sid': sid}
+
+            # Optional fetch tuning.
+            for option in ['arraysize', 'stmt_cache_size']:
+                if self.has_option('transsend_db', option):
+                    kwargs[option] = self.getint('transsend_db', option)
         except (ConfigParser.NoSectionError,
                 ConfigParser.NoOptionError), err:
             log.info('Missing TransSend DB key via config: %s' % err)
@@ -504,6 +625,9 @@ class B2CConfig(top.Config):
                    'option': 'comms',
                    'var': 'comms_dir',
                    'is_required': True},
+                  {'section': 'comms',
+                   'option': 'spool',
+                   'var': 'comms_spool'},
                   {'section': 'dirs',
                    'option': 'staging_base',
                    'is_required': True},
@@ -530,7 +654,27 @@ class B2CConfig(top.Config):
                    {'section': 'email',
                     'option': 'support',
                      'var': 'support_emails',
-                     'is_list': True}]
+                     'is_list': True},
+                   {'section': 'loader',
+                    'option': 'batch_size',
+                    'var': 'loader_batch_size',
+                    'cast_type': 'int'},
+                   {'section': 'loader',
+                    'option': 'workers',
+                    'var': 'loader_workers',
+                    'cast_type': 'int'},
+                   {'section': 'loader',
+                    'option': 'checkpoint',
+                    'var': 'loader_checkpoint',
+                    'cast_type': 'int'},
+                   {'section': 'loader',
+                    'option': 'agent_cache_size',
+                    'cast_type': 'int'},
+                   {'section': 'loader',
+                    'option': 'agent_cache_ttl',
+                    'cast_type': 'int'},
+                   {'section': 'files',
+                    'option': 'agent_stamp'}]
         for kw in kwargs:
             self.parse_scalar_config(**kw)
 
@@ -138,7 +138,9 @@ class AdpB2CConfig(top.B2CConfig):
                    'option': 'code_header'},
                   {'section': 'adp',
                    'option': 'delivery_partners',
-                   'is_list': True}]
+                   'is_list': True},
+                  {'section': 'files',
+                   'option': 'agent_stamp'}]
         for kw in kwargs:
             self.parse_scalar_config(**kw)
 
@@ -4,7 +4,8 @@ __all__ = [
 import top
 from top.utils.log import log
 from top.utils.setter import (set_scalar,
-                              set_list)
+                              set_list,
+                              set_dict)
 
 
 class CommsB2CConfig(top.B2CConfig):
@@ -50,6 +51,69 @@ class CommsB2CConfig(top.B2CConfig):
 
         time ranges when comms can be sent
 
+    .. attribute:: *comms_workers*
+
+        dictionary of the number of comms events that can be sent
+        concurrently for each channel (``email`` and ``sms``).  More
+        than one worker for either channel enables the concurrent
+        dispatcher (default 1 each)
+
+    .. attribute:: *comms_priorities*
+
+        dictionary of comms template send priorities (lower values are
+        sent first).  Overrides the :class:`top.CommsScheduler` defaults
+
+    .. attribute:: *comms_deadlines*
+
+        dictionary of comms template deadlines (seconds after the comms
+        event was created).  Overdue comms are sent first.  Overrides
+        the :class:`top.CommsScheduler` defaults
+
+    .. attribute:: *sms_batch_size*
+
+        maximum number of SMS comms submitted to the SMS API in a single
+        request (default 1)
+
+    .. attribute:: *retry_attempts*
+
+        maximum number of attempts for comms that fail transiently (the
+        REST API is unreachable or returns a server error).  ``1``
+        disables retries (default 3)
+
+    .. attribute:: *retry_delay*
+
+        time (seconds) before the first retry.  Doubles with each
+        further attempt (default 60)
+
+    .. attribute:: *retry_max_delay*
+
+        upper bound (seconds) of the retry delay (default 3600)
+
+    .. attribute:: *breaker_threshold*
+
+        consecutive transient failures on a channel (``email`` or
+        ``sms``) that pause the channel.  ``0`` disables (default 5)
+
+    .. attribute:: *breaker_reset*
+
+        time (seconds) that a channel is paused for (default 300)
+
+    .. attribute:: *rest_pool_size*
+
+        maximum number of idle keep-alive connections held for each
+        REST API host (default 4)
+
+    .. attribute:: *rest_pool_idle_timeout*
+
+        time (seconds) that an idle REST API connection is kept for
+        reuse (default 60)
+
+    .. attribute:: *comms_rates*
+
+        dictionary of the maximum number of messages per second for
+        each channel (``email`` and ``sms``).  ``0`` (default) is
+        unlimited
+
     """
     _comms_loop = 30
     _comms_dir = None
@@ -59,6 +123,18 @@ class CommsB2CConfig(top.B2CConfig):
     _uncontrolled_templates = []
     _skip_days = ['Sunday']
     _send_time_ranges = ['08:00-19:00']
+    _comms_workers = {'email': 1, 'sms': 1}
+    _comms_rates = {'email': 0, 'sms': 0}
+    _comms_priorities = {}
+    _comms_deadlines = {}
+    _sms_batch_size = 1
+    _retry_attempts = 3
+    _retry_delay = 60
+    _retry_max_delay = 3600
+    _breaker_threshold = 5
+    _breaker_reset = 300
+    _rest_pool_size = 4
+    _rest_pool_idle_timeout = 60
 
     def __init__(self, file=None):
         """CommsB2CConfig initialisation.
@@ -129,6 +205,111 @@ class CommsB2CConfig(top.B2CConfig):
     def set_send_time_ranges(self, values=None):
         pass
 
+    @property
+    def comms_workers(self):
+        return self._comms_workers
+
+    def set_email_workers(self, value):
+        self._comms_workers = dict(self._comms_workers, email=value)
+        log.debug('%s comms.email_workers set to %d' % (self.facility, value))
+
+    def set_sms_workers(self, value):
+        self._comms_workers = dict(self._comms_workers, sms=value)
+        log.debug('%s comms.sms_workers set to %d' % (self.facility, value))
+
+    @property
+    def comms_rates(self):
+        return self._comms_rates
+
+    def set_email_rate(self, value):
+        self._comms_rates = dict(self._comms_rates, email=value)
+        log.debug('%s comms.email_rate set to %s' %
+                  (self.facility, str(value)))
+
+    def set_sms_rate(self, value):
+        self._comms_rates = dict(self._comms_rates, sms=value)
+        log.debug('%s comms.sms_rate set to %s' % (self.facility, str(value)))
+
+    @property
+    def comms_priorities(self):
+        return self._comms_priorities
+
+    @set_dict
+    def set_comms_priorities(self, values=None):
+        pass
+
+    @property
+    def comms_deadlines(self):
+        return self._comms_deadlines
+
+    @set_dict
+    def set_comms_deadlines(self, values=None):
+        pass
+
+    @property
+    def sms_batch_size(self):
+        return self._sms_batch_size
+
+    @set_scalar
+    def set_sms_batch_size(self, value):
+        pass
+
+    @property
+    def retry_attempts(self):
+        return self._retry_attempts
+
+    @set_scalar
+    def set_retry_attempts(self, value):
+        pass
+
+    @property
+    def retry_delay(self):
+        return self._retry_delay
+
+    @set_scalar
+    def set_retry_delay(self, value):
+        pass
+
+    @property
+    def retry_max_delay(self):
+        return self._retry_max_delay
+
+    @set_scalar
+    def set_retry_max_delay(self, value):
+        pass
+
+    @property
+    def breaker_threshold(self):
+        return self._breaker_threshold
+
+    @set_scalar
+    def set_breaker_threshold(self, value):
+        pass
+
+    @property
+    def breaker_reset(self):
+        return self._breaker_reset
+
+    @set_scalar
+    def set_breaker_reset(self, value):
+        pass
+
+    @property
+    def rest_pool_size(self):
+        return self._rest_pool_size
+
+    @set_scalar
+    def set_rest_pool_size(self, value):
+        pass
+
+    @property
+    def rest_pool_idle_timeout(self):
+        return self._rest_pool_idle_timeout
+
+    @set_scalar
+    def set_rest_pool_idle_timeout(self, value):
+        pass
+
     def parse_config(self):
         """Read config items from the configuration file.
 
@@ -139,6 +320,9 @@ class CommsB2CConfig(top.B2CConfig):
                    'option': 'comms',
                    'var': 'comms_dir',
                    'is_required': True},
+                  {'section': 'comms',
+                   'option': 'spool',
+                   'var': 'comms_spool'},
                   {'section': 'timeout',
                    'option': 'comms_loop',
                    'cast_type': 'int'},
@@ -161,6 +345,54 @@ class CommsB2CConfig(top.B2CConfig):
                    'is_list': True},
                   {'section': 'comms',
                    'option': 'send_time_ranges',
-                   'is_list': True}]
+                   'is_list': True},
+                  {'section': 'comms',
+                   'option': 'email_workers',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'sms_workers',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'email_rate',
+                   'cast_type': 'float'},
+                  {'section': 'comms',
+                   'option': 'sms_rate',
+                   'cast_type': 'float'},
+                  {'section': 'comms',
+                   'option': 'sms_batch_size',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'retry_attempts',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'retry_delay',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'retry_max_delay',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'breaker_threshold',
+                   'cast_type': 'int'},
+                  {'section': 'comms',
+                   'option': 'breaker_reset',
+                   'cast_type': 'int'},
+                  {'section': 'rest',
+                   'option': 'pool_size',
+                   'var': 'rest_pool_size',
+                   'cast_type': 'int'},
+                  {'section': 'rest',
+                   'option': 'pool_idle_timeout',
+                   'var': 'rest_pool_idle_timeout',
+                   'cast_type': 'int'}]
         for kw in kwargs:
             self.parse_scalar_config(**kw)
+
+        del kwargs[:]
+        kwargs = [{'section': 'comms_priorities',
+                   'key_case': 'lower',
+                   'cast_type': 'int'},
+                  {'section': 'comms_deadlines',
+                   'key_case': 'lower',
+                   'cast_type': 'int'}]
+        for kw in kwargs:
+            self.parse_dict_config(**kw)
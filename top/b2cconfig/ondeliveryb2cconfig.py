@@ -38,6 +38,11 @@ class OnDeliveryB2CConfig(top.B2CConfig):
         number of date-orderd TCD files to load during a processing loop
         (default 5)
 
+    .. attribute:: tcd_index
+
+        path to the persistent TCD delivery index (default ``None``
+        re-parses the TCD files every processing loop)
+
     .. attribute:: delivered_header
 
         string that represents the TransSend column header name for
@@ -63,6 +68,7 @@ class OnDeliveryB2CConfig(top.B2CConfig):
     _tcd_filename_format = None
     _uncollected_day_range = 14.0
     _file_cache_size = 5
+    _tcd_index = None
     _delivered_header = 'latest_scan_event_action'
     _delivered_event_key = None
     _scan_desc_header = None
@@ -120,6 +126,14 @@ class OnDeliveryB2CConfig(top.B2CConfig):
     def set_file_cache_size(self, value):
         pass
 
+    @property
+    def tcd_index(self):
+        return self._tcd_index
+
+    @set_scalar
+    def set_tcd_index(self, value):
+        pass
+
     @property
     def delivered_header(self):
         return self._delivered_header
@@ -168,6 +182,9 @@ class OnDeliveryB2CConfig(top.B2CConfig):
         kwargs = [{'section': 'dirs',
                    'option': 'comms',
                    'var': 'comms_dir'},
+                  {'section': 'comms',
+                   'option': 'spool',
+                   'var': 'comms_spool'},
                   {'section': 'transsend',
                    'option': 'delivered_header'},
                   {'section': 'transsend',
@@ -193,7 +210,9 @@ class OnDeliveryB2CConfig(top.B2CConfig):
                     'cast_type': 'float'},
                    {'section': 'primary_elect',
                     'option': 'file_cache_size',
-                    'cast_type': 'int'}]
+                    'cast_type': 'int'},
+                   {'section': 'primary_elect',
+                    'option': 'tcd_index'}]
         for kw in kwargs:
             self.parse_scalar_config(**kw)
 
@@ -85,6 +85,9 @@ class ReminderB2CConfig(top.B2CConfig):
                    'option': 'comms',
                    'var': 'comms_dir',
                    'is_required': True},
+                  {'section': 'comms',
+                   'option': 'spool',
+                   'var': 'comms_spool'},
                   {'section': 'timeout',
                    'option': 'reminder_loop',
                    'cast_type': 'int'},
@@ -80,6 +80,10 @@ class TestOnDeliveryB2CConfig(unittest2.TestCase):
         msg = 'OnDelivery.file_cache_size error'
         self.assertEqual(received, expected, msg)
 
+        received = self._c.tcd_index
+        msg = 'OnDelivery.tcd_index error'
+        self.assertIsNone(received, msg)
+
         received = self._c.delivered_header
         expected = 'latest_scan_event_action'
         msg = 'OnDelivery.delivered_header error'
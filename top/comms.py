@@ -8,9 +8,14 @@ import datetime
 
 import top
 from top.utils.log import log
-from top.utils.files import (remove_files,
-                             move_file)
 from top.timezone import convert_timezone
+from top.utils.retry import (Backoff,
+                             CircuitBreaker)
+
+# Per-channel circuit breakers shared by all Comms objects (and hence
+# comms workers) in the process.
+BREAKERS = {'email': CircuitBreaker('email'),
+            'sms': CircuitBreaker('sms')}
 
 
 class Comms(top.Service):
@@ -31,17 +36,42 @@ class Comms(top.Service):
         list of template tokens that extracts template detail from the
         ``returns`` table (default ``[ret]``)
 
+    .. attribute:: *backoff*
+
+        :class:`top.utils.retry.Backoff` retry policy for comms that
+        fail transiently (the REST API could not be reached or returned
+        a server error)
+
+    .. attribute:: *agent_details*
+
+        dictionary of prefetched agent details keyed by ``(<table>,
+        <table_id>)`` where ``<table>`` is either ``job_item`` or
+        ``returns`` (see :meth:`prefetch_agent_details`)
+
+    .. attribute:: *limiter*
+
+        optional object that throttles the REST API sends for each
+        channel (``email`` or ``sms``).  Must provide
+        ``acquire(channel, count)`` and ``release(channel)`` methods
+        (see :class:`top.CommsDispatcher`)
+
     """
     _hold_period = 691200
     _template_tokens = ['body']
     _returns_template_tokens = ['ret']
+    _agent_details = {}
+    _backoff = Backoff()
+    _limiter = None
 
     def __init__(self, **kwargs):
         """:module:`top.comms` initialisation.
         """
         db_kwargs = kwargs.get('db')
         comms_dir = kwargs.get('comms_dir')
-        top.Service.__init__(self, db=db_kwargs, comms_dir=comms_dir)
+        top.Service.__init__(self,
+                             db=db_kwargs,
+                             comms_dir=comms_dir,
+                             comms_spool=kwargs.get('comms_spool'))
 
         self.set_prod(kwargs.get('prod'))
 
@@ -55,6 +85,10 @@ class Comms(top.Service):
             tmp = kwargs.get('returns_templates')
             self.set_returns_template_tokens(tmp)
 
+        self._backoff = Backoff(attempts=kwargs.get('retry_attempts'),
+                                delay=kwargs.get('retry_delay'),
+                                max_delay=kwargs.get('retry_max_delay'))
+
         proxy = kwargs.get('proxy')
         proxy_scheme = kwargs.get('scheme')
         sms_api = kwargs.get('sms_api')
@@ -67,6 +101,8 @@ class Comms(top.Service):
         self._smser = top.RestSmser(proxy=proxy,
                                     proxy_scheme=proxy_scheme,
                                     **sms_api)
+        if kwargs.get('sms_batch_size') is not None:
+            self._smser.set_batch_size(kwargs.get('sms_batch_size'))
 
         self._emailer = top.RestEmailer(proxy=proxy,
                                         proxy_scheme=proxy_scheme,
@@ -105,6 +141,28 @@ class Comms(top.Service):
         log.debug('%s returns_template_tokens set to: "%s"' %
                   (self._facility, self.returns_template_tokens))
 
+    @property
+    def backoff(self):
+        return self._backoff
+
+    @property
+    def limiter(self):
+        return self._limiter
+
+    def set_limiter(self, value=None):
+        self._limiter = value
+
+    @property
+    def agent_details(self):
+        return self._agent_details
+
+    def set_agent_details(self, values=None):
+        self._agent_details = {}
+        if values is not None:
+            self._agent_details = values
+        log.debug('%s agent_details set with %d items' %
+                  (self._facility, len(self.agent_details)))
+
     def process(self, comms_file, dry=False):
         """Attempts to send comms via appropratie medium based on
         *comms_file* comms event file.
@@ -123,55 +181,28 @@ class Comms(top.Service):
 
             boolean ``False`` otherwise
 
+            ``None`` if *comms_file* was deferred (channel paused or
+            the send will be retried)
+
         """
         log.info('Processing comms file: "%s" ...' % comms_file)
-        action = None
-        id = None
-        template = None
-        comms_file_err = comms_file + '.err'
         comms_status = True
-        filename = os.path.basename(comms_file)
 
-        try:
-            (action, id, template) = self.parse_comms_filename(filename)
-        except ValueError, err:
-            log.error('%s processing error: %s' % (comms_file, err))
-            move_file(comms_file, comms_file_err, err=True, dry=dry)
-            comms_status = False
-
-        if comms_status:
-            template_items = self.get_agent_details(id, template)
-            if not template_items.keys():
-                log.error('%s processing error: %s' %
-                          (comms_file, 'no agent details'))
-                move_file(comms_file, comms_file_err, err=True, dry=dry)
-                comms_status = False
-            elif template_items.get('pickup_ts'):
-                log.warn('%s pickup_ts has been set -- not sending comms' %
-                         comms_file)
-                if not dry:
-                    remove_files(comms_file)
+        event = None
+        if self.channel_paused(comms_file):
+            comms_status = None
+        else:
+            event = self.prepare_event(comms_file, dry=dry)
+            if event is None:
                 comms_status = False
 
-        if comms_status:
-            recipient = None
-            created_ts = template_items.get('created_ts')
-            if template == 'rem':
-                notify_ts = template_items.get('notify_ts')
-                template_items['date'] = self.get_return_date(notify_ts)
-            elif template == 'ret':
-                state = template_items.get('state')
-                if state is not None:
-                    state = state.rstrip()
-                    local_time = convert_timezone(created_ts,
-                                                  state,
-                                                  '%d/%m/%Y %I:%M%p')
-                    template_items['created_ts'] = local_time
-
+        if event is not None:
+            (action, id, template, template_items) = event
+            recipient = self.get_recipient(action, template_items)
+            client = self.channel_client(action)
+            if client is not None:
+                client.set_last_code()
             if action == 'email':
-                recipient = template_items.get('email_addr')
-                if recipient is not None:
-                    recipient = recipient.strip()
                 if recipient is not None and recipient:
                     comms_status = self.send_email(template_items,
                                                    template=template,
@@ -180,9 +211,6 @@ class Comms(top.Service):
                 else:
                     log.info('Email recipients list is empty')
             elif action == 'sms':
-                recipient = template_items.get('phone_nbr')
-                if recipient is not None:
-                    recipient = recipient.strip()
                 if recipient is not None and recipient:
                     comms_status = self.send_sms(template_items,
                                                  template=template,
@@ -193,41 +221,312 @@ class Comms(top.Service):
                 log.error('Unknown action: "%s"' % action)
                 comms_status = False
 
-            # Send failed comms status
-            if not comms_status:
-                if self.group_comms_failures(comms_file):
-                    # Only send a comms failure message if all
-                    # previous comms attempts fail.
-                    bad_email = template_items['email_addr']
-                    template_items['bad_email_addr'] = bad_email
-                    template_items['error_comms'] = action.upper()
-                    for addr in self._emailer.support:
-                        template_items['email_addr'] = addr
-                        email_status = self.send_email(template_items,
-                                                       template=template,
-                                                       err=True,
-                                                       dry=dry)
-                move_file(comms_file, comms_file_err, err=True, dry=dry)
+            transient = self.record_send(action, comms_status)
+            comms_status = self.finalise_event(comms_file,
+                                               event,
+                                               recipient,
+                                               comms_status,
+                                               transient=transient,
+                                               dry=dry)
+
+        log.debug('Comms status: %s' % str(comms_status))
+
+        return comms_status
+
+    def process_batch(self, comms_files, dry=False):
+        """Process many *comms_files*, submitting the SMS comms events
+        to the SMS API in batches (see :meth:`top.RestSmser.send_batch`).
+
+        Email comms events are processed individually via
+        :meth:`process`.  SMS comms events are processed individually if
+        the SMS batch size is ``1``.  A failed SMS batch request is
+        treated as a failure of all of its messages when deciding
+        whether to retry.
+
+        **Args:**
+            *comms_files*: list of absolute paths to the comms files to
+            process.
+
+        **Kwargs:**
+            *dry*: only report, do not execute (default ``False``)
+
+        **Returns:**
+            list of :meth:`process` statuses, one for each of the
+            *comms_files* and in the same order
+
+        """
+        statuses = [None] * len(comms_files)
+
+        pending = []
+        for index, comms_file in enumerate(comms_files):
+            filename = os.path.basename(comms_file)
+            if (self._smser.batch_size < 2 or
+                not filename.startswith('sms.')):
+                statuses[index] = self.process(comms_file, dry=dry)
+                continue
+
+            log.info('Processing comms file: "%s" ...' % comms_file)
+            if self.channel_paused(comms_file):
+                continue
+
+            event = self.prepare_event(comms_file, dry=dry)
+            if event is None:
+                statuses[index] = False
+                continue
+
+            (action, id, template, template_items) = event
+            recipient = self.get_recipient(action, template_items)
+            if recipient is None or not recipient:
+                log.info('SMS is empty')
+                statuses[index] = True
             else:
-                if recipient is not None and recipient:
-                    if template == 'rem':
-                        log.info('Setting job_item %d reminder flag' % id)
-                        self.db(self.db.jobitem.update_reminder_ts_sql(id))
-                    elif template != 'ret':
-                        log.info('Setting job_item %d notify flag' % id)
-                        self.db(self.db.jobitem.update_notify_ts_sql(id))
+                sms_data = self.create_sms(template_items, template)
+                if sms_data is not None:
+                    pending.append((index, event, recipient, sms_data))
+                    continue
+                statuses[index] = False
+
+            self.finalise_event(comms_file,
+                                event,
+                                recipient,
+                                statuses[index],
+                                dry=dry)
+
+        if pending:
+            self._smser.set_last_code()
+            results = self.limited_send('sms',
+                                        len(pending),
+                                        self._smser.send_batch,
+                                        [x[3] for x in pending],
+                                        dry=dry)
+            transient = self.record_send('sms', False not in results)
+            for (index, event, recipient, sms_data), status in zip(pending,
+                                                                   results):
+                status = self.finalise_event(comms_files[index],
+                                             event,
+                                             recipient,
+                                             status,
+                                             transient=transient,
+                                             dry=dry)
+                statuses[index] = status
+
+        log.debug('Comms batch statuses: %s' % str(statuses))
+
+        return statuses
+
+    def prepare_event(self, comms_file, dry=False):
+        """Parse *comms_file* and source the details required to send
+        the comms.  Events that cannot (or need not) be sent are
+        resolved in the :attr:`top.Service.spool`.
+
+        **Args:**
+            *comms_file*: absolute path to the comms file to process.
+
+        **Kwargs:**
+            *dry*: only report, do not execute (default ``False``)
+
+        **Returns:**
+            tuple of the form::
+
+                (<action>, <id>, "<template>", <template_items>)
+
+            or ``None`` if the comms event has been resolved
+
+        """
+        event = None
+
+        filename = os.path.basename(comms_file)
+        try:
+            (action, id, template) = self.parse_comms_filename(filename)
+        except ValueError, err:
+            log.error('%s processing error: %s' % (comms_file, err))
+            self.spool.error(comms_file, dry=dry)
+            return event
+
+        template_items = self.get_agent_details(id, template)
+        if not template_items.keys():
+            log.error('%s processing error: %s' %
+                      (comms_file, 'no agent details'))
+            self.spool.error(comms_file, dry=dry)
+        elif template_items.get('pickup_ts'):
+            log.warn('%s pickup_ts has been set -- not sending comms' %
+                     comms_file)
+            self.spool.complete(comms_file, dry=dry)
+        else:
+            created_ts = template_items.get('created_ts')
+            if template == 'rem':
+                notify_ts = template_items.get('notify_ts')
+                template_items['date'] = self.get_return_date(notify_ts)
+            elif template == 'ret':
+                state = template_items.get('state')
+                if state is not None:
+                    state = state.rstrip()
+                    local_time = convert_timezone(created_ts,
+                                                  state,
+                                                  '%d/%m/%Y %I:%M%p')
+                    template_items['created_ts'] = local_time
+
+            event = (action, id, template, template_items)
+
+        return event
+
+    def get_recipient(self, action, template_items):
+        """Extract the *action* recipient from *template_items*.
+
+        **Returns:**
+            the recipient email address or mobile number (stripped of
+            whitespace) or ``None`` if one is not defined
+
+        """
+        recipient = None
+
+        if action == 'email':
+            recipient = template_items.get('email_addr')
+        elif action == 'sms':
+            recipient = template_items.get('phone_nbr')
+
+        if recipient is not None:
+            recipient = recipient.strip()
+
+        return recipient
+
+    def finalise_event(self,
+                       comms_file,
+                       event,
+                       recipient,
+                       comms_status,
+                       transient=False,
+                       dry=False):
+        """Resolve the comms *event* in the :attr:`top.Service.spool`
+        once the send has been attempted.
+
+        Successful sends flag the ``job_item`` as notified (or reminded).
+        Sends that failed transiently are scheduled for retry as per
+        the :attr:`backoff` policy.  Other failed sends (or those that
+        have run out of attempts) are flagged as errored and a failure
+        notification is sent to support if the alternate comms medium
+        for the same ``job_item`` has also failed.
 
-                    if not dry:
-                        self.db.commit()
+        **Args:**
+            *comms_file*: absolute path to the comms file to process.
+
+            *event*: comms event tuple as per :meth:`prepare_event`
+
+            *recipient*: the comms recipient
+
+            *comms_status*: boolean status of the send attempt
+
+        **Kwargs:**
+            *transient*: the send failure is likely to be temporary
+
+            *dry*: only report, do not execute (default ``False``)
+
+        **Returns:**
+            *comms_status* or ``None`` if the send will be retried
+
+        """
+        (action, id, template, template_items) = event
+
+        if not comms_status and transient:
+            attempts = self.spool.attempts(comms_file) + 1
+            if self.backoff.retry(attempts):
+                next_ts = time.time() + self.backoff.wait(attempts)
+                self.spool.retry(comms_file, attempts, next_ts, dry=dry)
+                return None
+            log.error('Comms file "%s" failed after %d attempts' %
+                      (comms_file, attempts))
+
+        if not comms_status:
+            if self.group_comms_failures(comms_file):
+                # Only send a comms failure message if all
+                # previous comms attempts fail.
+                bad_email = template_items['email_addr']
+                template_items['bad_email_addr'] = bad_email
+                template_items['error_comms'] = action.upper()
+                for addr in self._emailer.support:
+                    template_items['email_addr'] = addr
+                    email_status = self.send_email(template_items,
+                                                   template=template,
+                                                   err=True,
+                                                   dry=dry)
+            self.spool.error(comms_file, dry=dry)
+        else:
+            if recipient is not None and recipient:
+                column = None
+                if template == 'rem':
+                    log.info('Setting job_item %d reminder flag' % id)
+                    column = 'reminder_ts'
+                elif template != 'ret':
+                    log.info('Setting job_item %d notify flag' % id)
+                    column = 'notify_ts'
+
+                if column is not None:
+                    jobitem = self.db.jobitem
+                    (sql,
+                     params) = jobitem.update_timestamp_params_sql(id, column)
+                    self.db(sql, params)
 
-                log.info('Removing comms file: "%s"' % comms_file)
                 if not dry:
-                    remove_files(comms_file)
+                    self.db.commit()
 
-        log.debug('Comms status: %s' % str(comms_status))
+            self.spool.complete(comms_file, dry=dry)
 
         return comms_status
 
+    def channel_client(self, action):
+        """REST client for the *action* (``email`` or ``sms``) channel.
+        """
+        return {'email': self._emailer, 'sms': self._smser}.get(action)
+
+    def channel_paused(self, comms_file):
+        """Check whether the *comms_file* channel circuit breaker is
+        open.  Comms for a paused channel are left in the spool.
+
+        **Args:**
+            *comms_file*: absolute path to the comms file to process.
+
+        **Returns:**
+            boolean ``True`` if the channel is paused
+
+        """
+        paused = False
+
+        action = os.path.basename(comms_file).split('.')[0]
+        breaker = BREAKERS.get(action)
+        if breaker is not None and not breaker.allow():
+            log.info('Comms channel "%s" paused -- deferring "%s"' %
+                     (action, comms_file))
+            paused = True
+
+        return paused
+
+    def record_send(self, action, comms_status):
+        """Record the outcome of the last *action* channel send against
+        its circuit breaker.  Sends that did not reach the REST API
+        (for example, invalid mobile) are not recorded.
+
+        **Args:**
+            *action*: the comms channel (``email`` or ``sms``)
+
+            *comms_status*: boolean status of the send
+
+        **Returns:**
+            boolean ``True`` if the send failed transiently
+
+        """
+        transient = False
+
+        client = self.channel_client(action)
+        if client is not None:
+            if client.last_code != 0:
+                transient = not comms_status and client.transient_failure()
+                breaker = BREAKERS.get(action)
+                if breaker is not None:
+                    breaker.record(not transient)
+            client.set_last_code()
+
+        return transient
+
     def send_sms(self,
                  item_details,
                  template='sms_rem',
@@ -258,28 +557,48 @@ class Comms(top.Service):
         """
         status = True
 
+        sms_data = self.create_sms(item_details, template=template)
+        if sms_data is None:
+            status = False
+        else:
+            status = self.limited_send('sms',
+                                       1,
+                                       self._smser.send,
+                                       data=sms_data,
+                                       dry=dry)
+
+        return status
+
+    def create_sms(self, item_details, template='sms_rem'):
+        """Validate the SMS recipient and generate the SMS content.
+
+        **Args:**
+            *item_details*: dictionary of SMS details as per
+            :meth:`send_sms`
+
+        **Kwargs:**
+            *template*: the XML template used to generate the SMS content
+
+        **Returns:**
+            the SMS XML construct or ``None`` on failure
+
+        """
+        sms_data = None
+
         mobile = item_details.get('phone_nbr')
         if mobile is None or not mobile:
             log.error('No SMS mobile contact provided')
-            status = False
-
-        if status and not self._smser.validate(mobile):
-            status = False
+        elif not self._smser.validate(mobile):
             log.error('SMS mobile "%s" did not validate' % mobile)
-
-        if status:
+        else:
             log.info('Sending customer SMS to "%s"' % str(mobile))
 
             # OK, generate the SMS structure.
             sms_data = self._smser.create_comms(data=item_details,
                                                 template=template,
                                                 prod=self.prod)
-            if sms_data is None:
-                status = False
-            else:
-                status = self._smser.send(data=sms_data, dry=dry)
 
-        return status
+        return sms_data
 
     def get_return_date(self, ts):
         """Creates the return date in a nicely formatted output.
@@ -376,10 +695,130 @@ class Comms(top.Service):
                                                      template=template,
                                                      prod=self.prod,
                                                      err=err)
-            status = self._emailer.send(data=encoded_msg, dry=dry)
+            status = self.limited_send('email',
+                                       1,
+                                       self._emailer.send,
+                                       data=encoded_msg,
+                                       dry=dry)
 
         return status
 
+    def limited_send(self, channel, count, send, *args, **kwargs):
+        """Call the REST client *send* method with *args* and *kwargs*
+        subject to the :attr:`limiter` of *channel*.
+
+        Only messages that actually reach the REST API are charged
+        against the :attr:`limiter`.  Dry runs are not throttled.
+
+        **Args:**
+            *channel*: comms channel (``email`` or ``sms``)
+
+            *count*: number of messages that *send* will deliver
+
+            *send*: REST client send method
+
+        **Returns:**
+            the return value of *send*
+
+        """
+        limiter = self.limiter
+        if kwargs.get('dry'):
+            limiter = None
+
+        if limiter is not None:
+            limiter.acquire(channel, count)
+        try:
+            result = send(*args, **kwargs)
+        finally:
+            if limiter is not None:
+                limiter.release(channel)
+
+        return result
+
+    def agent_details_table(self, template_token=None):
+        """Source table for the agent details of *template_token* comms.
+
+        **Returns:**
+            ``returns`` if *template_token* is listed in the
+            :attr:`returns_template_tokens`.  Otherwise, ``job_item``
+
+        """
+        table = 'job_item'
+        if (template_token is not None and
+            template_token in self.returns_template_tokens):
+            table = 'returns'
+
+        return table
+
+    def prefetch_agent_details(self, comms_files, chunk_size=500):
+        """Resolve the agent details for all *comms_files* with as few
+        queries as possible and cache them in :attr:`agent_details` for
+        subsequent :meth:`get_agent_details` calls.
+
+        The ``job_item.id`` and ``returns.id`` values are queried in
+        chunks of up to *chunk_size*.  Identifiers that do not resolve to
+        a single agent are not cached (and will fall back to the single
+        query in :meth:`get_agent_details`).
+
+        **Args:**
+            *comms_files*: list of comms event files
+
+        **Kwargs:**
+            *chunk_size*: maximum number of identifiers per query
+
+        **Returns:**
+            the :attr:`agent_details` dictionary
+
+        """
+        ids = {'job_item': set(), 'returns': set()}
+        for comms_file in comms_files:
+            filename = os.path.basename(comms_file)
+            try:
+                (action, id, template) = self.parse_comms_filename(filename)
+            except ValueError, err:
+                continue
+            ids[self.agent_details_table(template)].add(id)
+
+        found = {}
+        job_item_ids = sorted(ids['job_item'])
+        for i in range(0, len(job_item_ids), chunk_size):
+            chunk = job_item_ids[i:i + chunk_size]
+            self.db(self.db.jobitem.job_item_agent_details_ids_sql(chunk))
+            columns = self.db.columns()[1:]
+            for row in list(self.db.rows()):
+                key = ('job_item', row[0])
+                found.setdefault(key, []).append(zip(columns, row[1:]))
+
+        returns_ids = sorted(ids['returns'])
+        for i in range(0, len(returns_ids), chunk_size):
+            chunk = returns_ids[i:i + chunk_size]
+            self.db(self.db.returns.extract_ids_sql(chunk))
+            columns = self.db.columns()[1:]
+            agents = list(self.db.rows())
+
+            self.db(self.db.returns_reference.reference_nbrs_sql(chunk))
+            columns.extend(self.db.columns()[1:])
+            refs = {}
+            for (returns_id, reference_nbr) in list(self.db.rows()):
+                refs.setdefault(returns_id, []).append(reference_nbr)
+
+            for row in agents:
+                key = ('returns', row[0])
+                with_refs = tuple(row[1:]) + (', '.join(refs.get(row[0],
+                                                                 [])), )
+                found.setdefault(key, []).append(zip(columns, with_refs))
+
+        details = {}
+        for key, agents in found.iteritems():
+            if len(agents) == 1:
+                details[key] = dict(agents[0])
+
+        log.info('Prefetched agent details for %d of %d comms items' %
+                 (len(details), len(job_item_ids) + len(returns_ids)))
+        self.set_agent_details(details)
+
+        return self.agent_details
+
     def get_agent_details(self, table_id, template_token=None):
         """Get agent details.
 
@@ -406,15 +845,24 @@ class Comms(top.Service):
 
             Refer to the
             :meth:`top.table.jobitem.job_item_agent_details_sql` and
-            :meth:`top.table.returns_reference.reference_nbr_sql` method
+            :meth:`top.table.returns_reference.reference_nbr_sql` method.
+
+            Details previously prefetched by
+            :meth:`prefetch_agent_details` are returned without a query
 
         """
+        key = (self.agent_details_table(template_token), table_id)
+        cached = self.agent_details.get(key)
+        if cached is not None:
+            log.debug('"%s" table_id %d detail (prefetched): "%s"' %
+                      (template_token, table_id, cached))
+            return dict(cached)
+
         agent_details = []
 
         agents = []
         tmp_agents = []
-        if (template_token is None or
-            template_token not in self.returns_template_tokens):
+        if self.agent_details_table(template_token) == 'job_item':
             sql = self.db.jobitem.job_item_agent_details_sql(table_id)
             self.db(sql)
             columns = self.db.columns()
@@ -487,12 +935,13 @@ class Comms(top.Service):
     def group_comms_failures(self, comms_file):
         """In this context, a grouping of failed comms messages resolves
         to ``True`` if *comms_file* has a corresponding failed facility
-        already present in the :attr:`top.comms.comms_dir` directory.
+        already flagged as errored in the :attr:`top.Service.spool`.
 
         For example, if *comms_file* provided is
         ``<comms_dir>/email.123456.body`` then a successful failed grouping
-        will only occur if the file ``<comms_dir>/sms.123456.body.err``
-        exists.
+        will only occur if the event ``<comms_dir>/sms.123456.body`` has
+        errored (for the file based spool, the file
+        ``<comms_dir>/sms.123456.body.err`` exists).
 
         **Args:**
             *comms_file*: absolute path to the comms event file to process.
@@ -513,16 +962,14 @@ class Comms(top.Service):
             filename = os.path.basename(comms_file)
             (action, id, template) = self.parse_comms_filename(filename)
             if action == 'email':
-                err_file = os.path.join(dir, 'sms.%s.%s.err' %
-                                        (id, template))
+                err_file = os.path.join(dir, 'sms.%s.%s' % (id, template))
             else:
-                err_file = os.path.join(dir, 'email.%s.%s.err' %
-                                        (id, template))
+                err_file = os.path.join(dir, 'email.%s.%s' % (id, template))
         except ValueError, err:
             log.error('%s processing error: %s' % (comms_file, err))
 
         if err_file is not None:
-            if os.path.exists(err_file):
+            if self.spool.errored(err_file):
                 log.debug('Errored comms file "%s" exists' % err_file)
                 status = True
             else:
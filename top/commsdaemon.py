@@ -8,9 +8,11 @@ import ConfigParser
 
 import top
 from top.utils.log import log
-from top.utils.files import get_directory_files_list
+from top.commsspool import (create_comms_spool,
+                            SqliteCommsSpool)
 from top.utils.setter import (set_scalar,
-                              set_list)
+                              set_list,
+                              set_dict)
 
 
 class CommsDaemon(top.DaemonService):
@@ -20,6 +22,10 @@ class CommsDaemon(top.DaemonService):
 
          directory where comms files are read from for further processing
 
+    .. attribute:: *comms_spool*
+
+        name of the comms event spool backend (``file`` or ``sqlite``)
+
     .. attribute:: *q_warning*
 
         comms queue warning threshold.  If number of messages exceeds this
@@ -52,15 +58,66 @@ class CommsDaemon(top.DaemonService):
         time ranges when comms can be sent.  An empty list (or no
         time ranges) suggests that comms can be sent at any time
 
+    .. attribute:: *workers*
+
+        dictionary of the number of comms that can be sent concurrently
+        for each channel (``email`` and ``sms``).  More than one worker
+        for either channel sends comms via a :class:`top.CommsDispatcher`
+
+    .. attribute:: *rates*
+
+        dictionary of the maximum messages per second for each channel.
+        ``0`` is unlimited.  Applies whether comms are sent serially or
+        via the :attr:`dispatcher` (see :attr:`limiter`)
+
+    .. attribute:: *priorities*
+
+        dictionary of comms template send priorities (see
+        :class:`top.CommsScheduler`)
+
+    .. attribute:: *deadlines*
+
+        dictionary of comms template deadlines in seconds (see
+        :class:`top.CommsScheduler`)
+
+    .. attribute:: *chunk_size*
+
+        number of comms sent between checks of the controlled templates
+        send window.  Controlled comms not sent when the window closes
+        are deferred until the window reopens
+
+    .. attribute:: *retry*
+
+        dictionary of the comms retry policy: maximum ``attempts``,
+        initial ``delay`` and ``max_delay`` (seconds).  See
+        :class:`top.utils.retry.Backoff`
+
+    .. attribute:: *sms_batch_size*
+
+        maximum number of SMS comms submitted to the SMS API in a single
+        request.  Each :attr:`dispatcher` worker sends its own batches
+
     """
     _comms = None
     _comms_dir = None
+    _comms_spool = 'file'
+    _spool = None
     _q_warning = 100
     _q_error = 1000
     _controlled_templates = ['body']
     _uncontrolled_templates = ['ret']
     _skip_days = ['Sunday']
     _send_time_ranges = ['08:00-19:00']
+    _workers = {'email': 1, 'sms': 1}
+    _rates = {}
+    _priorities = {}
+    _deadlines = {}
+    _scheduler = None
+    _chunk_size = 100
+    _sms_batch_size = 1
+    _retry = {'attempts': 3, 'delay': 60, 'max_delay': 3600}
+    _dispatcher = None
+    _limiter = None
 
     @property
     def comms(self):
@@ -72,7 +129,22 @@ class CommsDaemon(top.DaemonService):
 
     @set_scalar
     def set_comms_dir(self, value):
-        pass
+        self._spool = None
+
+    @property
+    def comms_spool(self):
+        return self._comms_spool
+
+    @set_scalar
+    def set_comms_spool(self, value):
+        self._spool = None
+
+    @property
+    def spool(self):
+        if self._spool is None:
+            self._spool = create_comms_spool(self.comms_dir, self.comms_spool)
+
+        return self._spool
 
     @property
     def q_warning(self):
@@ -122,6 +194,98 @@ class CommsDaemon(top.DaemonService):
     def set_send_time_ranges(self, values=None):
         pass
 
+    @property
+    def workers(self):
+        return self._workers
+
+    @set_dict
+    def set_workers(self, values=None):
+        pass
+
+    @property
+    def rates(self):
+        return self._rates
+
+    @set_dict
+    def set_rates(self, values=None):
+        pass
+
+    @property
+    def priorities(self):
+        return self._priorities
+
+    @set_dict
+    def set_priorities(self, values=None):
+        self._scheduler = None
+
+    @property
+    def deadlines(self):
+        return self._deadlines
+
+    @set_dict
+    def set_deadlines(self, values=None):
+        self._scheduler = None
+
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            self._scheduler = top.CommsScheduler(self.priorities,
+                                                 self.deadlines)
+
+        return self._scheduler
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @set_scalar
+    def set_chunk_size(self, value):
+        pass
+
+    @property
+    def retry(self):
+        return self._retry
+
+    @set_dict
+    def set_retry(self, values=None):
+        pass
+
+    @property
+    def sms_batch_size(self):
+        return self._sms_batch_size
+
+    @set_scalar
+    def set_sms_batch_size(self, value):
+        pass
+
+    @property
+    def dispatcher(self):
+        """:class:`top.CommsDispatcher` object if concurrent comms are
+        enabled (more than one worker for a channel).  ``None`` otherwise.
+        """
+        if (self._dispatcher is None and
+            max(self.workers.values() or [1]) > 1):
+            self._dispatcher = top.CommsDispatcher(self.comms_kwargs,
+                                                   workers=self.workers,
+                                                   rates=self.rates)
+
+        return self._dispatcher
+
+    @property
+    def limiter(self):
+        """Per-channel concurrency and rate limiter for all comms sends
+        (see :attr:`top.Comms.limiter`).  This is the :attr:`dispatcher`
+        if concurrent comms are enabled so that serial and concurrent
+        sends draw on the same limits.
+        """
+        if self._limiter is None:
+            self._limiter = self.dispatcher
+            if self._limiter is None:
+                self._limiter = top.CommsDispatcher(workers=self.workers,
+                                                    rates=self.rates)
+
+        return self._limiter
+
     @property
     def sms_api(self):
         sms_api = {}
@@ -212,6 +376,13 @@ class CommsDaemon(top.DaemonService):
             log.debug('%s returns_templates cannot be built from %s: %s ' %
                       (self._facility, 'comms.uncontrolled_templates', err))
 
+        kwargs['comms_dir'] = self.comms_dir
+        kwargs['comms_spool'] = self.comms_spool
+        kwargs['sms_batch_size'] = self.sms_batch_size
+        kwargs['retry_attempts'] = self.retry.get('attempts')
+        kwargs['retry_delay'] = self.retry.get('delay')
+        kwargs['retry_max_delay'] = self.retry.get('max_delay')
+
         log.debug('%s comms_kwargs: "%s"' % (self.facility, kwargs))
         return kwargs
 
@@ -229,6 +400,7 @@ class CommsDaemon(top.DaemonService):
                                    config=config)
         if self.config is not None:
             self.set_comms_dir(self.config.comms_dir)
+            self.set_comms_spool(self.config.comms_spool)
             self.set_loop(self.config.comms_loop)
             self.set_q_warning(self.config.comms_q_warning)
             self.set_q_error(self.config.comms_q_error)
@@ -237,6 +409,24 @@ class CommsDaemon(top.DaemonService):
             self.set_uncontrolled_templates(tmp)
             self.set_skip_days(self.config.skip_days)
             self.set_send_time_ranges(self.config.send_time_ranges)
+            self.set_workers(self.config.comms_workers)
+            self.set_rates(self.config.comms_rates)
+            self.set_sms_batch_size(self.config.sms_batch_size)
+            self.set_priorities(self.config.comms_priorities)
+            self.set_deadlines(self.config.comms_deadlines)
+            self.set_retry({'attempts': self.config.retry_attempts,
+                            'delay': self.config.retry_delay,
+                            'max_delay': self.config.retry_max_delay})
+
+            # Channel circuit breakers are shared by all comms workers.
+            for breaker in top.comms.BREAKERS.values():
+                breaker.set_threshold(self.config.breaker_threshold)
+                breaker.set_reset_timeout(self.config.breaker_reset)
+
+            # REST API connections are pooled across all comms workers.
+            top.rest.POOL.set_max_size(self.config.rest_pool_size)
+            timeout = self.config.rest_pool_idle_timeout
+            top.rest.POOL.set_idle_timeout(timeout)
 
     def _start(self, event):
         """Override the :method:`top.utils.Daemon._start` method.
@@ -255,6 +445,10 @@ class CommsDaemon(top.DaemonService):
 
         if self._comms is None:
             self._comms = top.Comms(**(self.comms_kwargs))
+            self._comms.set_limiter(self.limiter)
+
+        # Pick up events left claimed by a previous run.
+        self.spool.release()
 
         all_templates = (self.controlled_templates +
                          self.uncontrolled_templates)
@@ -268,16 +462,15 @@ class CommsDaemon(top.DaemonService):
                 event.set()
                 continue
 
-            if not self._skip_day():
-                if self._within_time_ranges():
-                    if self.file is not None:
-                        files.append(self.file)
-                        event.set()
-                    else:
-                        for filter in self.controlled_templates:
-                            log.debug('controlled template filter: %s' %
-                                      filter)
-                            files.extend(self.get_comms_files(filter))
+            if self._send_window_open():
+                if self.file is not None:
+                    files.append(self.file)
+                    event.set()
+                else:
+                    for filter in self.controlled_templates:
+                        log.debug('controlled template filter: %s' %
+                                  filter)
+                        files.extend(self.get_comms_files(filter))
 
             for filter in self.uncontrolled_templates:
                 log.debug('uncontrolled template filter: %s' % filter)
@@ -285,12 +478,35 @@ class CommsDaemon(top.DaemonService):
 
             if len(files):
                 self.reporter.reset('Comms')
+                files = self.scheduler.schedule(files,
+                                                self.spool.created(files))
                 log.info('All files: "%s"' % files)
+                log.info(self.scheduler.report())
 
             # Start processing files.
             if self._message_queue_ok(len(files), dry=self.dry):
-                for file in files:
-                    self.reporter(self._comms.process(file, self.dry))
+                details = None
+                if len(files) > 1:
+                    details = self._comms.prefetch_agent_details(files)
+
+                remaining = list(files)
+                while len(remaining):
+                    chunk = remaining[:self.chunk_size]
+                    del remaining[:self.chunk_size]
+                    self._send(chunk, details)
+
+                    if (len(remaining) and
+                        self.file is None and
+                        not self._send_window_open()):
+                        log.info('Send window closed -- deferring '
+                                 'controlled comms')
+                        remaining = [x for x in remaining
+                                     if (self.scheduler.template(x) in
+                                         self.uncontrolled_templates)]
+                self._comms.set_agent_details()
+
+                # Return deferred comms events to the spool.
+                self.spool.release()
 
                 if len(files):
                     stats = self.reporter.report()
@@ -307,7 +523,45 @@ class CommsDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    # The SQLite spool raises no comms event file
+                    # events so fall back to the timed wait.
+                    dirs = None
+                    if not isinstance(self.spool, SqliteCommsSpool):
+                        dirs = [self.comms_dir]
+                    self.wait(self.loop, dirs=dirs, ignore='\.(err|retry)$')
+
+    def _send(self, files, details=None):
+        """Send the comms for *files* and report the statuses.
+
+        **Args:**
+            *files*: list of comms event files
+
+        **Kwargs:**
+            *details*: agent details prefetched by
+            :meth:`top.Comms.prefetch_agent_details`
+
+        """
+        if self.dispatcher is not None and len(files) > 1:
+            statuses = self.dispatcher.dispatch(files,
+                                                dry=self.dry,
+                                                details=details)
+        else:
+            statuses = self._comms.process_batch(files, dry=self.dry)
+
+        for status in statuses:
+            self.reporter(status)
+
+    def _send_window_open(self):
+        """Check whether controlled comms can currently be sent.
+
+        **Returns**:
+            ``boolean``::
+
+                ``True`` if current day is not a skip day and the
+                current time is within the send time ranges
+
+        """
+        return not self._skip_day() and self._within_time_ranges()
 
     def _skip_day(self):
         """Check whether comms is configured to skip current day of week.
@@ -442,7 +696,7 @@ class CommsDaemon(top.DaemonService):
         return queue_ok
 
     def get_comms_files(self, template=None):
-        """Produce a list of files in the :attr:`comms_dir`.
+        """Claim the comms events in the :attr:`comms_dir` spool.
 
         Comms files are matched based on the following pattern::
 
@@ -468,12 +722,7 @@ class CommsDaemon(top.DaemonService):
         """
         log.debug('Searching for comms in dir: %s' % self.comms_dir)
 
-        comms_files = []
-        filter = '^(email|sms)\.(\d+)\.(\w+)$'
-        if template is not None:
-            filter = '^(email|sms)\.(\d+)\.(%s)$' % template
-        comms_files.extend(get_directory_files_list(self.comms_dir,
-                                                    filter))
+        comms_files = self.spool.claim(template)
 
         log.debug('Comms event files found: "%s"' % comms_files)
 
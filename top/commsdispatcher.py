@@ -0,0 +1,288 @@
+__all__ = [
+    "CommsDispatcher",
+]
+import os
+import re
+import threading
+import Queue
+
+import top
+from top.utils.log import log
+from top.utils.throttle import TokenBucket
+
+EVENT_RE = re.compile('^(email|sms)\.(\d+)\.')
+
+
+class CommsDispatcher(object):
+    """Concurrent comms event dispatcher.
+
+    Comms events are processed by a pool of worker threads, each with
+    its own :class:`top.Comms` object (and hence DB connection and REST
+    clients).  Events are grouped by ``job_item.id`` and each group is
+    processed in order by a single worker so that comms for the same
+    item are never sent in parallel (as expected by
+    :meth:`top.Comms.group_comms_failures`).  Workers process their
+    events with :meth:`top.Comms.process_batch` so SMS batching still
+    applies.  The per-channel limits are only charged for messages
+    that are sent to the REST API (see :meth:`acquire`).
+
+    .. attribute:: comms_kwargs
+
+        dictionary of keyword arguments used to build each worker's
+        :class:`top.Comms` object
+
+    .. attribute:: workers
+
+        dictionary of the maximum number of events for each channel
+        (``email`` or ``sms``) that can be processed concurrently.  The
+        worker pool size is the sum of the channel workers
+
+    .. attribute:: rates
+
+        dictionary of the maximum number of messages per second for
+        each channel.  ``0`` or ``None`` (default) is unlimited
+
+    """
+    _comms_kwargs = {}
+
+    def __init__(self, comms_kwargs=None, workers=None, rates=None):
+        """:class:`top.CommsDispatcher` initialiser.
+        """
+        if comms_kwargs is not None:
+            self._comms_kwargs = comms_kwargs
+
+        self._workers = {'email': 1, 'sms': 1}
+        if workers is not None:
+            self._workers.update(workers)
+
+        self._rates = {}
+        if rates is not None:
+            self._rates.update(rates)
+
+        self._semaphores = {}
+        for channel, count in self._workers.iteritems():
+            semaphore = threading.BoundedSemaphore(max(1, count))
+            self._semaphores[channel] = semaphore
+
+        self._buckets = {}
+        for channel in self._workers.keys():
+            self._buckets[channel] = TokenBucket(self._rates.get(channel))
+
+        self._tasks = Queue.Queue()
+        self._results = Queue.Queue()
+        self._threads = []
+
+    @property
+    def comms_kwargs(self):
+        return self._comms_kwargs
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def rates(self):
+        return self._rates
+
+    @property
+    def concurrency(self):
+        return sum(self.workers.values())
+
+    def channel(self, comms_file):
+        """Extract the comms channel (``email`` or ``sms``) from
+        *comms_file*.
+
+        **Returns:**
+            the channel name or ``None`` if *comms_file* does not
+            conform to the comms event format
+
+        """
+        channel = None
+
+        m = EVENT_RE.match(os.path.basename(comms_file))
+        if m:
+            channel = m.group(1)
+
+        return channel
+
+    def group_events(self, comms_files):
+        """Group *comms_files* by ``job_item.id``.  The order of
+        *comms_files* is retained within each group.
+
+        **Args:**
+            *comms_files*: list of comms event files
+
+        **Returns:**
+            list of comms event file lists
+
+        """
+        groups = {}
+        keys = []
+
+        for comms_file in comms_files:
+            m = EVENT_RE.match(os.path.basename(comms_file))
+            key = comms_file
+            if m:
+                key = int(m.group(2))
+            if key not in groups:
+                keys.append(key)
+            groups.setdefault(key, []).append(comms_file)
+
+        return [groups[x] for x in keys]
+
+    def start(self):
+        """Start the worker pool (if not already running).
+        """
+        if not self._threads:
+            log.info('Starting %d comms workers: %s' %
+                     (self.concurrency, str(self.workers)))
+            for i in range(self.concurrency):
+                thread = threading.Thread(target=self._worker,
+                                          name='comms-worker-%d' % i)
+                thread.setDaemon(True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        """Stop the worker pool.
+        """
+        for thread in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        del self._threads[:]
+
+    def _worker(self):
+        comms = None
+
+        while True:
+            task = self._tasks.get()
+            try:
+                if task is None:
+                    break
+
+                (comms_files, dry, details) = task
+                statuses = []
+                try:
+                    if comms is None:
+                        comms = top.Comms(**(self.comms_kwargs))
+                        comms.set_limiter(self)
+                    comms.set_agent_details(details)
+                    statuses = comms.process_batch(comms_files, dry)
+                except Exception, err:
+                    log.error('Comms worker error processing %s: %s' %
+                              (str(comms_files), err))
+                statuses.extend([False] * (len(comms_files) - len(statuses)))
+                self._results.put(statuses)
+            finally:
+                self._tasks.task_done()
+
+    def acquire(self, channel, count=1):
+        """Block until *count* messages can be sent on *channel* within
+        the channel's concurrency and rate limits.
+
+        Called by :meth:`top.Comms.limited_send` immediately before the
+        REST API send so that only messages that reach the API are
+        charged.  Must be paired with :meth:`release`.
+
+        **Args:**
+            *channel*: comms channel (``email`` or ``sms``)
+
+        **Kwargs:**
+            *count*: number of messages to be sent
+
+        """
+        semaphore = self._semaphores.get(channel)
+        if semaphore is not None:
+            semaphore.acquire()
+
+        bucket = self._buckets.get(channel)
+        if bucket is not None:
+            bucket.acquire(count)
+
+    def release(self, channel):
+        """Release the *channel* concurrency slot taken by
+        :meth:`acquire`.
+
+        **Args:**
+            *channel*: comms channel (``email`` or ``sms``)
+
+        """
+        semaphore = self._semaphores.get(channel)
+        if semaphore is not None:
+            semaphore.release()
+
+    def pack_groups(self, groups):
+        """Pack the *groups* of comms event files into worker tasks.
+
+        Groups that contain SMS events are combined until the task
+        holds ``sms_batch_size`` (from :attr:`comms_kwargs`) SMS events
+        so that :meth:`top.Comms.process_batch` can send them in a
+        single REST request.  Groups without SMS events remain as
+        separate tasks.  A group is never split across tasks.
+
+        **Args:**
+            *groups*: list of comms event file lists as per
+            :meth:`group_events`
+
+        **Returns:**
+            list of comms event file lists
+
+        """
+        batch_size = self.comms_kwargs.get('sms_batch_size') or 1
+
+        tasks = []
+        sms_task = []
+        sms_count = 0
+        for group in groups:
+            count = len([x for x in group if self.channel(x) == 'sms'])
+            if not count or batch_size <= 1:
+                tasks.append(list(group))
+                continue
+
+            sms_task.extend(group)
+            sms_count += count
+            if sms_count >= batch_size:
+                tasks.append(sms_task)
+                sms_task = []
+                sms_count = 0
+
+        if sms_task:
+            tasks.append(sms_task)
+
+        return tasks
+
+    def dispatch(self, comms_files, dry=False, details=None):
+        """Process *comms_files* across the worker pool and wait for
+        them to complete.
+
+        **Args:**
+            *comms_files*: list of comms event files
+
+        **Kwargs:**
+            *dry*: only report, do not execute
+
+            *details*: agent details prefetched by
+            :meth:`top.Comms.prefetch_agent_details`.  Shared (read only)
+            by all workers
+
+        **Returns:**
+            list of :meth:`top.Comms.process` statuses (one for each
+            file in *comms_files* but not necessarily in the same order)
+
+        """
+        self.start()
+
+        groups = self.group_events(comms_files)
+        for task in self.pack_groups(groups):
+            self._tasks.put((task, dry, details))
+        self._tasks.join()
+
+        statuses = []
+        while True:
+            try:
+                statuses.extend(self._results.get_nowait())
+            except Queue.Empty:
+                break
+
+        return statuses
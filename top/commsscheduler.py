@@ -0,0 +1,197 @@
+__all__ = [
+    "CommsScheduler",
+]
+import os
+import re
+import time
+
+from top.utils.log import log
+
+EVENT_RE = re.compile('^(email|sms)\.(\d+)\.(\w+)$')
+
+
+class CommsScheduler(object):
+    """Deadline-aware priority ordering of comms events.
+
+    Each comms event template is assigned a priority (lower values are
+    more urgent) and a deadline (seconds after the event was created by
+    which it should be sent).  Events are ordered so that:
+
+    * events that are past their deadline go first
+
+    * then by template priority
+
+    * then by earliest deadline (and oldest event)
+
+    .. attribute:: priorities
+
+        dictionary of template priorities.  Templates not listed are
+        given :attr:`default_priority`
+
+    .. attribute:: deadlines
+
+        dictionary of template deadlines (seconds).  Templates not
+        listed (or with a ``0`` deadline) are never overdue
+
+    .. attribute:: default_priority
+
+        priority of templates not listed in :attr:`priorities`
+
+    .. attribute:: stats
+
+        dictionary of per-template queue statistics from the last
+        :meth:`schedule` call.  For example::
+
+            {'body': {'depth': 10,
+                      'overdue': 1,
+                      'max_wait': 3650.0,
+                      'mean_wait': 400.0}}
+
+    """
+    _priorities = {'body': 0,
+                   'pe': 0,
+                   'ret': 1,
+                   'delay': 2,
+                   'rem': 3}
+    _deadlines = {'body': 3600,
+                  'pe': 3600,
+                  'ret': 7200,
+                  'delay': 86400,
+                  'rem': 86400}
+    _default_priority = 5
+    _stats = {}
+
+    def __init__(self, priorities=None, deadlines=None):
+        """:class:`top.CommsScheduler` initialiser.
+        """
+        self._priorities = dict(self._priorities)
+        if priorities is not None:
+            self.set_priorities(priorities)
+
+        self._deadlines = dict(self._deadlines)
+        if deadlines is not None:
+            self.set_deadlines(deadlines)
+
+    @property
+    def priorities(self):
+        return self._priorities
+
+    def set_priorities(self, values):
+        self._priorities.update(values)
+        log.debug('Comms scheduler priorities set to "%s"' %
+                  self.priorities)
+
+    @property
+    def deadlines(self):
+        return self._deadlines
+
+    def set_deadlines(self, values):
+        self._deadlines.update(values)
+        log.debug('Comms scheduler deadlines set to "%s"' % self.deadlines)
+
+    @property
+    def default_priority(self):
+        return self._default_priority
+
+    @property
+    def stats(self):
+        return self._stats
+
+    def template(self, event):
+        """Extract the template token from comms *event*.
+
+        **Returns:**
+            the template token or ``None`` if *event* does not conform
+            to the comms event format
+
+        """
+        template = None
+
+        m = EVENT_RE.match(os.path.basename(event))
+        if m:
+            template = m.group(3)
+
+        return template
+
+    def priority(self, template):
+        return self.priorities.get(template, self.default_priority)
+
+    def deadline(self, template):
+        return self.deadlines.get(template)
+
+    def schedule(self, events, created=None, now=None):
+        """Order *events* for sending and refresh the :attr:`stats`.
+
+        **Args:**
+            *events*: list of comms event references
+
+        **Kwargs:**
+            *created*: dictionary of event creation times (epoch
+            seconds) keyed by event.  Events not listed are treated as
+            created *now*
+
+            *now*: override the current time (epoch seconds)
+
+        **Returns:**
+            list of *events* ordered by urgency
+
+        """
+        if created is None:
+            created = {}
+        if now is None:
+            now = time.time()
+
+        stats = {}
+        keyed = []
+        for event in events:
+            template = self.template(event)
+            created_ts = created.get(event, now)
+
+            due = float('inf')
+            deadline = self.deadline(template)
+            if deadline:
+                due = created_ts + deadline
+            overdue = now >= due
+
+            keyed.append(((not overdue,
+                           self.priority(template),
+                           due,
+                           created_ts,
+                           event), event))
+
+            wait = max(0.0, now - created_ts)
+            stat = stats.setdefault(template, {'depth': 0,
+                                               'overdue': 0,
+                                               'max_wait': 0.0,
+                                               'mean_wait': 0.0})
+            stat['depth'] += 1
+            stat['overdue'] += int(overdue)
+            stat['max_wait'] = max(stat['max_wait'], wait)
+            stat['mean_wait'] += wait
+
+        for stat in stats.values():
+            stat['mean_wait'] /= stat['depth']
+        self._stats = stats
+
+        keyed.sort()
+
+        return [x[1] for x in keyed]
+
+    def report(self):
+        """Summarise the :attr:`stats` for logging.
+
+        **Returns:**
+            string of per-template queue depth and wait times
+
+        """
+        report = []
+        for template in sorted(self.stats.keys()):
+            stat = self.stats[template]
+            report.append('%s: depth=%d overdue=%d max_wait=%.0fs '
+                          'mean_wait=%.0fs' % (template,
+                                               stat['depth'],
+                                               stat['overdue'],
+                                               stat['max_wait'],
+                                               stat['mean_wait']))
+
+        return 'Comms queue -- %s' % ', '.join(report)
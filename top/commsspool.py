@@ -0,0 +1,574 @@
+__all__ = [
+    "CommsSpool",
+    "SqliteCommsSpool",
+    "create_comms_spool",
+]
+import os
+import time
+try:
+    import sqlite3
+except ImportError:
+    # Python < 2.5.
+    from pysqlite2 import dbapi2 as sqlite3
+
+from top.utils.log import log
+from top.utils.files import (create_dir,
+                             get_directory_files_list,
+                             remove_files,
+                             move_file)
+
+
+class CommsSpool(object):
+    """File based comms event spool.
+
+    Each comms event is an empty file in :attr:`comms_dir` named
+    ``<action>.<job_item.id>.<template>``.  Events that fail are moved
+    aside to ``<action>.<job_item.id>.<template>.err``.
+
+    An event is referenced by its absolute file path.  The event states
+    are:
+
+    * *new* -- event file exists (:meth:`enqueue`)
+
+    * *claimed* -- returned by :meth:`claim`.  The file backend does
+      not track claims so an event is *new* until it is completed or
+      errored
+
+    * *complete* -- event removed from the spool (:meth:`complete`)
+
+    * *error* -- event moved aside (:meth:`error`)
+
+    * *retry* -- event failed and is waiting to be retried
+      (:meth:`retry`).  The retry state ``<attempts> <next_ts>`` is
+      kept in the ``<action>.<job_item.id>.<template>.retry`` sidecar
+      file and the event file is removed.  :meth:`claim` recreates the
+      event file once *next_ts* has passed.  The sidecar is removed
+      when the event is completed or errored so that the event file
+      itself never carries retry state
+
+    .. attribute:: comms_dir
+
+        directory where comms event files are kept
+
+    """
+    _comms_dir = None
+
+    def __init__(self, comms_dir=None):
+        """:class:`top.CommsSpool` initialiser.
+        """
+        if comms_dir is not None:
+            self.set_comms_dir(comms_dir)
+
+    @property
+    def comms_dir(self):
+        return self._comms_dir
+
+    def set_comms_dir(self, value):
+        self._comms_dir = value
+        log.debug('Comms spool comms_dir set to "%s"' % self.comms_dir)
+
+    def event_name(self, action, id, template):
+        """Comms event name (filename) for *action*, *id* and *template*.
+
+        **Returns:**
+            string of the form ``<action>.<id>.<template>``
+
+        """
+        return '%s.%d.%s' % (action, id, template)
+
+    def enqueue(self, action, id, template, dry=False):
+        """Add a comms event to the spool.
+
+        **Args:**
+            *action*: type of communication (either ``sms`` or ``email``)
+
+            *id*: the ``job_item.id`` for comms
+
+            *template*: the comms service template
+
+        **Kwargs:**
+            *dry*: only report, do not actually execute
+
+        **Returns:**
+            ``True`` for processing success
+
+            ``False`` for processing failure
+
+        """
+        status = True
+
+        comms_file = os.path.join(self.comms_dir,
+                                  self.event_name(action, id, template))
+        log.info('Writing comms file to "%s"' % comms_file)
+        try:
+            if not dry:
+                fh = open(comms_file, 'w')
+                fh.close()
+                self._remove_retry(comms_file)
+        except IOError, err:
+            log.error('Unable to open comms file %s: %s' % (comms_file, err))
+            status = False
+
+        return status
+
+    def exists(self, action, id, template):
+        """Check if the comms event is already spooled (in any state
+        other than complete).
+
+        **Args:**
+            *action*: type of communication (either ``sms`` or ``email``)
+
+            *id*: the ``job_item.id`` for comms
+
+            *template*: the comms service template
+
+        **Returns:**
+            ``True`` comms event has previously been set
+
+            ``False`` comms event has not been previously set
+
+        """
+        comms_file = os.path.join(self.comms_dir,
+                                  self.event_name(action, id, template))
+
+        return (os.path.exists(comms_file + '.err') or
+                os.path.exists(comms_file + '.retry') or
+                os.path.exists(comms_file))
+
+    def claim(self, template=None):
+        """Return the *new* comms events for processing.
+
+        **Kwargs:**
+            *template*: template token to filter comms events against
+
+        **Returns:**
+            list of comms event references (absolute file paths)
+
+        """
+        filter = '^(email|sms)\.(\d+)\.(\w+)$'
+        if template is not None:
+            filter = '^(email|sms)\.(\d+)\.(%s)$' % template
+
+        # Return retries that are due.
+        now = time.time()
+        for retry_file in get_directory_files_list(self.comms_dir,
+                                                   filter[:-1] +
+                                                   '\.retry$'):
+            event = retry_file[:-len('.retry')]
+            if os.path.exists(event):
+                continue
+
+            (attempts, next_ts) = self._read_retry(retry_file)
+            if next_ts <= now:
+                log.debug('Comms retry "%s" is due' % retry_file)
+                try:
+                    fh = open(event, 'w')
+                    fh.close()
+                except IOError, err:
+                    log.error('Unable to requeue comms retry %s: %s' %
+                              (event, err))
+
+        return get_directory_files_list(self.comms_dir, filter)
+
+    def _remove_retry(self, event):
+        retry_file = event + '.retry'
+        if os.path.exists(retry_file):
+            remove_files(retry_file)
+
+    def _read_retry(self, event):
+        attempts = 0
+        next_ts = 0.0
+
+        try:
+            fh = open(event)
+            tokens = fh.read().split()
+            fh.close()
+            if len(tokens) == 2:
+                attempts = int(tokens[0])
+                next_ts = float(tokens[1])
+        except (IOError, ValueError), err:
+            log.debug('Unable to read comms retry %s: %s' % (event, err))
+
+        return (attempts, next_ts)
+
+    def attempts(self, event):
+        """Number of failed attempts recorded against comms *event*.
+
+        **Args:**
+            *event*: comms event reference as returned by :meth:`claim`
+
+        **Returns:**
+            integer count of previous attempts
+
+        """
+        return self._read_retry(event + '.retry')[0]
+
+    def retry(self, event, attempts, next_ts, dry=False):
+        """Flag comms *event* to be retried.
+
+        **Args:**
+            *event*: comms event reference as returned by :meth:`claim`
+
+            *attempts*: number of failed attempts so far
+
+            *next_ts*: time (epoch seconds) after which the event can be
+            claimed again
+
+        **Kwargs:**
+            *dry*: only report, do not actually execute
+
+        """
+        log.info('Comms event "%s" retry after attempt %d at %s' %
+                 (event, attempts, time.ctime(next_ts)))
+        if not dry:
+            try:
+                fh = open(event + '.retry', 'w')
+                fh.write('%d %f\n' % (attempts, next_ts))
+                fh.close()
+                remove_files(event)
+            except IOError, err:
+                log.error('Unable to flag comms retry %s: %s' %
+                          (event, err))
+
+    def created(self, events):
+        """Source the creation time of *events*.
+
+        **Args:**
+            *events*: list of comms event references
+
+        **Returns:**
+            dictionary of event creation times (epoch seconds) keyed by
+            event.  Events that no longer exist are not included
+
+        """
+        created = {}
+
+        for event in events:
+            try:
+                created[event] = os.path.getmtime(event)
+            except OSError, err:
+                log.debug('Unable to stat comms file %s: %s' % (event, err))
+
+        return created
+
+    def release(self):
+        """Return events that were claimed but not completed (for
+        example, after an unclean shutdown) back to the *new* state.
+        Nothing to do for the file backend.
+        """
+        pass
+
+    def complete(self, event, dry=False):
+        """Remove a successfully processed comms *event* from the spool.
+
+        **Args:**
+            *event*: comms event reference as returned by :meth:`claim`
+
+        **Kwargs:**
+            *dry*: only report, do not actually execute
+
+        """
+        log.info('Removing comms file: "%s"' % event)
+        if not dry:
+            remove_files(event)
+            self._remove_retry(event)
+
+    def error(self, event, dry=False):
+        """Flag comms *event* as errored.
+
+        **Args:**
+            *event*: comms event reference as returned by :meth:`claim`
+
+        **Kwargs:**
+            *dry*: only report, do not actually execute
+
+        """
+        move_file(event, event + '.err', err=True, dry=dry)
+        if not dry:
+            self._remove_retry(event)
+
+    def errored(self, event):
+        """Check if comms *event* has been flagged as errored.
+
+        **Args:**
+            *event*: comms event reference.  For example,
+            ``<comms_dir>/email.<job_item.id>.body``
+
+        **Returns:**
+            boolean ``True`` if the comms event has errored
+
+            boolean ``False`` otherwise
+
+        """
+        return os.path.exists(event + '.err')
+
+
+class SqliteCommsSpool(CommsSpool):
+    """Comms event spool backed by a local SQLite database.
+
+    Avoids the one file per comms event overhead of the file based
+    :class:`top.CommsSpool`.  The database is placed in
+    :attr:`comms_dir` and opened in WAL mode so that the loader,
+    on delivery and reminder facilities can enqueue events while the
+    comms facility claims them.
+
+    Events are referenced by the same
+    ``<comms_dir>/<action>.<id>.<template>`` path as the file backend so
+    that :class:`top.Comms` can process either.
+
+    .. attribute:: db_file
+
+        name of the SQLite database file within :attr:`comms_dir`
+        (default ``comms_spool.db``)
+
+    """
+    _db_file = 'comms_spool.db'
+    _connection = None
+
+    def __init__(self, comms_dir=None, db_file=None):
+        """:class:`top.SqliteCommsSpool` initialiser.
+        """
+        if db_file is not None:
+            self._db_file = db_file
+
+        super(SqliteCommsSpool, self).__init__(comms_dir=comms_dir)
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def db_file(self):
+        return self._db_file
+
+    def set_comms_dir(self, value):
+        self.close()
+        super(SqliteCommsSpool, self).set_comms_dir(value)
+
+    @property
+    def connection(self):
+        """Lazily open (and initialise) the spool database.
+        """
+        if self._connection is None:
+            create_dir(self.comms_dir)
+            path = os.path.join(self.comms_dir, self.db_file)
+            log.debug('Opening comms spool "%s"' % path)
+            self._connection = sqlite3.connect(path,
+                                               timeout=30,
+                                               isolation_level=None)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS
+comms_event (
+    event TEXT PRIMARY KEY,
+    action TEXT NOT NULL,
+    job_item_id INTEGER NOT NULL,
+    template TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_ts REAL NOT NULL,
+    claimed_ts REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_ts REAL)""")
+            self._connection.execute("""CREATE INDEX IF NOT EXISTS
+comms_event_status_idx ON comms_event (status, template)""")
+
+            # Spools created before retries were supported.
+            cursor = self._connection.execute('PRAGMA table_info(comms_event)')
+            columns = [x[1] for x in cursor.fetchall()]
+            if 'attempts' not in columns:
+                self._connection.execute("""ALTER TABLE comms_event
+ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0""")
+            if 'next_ts' not in columns:
+                self._connection.execute("""ALTER TABLE comms_event
+ADD COLUMN next_ts REAL""")
+
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def enqueue(self, action, id, template, dry=False):
+        """Add a comms event to the spool.  Re-enqueueing an errored
+        event returns it to the *new* state.
+
+        See :meth:`top.CommsSpool.enqueue`.
+
+        """
+        status = True
+
+        event = self.event_name(action, id, template)
+        log.info('Spooling comms event "%s"' % event)
+        if not dry:
+            try:
+                conn = self.connection
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute("""INSERT OR IGNORE INTO comms_event
+(event, action, job_item_id, template, status, created_ts)
+VALUES (?, ?, ?, ?, 'new', ?)""", (event, action, id, template, time.time()))
+                conn.execute("""UPDATE comms_event
+SET status = 'new', claimed_ts = NULL, attempts = 0, next_ts = NULL
+WHERE event = ? AND status = 'error'""", (event,))
+                conn.execute('COMMIT')
+            except sqlite3.Error, err:
+                log.error('Unable to spool comms event %s: %s' %
+                          (event, err))
+                self.rollback()
+                status = False
+
+        return status
+
+    def exists(self, action, id, template):
+        """See :meth:`top.CommsSpool.exists`.
+        """
+        event = self.event_name(action, id, template)
+        cursor = self.connection.execute("""SELECT 1
+FROM comms_event
+WHERE event = ?""", (event,))
+
+        return cursor.fetchone() is not None
+
+    def claim(self, template=None):
+        """Return the *new* comms events for processing and mark them as
+        *claimed*.
+
+        See :meth:`top.CommsSpool.claim`.
+
+        """
+        now = time.time()
+        sql = """SELECT event
+FROM comms_event
+WHERE status = 'new'
+AND (next_ts IS NULL OR next_ts <= ?)"""
+        args = (now,)
+        if template is not None:
+            sql += ' AND template = ?'
+            args = (now, template)
+        sql += '\nORDER BY created_ts, event'
+
+        events = []
+        conn = self.connection
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            events = [row[0] for row in conn.execute(sql, args)]
+            conn.executemany("""UPDATE comms_event
+SET status = 'claimed', claimed_ts = ?
+WHERE event = ?""", [(now, x) for x in events])
+            conn.execute('COMMIT')
+        except sqlite3.Error, err:
+            log.error('Unable to claim comms events: %s' % err)
+            self.rollback()
+            events = []
+
+        return [os.path.join(self.comms_dir, x) for x in events]
+
+    def attempts(self, event):
+        """See :meth:`top.CommsSpool.attempts`.
+        """
+        attempts = 0
+
+        cursor = self.connection.execute("""SELECT attempts
+FROM comms_event
+WHERE event = ?""", (os.path.basename(event),))
+        row = cursor.fetchone()
+        if row is not None:
+            attempts = row[0]
+
+        return attempts
+
+    def retry(self, event, attempts, next_ts, dry=False):
+        """See :meth:`top.CommsSpool.retry`.
+        """
+        log.info('Comms event "%s" retry after attempt %d at %s' %
+                 (event, attempts, time.ctime(next_ts)))
+        if not dry:
+            self.connection.execute("""UPDATE comms_event
+SET status = 'new', claimed_ts = NULL, attempts = ?, next_ts = ?
+WHERE event = ?""", (attempts, next_ts, os.path.basename(event)))
+
+    def created(self, events, chunk_size=500):
+        """See :meth:`top.CommsSpool.created`.
+        """
+        created = {}
+
+        paths = dict([(os.path.basename(x), x) for x in events])
+        names = paths.keys()
+        for i in range(0, len(names), chunk_size):
+            chunk = names[i:i + chunk_size]
+            sql = """SELECT event, created_ts
+FROM comms_event
+WHERE event IN (%s)""" % ', '.join(['?'] * len(chunk))
+            for (event, created_ts) in self.connection.execute(sql, chunk):
+                created[paths[event]] = created_ts
+
+        return created
+
+    def release(self):
+        """See :meth:`top.CommsSpool.release`.
+        """
+        cursor = self.connection.execute("""UPDATE comms_event
+SET status = 'new', claimed_ts = NULL
+WHERE status = 'claimed'""")
+        log.debug('Comms spool released %d claimed events' %
+                  cursor.rowcount)
+
+    def complete(self, event, dry=False):
+        """See :meth:`top.CommsSpool.complete`.
+        """
+        log.info('Completing comms event: "%s"' % event)
+        if not dry:
+            self.connection.execute("""DELETE FROM comms_event
+WHERE event = ?""", (os.path.basename(event),))
+
+    def error(self, event, dry=False):
+        """See :meth:`top.CommsSpool.error`.
+        """
+        log.info('Flagging comms event "%s" as errored' % event)
+        if not dry:
+            self.connection.execute("""UPDATE comms_event
+SET status = 'error'
+WHERE event = ?""", (os.path.basename(event),))
+
+    def errored(self, event):
+        """See :meth:`top.CommsSpool.errored`.
+        """
+        cursor = self.connection.execute("""SELECT 1
+FROM comms_event
+WHERE event = ? AND status = 'error'""", (os.path.basename(event),))
+
+        return cursor.fetchone() is not None
+
+    def rollback(self):
+        try:
+            self.connection.execute('ROLLBACK')
+        except sqlite3.Error:
+            pass
+
+
+SPOOL_BACKENDS = {'file': CommsSpool,
+                  'sqlite': SqliteCommsSpool}
+
+
+def create_comms_spool(comms_dir, backend=None):
+    """Comms spool factory.
+
+    **Args:**
+        *comms_dir*: directory where the comms events are kept
+
+    **Kwargs:**
+        *backend*: name of the spool backend.  Either ``file``
+        (default) or ``sqlite``
+
+    **Returns:**
+        :class:`top.CommsSpool` type object
+
+    """
+    if backend is None:
+        backend = 'file'
+
+    spool_class = SPOOL_BACKENDS.get(backend)
+    if spool_class is None:
+        log.error('Unknown comms spool backend "%s" -- using "file"' %
+                  backend)
+        spool_class = CommsSpool
+
+    return spool_class(comms_dir=comms_dir)
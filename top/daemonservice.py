@@ -1,10 +1,14 @@
 __all__ = [
     "DaemonService",
 ]
+import os
+import re
+import time
+
 import top
 from top.utils.log import log
-from top.utils.files import (get_directory_files,
-                             check_filename)
+from top.utils.files import FileScanner
+from top.utils.inotify import Inotify
 from top.utils.setter import (set_scalar,
                               set_list)
 
@@ -56,6 +60,16 @@ class DaemonService(top.utils.Daemon):
 
         hostname of the production instance
 
+    .. attribute:: inotify
+
+        boolean flag to wake the processing loop on inbound file events
+        rather than sleeping for the full :attr:`loop` period
+
+    .. attribute:: scanner
+
+        :class:`top.utils.files.FileScanner` that remembers the inbound
+        files seen between processing iterations
+
     """
     _prod = None
     _support_emails = []
@@ -69,6 +83,9 @@ class DaemonService(top.utils.Daemon):
     _reporter = top.Reporter()
     _loop = 30
     _archive_base = None
+    _scanner = None
+    _inotify = False
+    _watcher = None
 
     @property
     def prod(self):
@@ -103,17 +120,23 @@ class DaemonService(top.utils.Daemon):
                                                       'support',
                                                       var='support_emails',
                                                       is_list=True)
+            inotify = self.config.parse_scalar_config('timeout',
+                                                      'inotify',
+                                                      cast_type='int')
             # Now, parse the daemon-specific config items.
             self.config.parse_config()
             if prod is not None:
                 self.set_prod(prod.lower())
             self.set_support_emails(support)
+            if inotify is not None:
+                self.set_inotify(bool(inotify))
 
         self._facility = self.__class__.__name__
 
         self._file = file
         self._dry = dry
         self._batch = batch
+        self._scanner = FileScanner()
 
     @property
     def config(self):
@@ -177,6 +200,82 @@ class DaemonService(top.utils.Daemon):
         log.debug('%s archive_base set to "%s"' %
                   (self.facility, self._archive_base))
 
+    @property
+    def inotify(self):
+        return self._inotify
+
+    @set_scalar
+    def set_inotify(self, value):
+        pass
+
+    @property
+    def scanner(self):
+        return self._scanner
+
+    def wait(self, timeout, dirs=None, ignore=None):
+        """Pause between processing iterations.
+
+        If :attr:`inotify` is set then the pause ends as soon as a file
+        is closed after writing (or moved) into one of *dirs*.  Otherwise,
+        or if inotify is not supported, sleep for *timeout* seconds.
+
+        Events for files that no longer exist (for example, files the
+        daemon itself has since moved on) or whose name matches *ignore*
+        do not end the pause.
+
+        **Args:**
+            *timeout*: maximum time (seconds) to pause
+
+        **Kwargs:**
+            *dirs*: list of inbound directories to watch
+
+            *ignore*: regular expression of file names that do not end
+            the pause.  For example, ``'\\.err$'``
+
+        **Returns:**
+            list of the inbound files that ended the pause
+
+        """
+        files = []
+
+        if self.inotify and dirs:
+            if self._watcher is None:
+                self._watcher = Inotify()
+                self._watcher.open()
+
+            for dir in dirs:
+                self._watcher.add_watch(dir)
+
+            ignore_re = None
+            if ignore is not None:
+                ignore_re = re.compile(ignore)
+
+            deadline = time.time() + timeout
+            remaining = timeout
+            while remaining > 0 and not files:
+                events = self._watcher.wait(remaining)
+                if not events:
+                    # Timed out (or interrupted by a signal).
+                    break
+
+                for file in events:
+                    if not os.path.exists(file):
+                        continue
+                    if (ignore_re is not None and
+                        ignore_re.search(os.path.basename(file))):
+                        continue
+                    files.append(file)
+
+                remaining = deadline - time.time()
+
+            if files:
+                log.info('%s woken by inbound files: "%s"' %
+                         (self.facility, str(files)))
+        else:
+            time.sleep(timeout)
+
+        return files
+
     def create_table(self, items):
         """Takes a list of *items* and generates string based, variable
         table content that can feed into a static string template.
@@ -282,15 +381,13 @@ class DaemonService(top.utils.Daemon):
         if dir is not None:
             dirs_to_check = dir
 
-        for dir_to_check in dirs_to_check:
-            log.debug('Looking for files at: %s ...' % dir_to_check)
-            for file in get_directory_files(dir_to_check):
-                for format in formats:
-                    if (check_filename(file, format)):
-                        log.info('Found file: %s' % file)
-                        files_to_process.append(file)
+        if formats:
+            self.scanner.set_formats(formats)
+            self.scanner.set_validator()
+            files_to_process.extend(self.scanner.scan(dirs_to_check))
+            for file in files_to_process:
+                log.info('Found file: %s' % file)
 
-        files_to_process.sort()
         log.debug('Files set to be processed: "%s"' % str(files_to_process))
 
         return files_to_process
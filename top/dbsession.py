@@ -20,10 +20,24 @@ class DbSession(object):
         string value that captures the database type (for example,
         ``sqlite`` or ``MSSQL``)
 
+    .. attribute:: insert_chunk_size
+
+        maximum number of rows per multi-row ``INSERT`` statement
+        (default 1000 which is the MSSQL row value expression limit)
+
+    .. attribute:: stmt_cache_size
+
+        maximum number of parameterised statements that keep their own
+        (prepared) cursor.  The least recently used statement cursor is
+        closed once the limit is reached (default 20)
+
     """
     _connection = None
     _cursor = None
+    _result_cursor = None
     _db_type = None
+    _insert_chunk_size = 1000
+    _stmt_cache_size = 20
     _job = top.Job()
     _jobitem = top.JobItem()
     _agent = top.Agent()
@@ -44,14 +58,24 @@ class DbSession(object):
         self._user = kwargs.get('user')
         self._password = kwargs.get('password')
         self._port = kwargs.get('port')
+        if kwargs.get('stmt_cache_size') is not None:
+            self.set_stmt_cache_size(kwargs.get('stmt_cache_size'))
+
+        self._statements = {}
+        self._statement_order = []
 
-    def __call__(self, sql=None):
+    def __call__(self, sql=None, params=None):
         """Class callable that can execute *sql* or perform a simple
         connection check if *sql* is ``None``.
 
         **Kwargs:**
             *sql*: the SQL string to execute
 
+            *params*: list of values for the ``?`` placeholders in *sql*.
+            Parameterised *sql* is executed on its own statement cursor
+            (see :meth:`statement_cursor`) so that the prepared
+            statement is reused by the next execution of *sql*
+
         **Returns:**
             boolean ``True`` if the connection is alive
 
@@ -64,7 +88,14 @@ class DbSession(object):
             try:
                 log.debug('Executing SQL:\n%s' % sql)
                 try:
-                    self.cursor.execute(sql)
+                    if params is None:
+                        cursor = self.cursor
+                        cursor.execute(sql)
+                    else:
+                        log.debug('SQL parameters: %s' % str(params))
+                        cursor = self.statement_cursor(sql)
+                        cursor.execute(sql, params)
+                    self._result_cursor = cursor
                     is_alive = True
                 except Exception, err:
                     log.error('SQL "%s" failed: %s' % (sql, err))
@@ -101,7 +132,7 @@ class DbSession(object):
 
     @property
     def row(self):
-        return self.cursor.fetchone()
+        return self.result_cursor.fetchone()
 
     @property
     def host(self):
@@ -113,6 +144,81 @@ class DbSession(object):
 
     def set_cursor(self, value):
         self._cursor = value
+        self._result_cursor = None
+
+    @property
+    def result_cursor(self):
+        """Cursor of the last executed SQL.
+        """
+        cursor = self._result_cursor
+        if cursor is None:
+            cursor = self.cursor
+
+        return cursor
+
+    @property
+    def stmt_cache_size(self):
+        return self._stmt_cache_size
+
+    def set_stmt_cache_size(self, value):
+        self._stmt_cache_size = value
+        log.debug('Set statement cache size to %d' % self.stmt_cache_size)
+
+    @property
+    def statements(self):
+        return self._statements
+
+    def statement_cursor(self, sql):
+        """Return the cursor dedicated to parameterised *sql*.
+
+        The ODBC driver only keeps the prepared statement of the last
+        SQL executed on a cursor.  Giving each statement shape its own
+        cursor lets the hot statements that are interleaved with other
+        SQL (for example, an ``INSERT`` followed by a ``SELECT``) be
+        prepared once and re-executed with new parameter values.
+
+        **Args:**
+            *sql*: the parameterised SQL string
+
+        **Returns:**
+            the cursor object
+
+        """
+        cursor = self._statements.get(sql)
+
+        if cursor is None:
+            if len(self._statement_order) >= max(self.stmt_cache_size, 1):
+                expired = self._statement_order.pop(0)
+                log.debug('Closing statement cursor:\n%s' % expired)
+                self._close_cursor(self._statements.pop(expired))
+
+            cursor = self.connection.cursor()
+            self._statements[sql] = cursor
+        else:
+            self._statement_order.remove(sql)
+
+        self._statement_order.append(sql)
+
+        return cursor
+
+    def clear_statements(self):
+        """Close the cached statement cursors.
+        """
+        for cursor in self._statements.values():
+            self._close_cursor(cursor)
+
+        self._statements.clear()
+        del self._statement_order[:]
+        self._result_cursor = None
+
+    def _close_cursor(self, cursor):
+        if cursor is self._result_cursor:
+            self._result_cursor = None
+
+        try:
+            cursor.close()
+        except Exception, err:
+            log.warn('Statement cursor close error: %s' % err)
 
     @property
     def db_type(self):
@@ -122,6 +228,14 @@ class DbSession(object):
         self._db_type = value
         log.debug('Set DB type to "%s"' % self.db_type)
 
+    @property
+    def insert_chunk_size(self):
+        return self._insert_chunk_size
+
+    def set_insert_chunk_size(self, value):
+        self._insert_chunk_size = value
+        log.debug('Set insert chunk size to %d' % self.insert_chunk_size)
+
     @property
     def connection(self):
         return self._connection
@@ -187,7 +301,7 @@ class DbSession(object):
     def rows(self):
         """
         """
-        for row in self.cursor.fetchall():
+        for row in self.result_cursor.fetchall():
             yield row
 
     def set_connection(self, value):
@@ -265,6 +379,7 @@ class DbSession(object):
     def disconnect(self):
         log.info('Disconnecting from DB ...')
         if self.connection is not None:
+            self.clear_statements()
             self._cursor.close()
             self._cursor = None
             self.connection.close()
@@ -272,23 +387,111 @@ class DbSession(object):
         else:
             log.warn('No DB connection detected')
 
-    def insert(self, sql):
-        """
+    def insert(self, sql, params=None):
+        """Execute the insert *sql* and return the new row id.
+
+        **Args:**
+            *sql*: the SQL DML insert string
+
+        **Kwargs:**
+            *params*: list of values for the ``?`` placeholders in *sql*.
+            A prepared MSSQL statement runs in its own scope so
+            ``SCOPE_IDENTITY()`` can not see its identity.  Parameterised
+            MSSQL *sql* must return the new id via an ``OUTPUT
+            INSERTED.id`` clause instead (see :meth:`insert_params`)
+
+        **Returns:**
+            the new row id
+
         """
         id = None
 
-        self(sql)
+        self(sql, params)
 
         # sqlite and MSSQL implement this differently.
         if self.host is None:
             self('SELECT last_insert_rowid()')
-        else:
+        elif params is None:
             self('SELECT SCOPE_IDENTITY()')
 
-        id = self.cursor.fetchone()[0]
+        id = self.result_cursor.fetchone()[0]
 
         return id
 
+    def insert_params(self, table, kwargs):
+        """Parameterised variant of :meth:`insert` that builds the
+        insert DML from the *table* column name and value dictionary
+        *kwargs*.
+
+        **Args:**
+            *table*: a table ORM object to insert into
+
+            *kwargs*: the table column name and values to insert
+
+        **Returns:**
+            the new row id
+
+        """
+        output = None
+        if self.host is not None:
+            output = ['id']
+
+        (sql, params) = table.insert_params_sql(kwargs, output=output)
+
+        return self.insert(sql, params)
+
+    def insert_many(self, table, rows, key):
+        """Insert a list of *rows* into *table* and return the new row ids.
+
+        MSSQL inserts are issued as multi-row ``INSERT`` statements (in
+        chunks of :attr:`insert_chunk_size` rows) that return the identity
+        values via an ``OUTPUT INSERTED`` clause.  As SQL Server does not
+        guarantee the order of the ``OUTPUT`` rows, the identities are
+        matched back to *rows* against the *key* column.  The *key* values
+        must therefore be unique across *rows*.
+
+        sqlite does not support the ``OUTPUT`` clause so each row is
+        inserted in turn via :meth:`insert`.
+
+        **Args:**
+            *table*: a table ORM object to insert into
+
+            *rows*: list of table column name and value dictionaries
+
+            *key*: column name in *rows* that uniquely identifies a row
+
+        **Returns:**
+            list of the new row ids in the same order as *rows*.  Rows
+            whose id could not be resolved are set to ``None``
+
+        """
+        ids = []
+
+        if self.host is None:
+            for row in rows:
+                ids.append(self.insert(table.insert_sql(row)))
+        else:
+            for i in range(0, len(rows), self.insert_chunk_size):
+                chunk = rows[i:i + self.insert_chunk_size]
+                sql = table.insert_many_sql(chunk, output=['id', key])
+
+                inserted = {}
+                if self(sql):
+                    for (id, value) in self.rows():
+                        if isinstance(value, str):
+                            value = value.rstrip()
+                        inserted[value] = id
+
+                for row in chunk:
+                    value = row.get(key)
+                    if isinstance(value, str):
+                        value = value.rstrip()
+                    ids.append(inserted.get(value))
+
+        log.debug('Table "%s" bulk insert ids: %s' % (table.name, ids))
+
+        return ids
+
     def commit(self):
         """
         """
@@ -314,8 +517,8 @@ class DbSession(object):
         """Return a list of column names within the current cursor context.
         """
         cols = []
-        if self.cursor.description is not None:
-            cols = list(map(lambda x: x[0], self.cursor.description))
+        if self.result_cursor.description is not None:
+            cols = list(map(lambda x: x[0], self.result_cursor.description))
 
         return cols
 
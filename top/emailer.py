@@ -2,17 +2,94 @@ __all__ = [
     "Emailer",
 ]
 import os
+import uuid
 import smtplib
 from email.MIMEText import MIMEText
-from email.MIMEMultipart import MIMEMultipart
 from email.MIMEBase import MIMEBase
+from email.MIMEImage import MIMEImage
+from email.Header import Header
 from email import Encoders
 import getpass
 from socket import gaierror, getfqdn
 
 import top
 from top.utils.log import log
-from top.utils.files import templater
+from top.utils.files import (templater,
+                             wrapped_templater)
+
+# Process-wide cache of serialised (base64 encoded) MIME parts for
+# static files such as attachments and inline images.  Keyed by
+# (path, inline).  Values are tuples of the file's (mtime, size)
+# signature and the serialised part.
+PART_CACHE = {}
+
+HTML_PART_HEADERS = ('Content-Type: text/html; charset="us-ascii"\n'
+                     'MIME-Version: 1.0\n'
+                     'Content-Transfer-Encoding: 7bit\n')
+
+
+def get_mime_part(path, inline=False):
+    """Source the serialised MIME part for file *path* from the
+    process-wide part cache.  The file is re-read and re-encoded only
+    when its modified time or size changes.
+
+    **Args:**
+        *path*: file to encode
+
+    **Kwargs:**
+        *inline*: if ``True``, *path* is an image that is embedded in
+        the HTML body and referenced as ``cid:<name>`` (where ``<name>``
+        is the file name less its extension).  Otherwise, *path* is an
+        ``application/octet-stream`` attachment
+
+    **Returns:**
+        the serialised MIME part string or ``None`` if *path* could not
+        be read
+
+    """
+    key = (path, inline)
+    try:
+        stat_info = os.stat(path)
+        signature = (stat_info.st_mtime, stat_info.st_size)
+    except OSError, err:
+        log.error('Unable to source MIME part file "%s": %s' % (path, err))
+        PART_CACHE.pop(key, None)
+        return None
+
+    cached = PART_CACHE.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    log.debug('Encoding MIME part file: "%s"' % path)
+    filename = os.path.basename(path)
+    f = open(path, 'rb')
+    try:
+        payload = f.read()
+    finally:
+        f.close()
+
+    if inline:
+        part = MIMEImage(payload)
+        part.add_header('Content-ID', '<%s>' % os.path.splitext(filename)[0])
+        part.add_header('Content-Disposition',
+                        'inline; filename="%s"' % filename)
+    else:
+        part = MIMEBase('application', "octet-stream")
+        part.set_payload(payload)
+        Encoders.encode_base64(part)
+        part.add_header('Content-Disposition',
+                        'attachment; filename="%s"' % filename)
+    part_string = part.as_string()
+
+    PART_CACHE[key] = (signature, part_string)
+
+    return part_string
+
+
+def clear_part_cache():
+    """Remove all parts from the process-wide MIME part cache.
+    """
+    PART_CACHE.clear()
 
 
 class Emailer(top.EmailerBase):
@@ -28,9 +105,17 @@ class Emailer(top.EmailerBase):
 
         list of email addressed to send e-mail to
 
+    .. attribute:: images
+
+        list of image files that are embedded in every HTML email
+        created by :meth:`create_comms`.  Templates reference an image
+        as ``cid:<name>`` where ``<name>`` is the file name less its
+        extension (for example, ``cid:toll_logo``)
+
     """
     _sender = None
     _recipients = []
+    _images = []
 
     def __init__(self,
                  sender=None,
@@ -70,6 +155,18 @@ class Emailer(top.EmailerBase):
             log.debug('%s recipients set to: "%s" ' %
                       (self.facility, self.recipients))
 
+    @property
+    def images(self):
+        return self._images
+
+    def set_images(self, values=None):
+        self._images = []
+
+        if values is not None:
+            self._images.extend(values)
+            log.debug('%s images set to: "%s" ' %
+                      (self.facility, self.images))
+
     def send(self, subject=None, msg=None, mime_message=None, dry=False):
         """Send the *msg* or *mime_message*.
 
@@ -152,6 +249,7 @@ class Emailer(top.EmailerBase):
                      subject=None,
                      template='body',
                      files=None,
+                     images=None,
                      err=False,
                      prod=None):
         """Create the MIME multipart message that can feed directly into
@@ -160,6 +258,10 @@ class Emailer(top.EmailerBase):
         If current hostname matches *prod* then comms messages will be
         prepended with a special ``TEST ONLY`` descriptor.
 
+        The static parts of the message (attachments and inline images)
+        are sourced pre-encoded from the process-wide part cache so only
+        the headers and the HTML body are serialised for each message.
+
         **Args:**
             *data*: dictionary structure of items to expected by the HTML
             email templates::
@@ -177,6 +279,9 @@ class Emailer(top.EmailerBase):
 
             *files*: list of files to send as an attachment
 
+            *images*: list of image files to embed in the HTML body
+            (default :attr:`images`)
+
             *err*: email message error context flag.  If ``True``, context
             is error-based
 
@@ -199,14 +304,6 @@ class Emailer(top.EmailerBase):
             log.error('Subject email could not be generated')
             subject = str()
 
-        mime_msg = MIMEMultipart('related')
-        mime_msg['From'] = self.sender
-        mime_msg['To'] = ", ".join(self.recipients)
-        mime_msg['Subject'] = self.check_subject(subject, prod)
-
-        msgAlternative = MIMEMultipart('alternative')
-        mime_msg.attach(msgAlternative)
-
         err_html = None
         if err:
             path_to_err_template = os.path.join(template_dir, 'err_html.t')
@@ -226,41 +323,123 @@ class Emailer(top.EmailerBase):
             non_prod_html = str()
         data['non_prod'] = non_prod_html
 
-        # Build the email body portion.
+        # Build the email body portion plugged into the main HTML
+        # container (pre-composed and cached as a single template).
         html_body_template = 'email_%s_html.t' % template
         path_to_template = os.path.join(template_dir, html_body_template)
-        body_html = templater(path_to_template, **data)
-
-        # Attach files.
-        if files is not None:
-            for f in files:
-                log.debug('Attaching file: "%s"' % f)
-                part = MIMEBase('application', "octet-stream")
-                part.set_payload(open(f, "rb").read())
-                Encoders.encode_base64(part)
-                part.add_header('Content-Disposition',
-                                'attachment; filename="%s"' %
-                                os.path.basename(f))
-                msgAlternative.attach(part)
-
-        # Plug the body into the main HTML container.
-        main_html = None
-        if body_html is not None:
-            path_to_main_template = os.path.join(template_dir,
-                                                 'email_html.t')
-            main_html = templater(path_to_main_template, body=body_html)
+        path_to_main_template = os.path.join(template_dir, 'email_html.t')
+        main_html = wrapped_templater(path_to_template,
+                                      path_to_main_template,
+                                      **data)
 
         # Build the MIME message.
         mime_msg_string = None
         if main_html is not None:
-            mime_text = MIMEText(main_html, 'html')
-            msgAlternative.attach(mime_text)
-            mime_msg_string = mime_msg.as_string()
+            headers = [('From', self.sender),
+                       ('To', ", ".join(self.recipients)),
+                       ('Subject', self.check_subject(subject, prod))]
+            if images is None:
+                images = self.images
+            mime_msg_string = self.build_mime(headers,
+                                              main_html,
+                                              files=files,
+                                              images=images)
 
         log.debug('Complete MIME message: "%s"' % mime_msg_string)
 
         return mime_msg_string
 
+    def build_mime(self, headers, html, files=None, images=None):
+        """Serialise a ``multipart/related`` message of the form::
+
+            multipart/related
+                multipart/alternative
+                    <files> (application/octet-stream attachments)
+                    text/html (*html*)
+                <images> (inline)
+
+        The message is assembled directly from the cached, serialised
+        parts (see :func:`get_mime_part`) rather than from a tree of
+        :mod:`email` objects.  Files that cannot be read are skipped.
+
+        **Args:**
+            *headers*: list of (*name*, *value*) top level header tuples
+
+            *html*: the HTML body
+
+        **Kwargs:**
+            *files*: list of files to send as an attachment
+
+            *images*: list of image files to embed in the HTML body
+
+        **Returns:**
+            MIME multipart-formatted serialised string
+
+        """
+        attachments = []
+        for f in files or []:
+            log.debug('Attaching file: "%s"' % f)
+            attachments.append(get_mime_part(f))
+
+        inlines = []
+        for image in images or []:
+            log.debug('Embedding image: "%s"' % image)
+            inlines.append(get_mime_part(image, inline=True))
+
+        alternative_parts = [x for x in attachments if x is not None]
+        alternative_parts.append('%s\n%s' % (HTML_PART_HEADERS, html))
+        related_parts = [x for x in inlines if x is not None]
+
+        content = [html] + alternative_parts + related_parts
+        alternative_boundary = self._boundary(content)
+        related_boundary = self._boundary(content)
+
+        alternative = self._multipart('alternative',
+                                      alternative_boundary,
+                                      alternative_parts)
+        related = self._multipart('related',
+                                  related_boundary,
+                                  [alternative] + related_parts,
+                                  headers)
+
+        return related
+
+    def _boundary(self, content):
+        """Unique MIME boundary that does not occur in *content*.
+        """
+        while True:
+            boundary = '===============%s==' % uuid.uuid4().hex
+            if not [x for x in content if boundary in x]:
+                break
+
+        return boundary
+
+    def _multipart(self, subtype, boundary, parts, headers=None):
+        """Serialise a multipart entity as per
+        :class:`email.Generator.Generator`.
+        """
+        lines = ['Content-Type: multipart/%s; boundary="%s"' %
+                 (subtype, boundary),
+                 'MIME-Version: 1.0']
+        for (name, value) in headers or []:
+            try:
+                value.decode('us-ascii')
+                value = Header(value,
+                               maxlinelen=78,
+                               header_name=name).encode()
+            except UnicodeError:
+                pass
+            lines.append('%s: %s' % (name, value))
+        lines.append('')
+
+        delimiter = '\n--%s\n' % boundary
+
+        return ('%s\n--%s\n%s\n--%s--' %
+                ('\n'.join(lines),
+                 boundary,
+                 delimiter.join(parts),
+                 boundary))
+
     def check_subject(self, subject, prod):
         """Checks if current hostname matches *prod*.  If so, subject line
         is prepended with a special ``TEST ONLY`` descriptor.
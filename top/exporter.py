@@ -594,8 +594,8 @@ class Exporter(top.Service):
         time = self.db.date_now()
 
         log.info('Updating extracted timestamp for job_item.id: %d' % id)
-        sql = self.db.jobitem.upd_collected_sql(id, time)
-        self.db(sql)
+        (sql, params) = self.db.jobitem.upd_collected_params_sql(id, time)
+        self.db(sql, params)
         if not dry:
             self.db.commit()
 
@@ -758,9 +758,11 @@ class Exporter(top.Service):
                 rows = []
                 if connote is not None and item_nbr is not None:
                     # Check that the record exists in the table.
-                    sql = self.db.jobitem.connote_item_nbr_sql(connote,
-                                                            item_nbr)
-                    self.db(sql)
+                    jobitem = self.db.jobitem
+                    (sql,
+                     params) = jobitem.connote_item_nbr_params_sql(connote,
+                                                                   item_nbr)
+                    self.db(sql, params)
                     rows = list(self.db.rows())
                 else:
                     log.error('Invalid connote_nbr|item_nbr provided')
@@ -788,9 +790,10 @@ class Exporter(top.Service):
 
                 # ... and set the extract_ts.
                 update_keys['extract_ts'] = self.db.date_now()
-                dml = self.db.jobitem.update_sql(update_keys,
-                                                 keys=tuple(ids))
-                self.db(dml)
+                (dml,
+                 params) = self.db.jobitem.update_params_sql(update_keys,
+                                                             keys=tuple(ids))
+                self.db(dml, params)
                 if not dry:
                     self.db.commit()
 
@@ -2,7 +2,6 @@ __all__ = [
     "ExporterDaemon",
 ]
 import os
-import time
 import signal
 
 import top
@@ -170,4 +169,4 @@ class ExporterDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop)
@@ -2,16 +2,12 @@ __all__ = [
     "FilterDaemon",
 ]
 import signal
-import time
 import os
 import re
 
 import top
 from top.utils.log import log
-from top.utils.files import (check_eof_flag,
-                             get_directory_files,
-                             check_filename,
-                             create_dir,
+from top.utils.files import (create_dir,
                              move_file,
                              remove_files)
 from top.utils.setter import (set_scalar,
@@ -126,38 +122,33 @@ class FilterDaemon(top.DaemonService):
                 log.info('Processing file: "%s" ...' % file)
                 status = False
 
-                try:
-                    f = open(file, 'r')
-                except IOError, e:
+                reader = top.T1250Reader(file)
+                if not reader.open():
                     # TODO -- probably want to move file aside and send
                     # failure comms.
-                    log.error('File open error "%s": %s' % (file, str(e)))
                     continue
 
                 self.reporter.reset(identifier=file)
-                eof_found = False
-                for line in f:
-                    record = line.rstrip('\r\n')
-                    if record == '%%EOF':
-                        log.info('EOF found')
-                        status = True
-                        eof_found = True
-                        break
-                    else:
-                        filtered_status = False
-                        for dp, rules in self.filters.iteritems():
-                            filtered_status = filter.process(line, rules)
-                            if filtered_status:
-                                kwargs = {'data': line,
-                                          'fhs': fhs,
-                                          'delivery_partner': dp,
-                                          'infile': file,
-                                          'dry': self.dry}
-                                self.write(**kwargs)
-                                break
-
-                        self.reporter(filtered_status)
-                f.close()
+                for line in reader.lines():
+                    filtered_status = False
+                    for dp, rules in self.filters.iteritems():
+                        filtered_status = filter.process(line, rules)
+                        if filtered_status:
+                            kwargs = {'data': line,
+                                      'fhs': fhs,
+                                      'delivery_partner': dp,
+                                      'infile': file,
+                                      'dry': self.dry}
+                            self.write(**kwargs)
+                            break
+
+                    self.reporter(filtered_status)
+
+                eof_found = reader.eof_found
+                if eof_found:
+                    log.info('EOF found')
+                    status = True
+                reader.close()
                 self.close(fhs)
 
                 if status and eof_found:
@@ -186,7 +177,7 @@ class FilterDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop, dirs=self.in_dirs)
 
     def get_files(self, dirs=None):
         """Checks inbound directories (defined by the
@@ -204,27 +195,39 @@ class FilterDaemon(top.DaemonService):
             to be processed
 
         """
-        files_to_process = []
-
         dirs_to_check = []
         if dirs is not None:
             dirs_to_check.extend(dirs)
         else:
             dirs_to_check.extend(self.in_dirs)
 
-        for dir_to_check in dirs_to_check:
-            log.debug('Looking for files at: %s ...' % dir_to_check)
-            for file in get_directory_files(dir_to_check):
-                if (check_filename(file, self.file_format) and
-                    check_eof_flag(file)):
-                    log.info('Found file: "%s" ' % file)
-                    files_to_process.append(file)
+        self.scanner.set_formats([self.file_format])
+        self.scanner.set_validator(self.validate_inbound)
 
-        files_to_process.sort()
+        files_to_process = self.scanner.scan(dirs_to_check)
         log.debug('Files set to be processed: "%s"' % str(files_to_process))
 
         return files_to_process
 
+    def validate_inbound(self, file):
+        """Checks that inbound T1250 *file* is complete (contains the
+        T1250 EOF flag).
+
+        **Args:**
+            *file*: fully qualified path to the T1250 file
+
+        **Returns:**
+            boolean ``True`` if *file* can be processed
+
+            boolean ``False`` otherwise
+
+        """
+        status = top.T1250Reader(file).check_eof()
+        if status:
+            log.info('Found file: "%s" ' % file)
+
+        return status
+
     def get_outbound_file(self, delivery_partner, file, dir=None):
         """Generates the path to the outbound file resource for output
         of *file* processing.
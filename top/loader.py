@@ -2,10 +2,12 @@ __all__ = [
     "Loader",
 ]
 import re
+import os
 import inspect
 
 import top
 from top.utils.log import log
+from top.utils.cache import Cache
 from top.postcode import translate_postcode
 
 FIELDS = {'Conn Note': {'offset': 0,
@@ -96,16 +98,186 @@ JOB_ITEM_MAP = {'Conn Note': {
 
 class Loader(top.Service):
     """:class:`top.Loader` object structure.
-    """
 
-    def __init__(self, db=None, comms_dir=None):
+    .. attribute:: batch_size
+
+        number of new ``job``/``job_item`` records to accumulate before
+        they are written to the DB in bulk.  ``0`` (default) writes each
+        record as it is processed
+
+    .. attribute:: pending
+
+        list of ``job``/``job_item`` records that are queued for a bulk
+        write
+
+    .. attribute:: agent_cache
+
+        :class:`top.utils.cache.Cache` of ``agent.code`` to ``agent.id``
+        lookups.  ``None`` if caching is disabled
+
+    .. attribute:: dp_cache
+
+        :class:`top.utils.cache.Cache` of ``agent.id`` to Delivery
+        Partner name lookups.  ``None`` if caching is disabled
+
+    .. attribute:: prefetch_chunk_size
+
+        maximum number of values per ``IN (...)`` query issued by
+        :meth:`prefetch` (default 1000)
+
+    .. attribute:: agent_stamp
+
+        file that is touched whenever the ``agent`` table is changed.
+        A modified time later than the last check invalidates the
+        agent caches
+
+    """
+    _batch_size = 0
+    _prefetch_chunk_size = 1000
+    _agent_cache = None
+    _dp_cache = None
+    _agent_stamp = None
+    _agent_stamp_mtime = None
+
+    def __init__(self,
+                 db=None,
+                 comms_dir=None,
+                 comms_spool=None,
+                 batch_size=None,
+                 agent_cache_size=None,
+                 agent_cache_ttl=None):
         """:class:`top.Loader` initialiser.
 
+        Agent lookup caching is only enabled if *agent_cache_size* is
+        provided.
+
         """
-        top.Service.__init__(self, db=db, comms_dir=comms_dir)
+        top.Service.__init__(self,
+                             db=db,
+                             comms_dir=comms_dir,
+                             comms_spool=comms_spool)
 
         self.parser = top.Parser(fields=FIELDS)
 
+        self._pending = []
+        self._pending_barcodes = set()
+        self._pending_jobitems = set()
+        self._pending_job_ids = set()
+
+        self._barcode_index = {}
+        self._prefetched_connotes = set()
+        self._jobitem_index = {}
+        self._jobitem_job_index = {}
+
+        if batch_size is not None:
+            self.set_batch_size(batch_size)
+
+        if agent_cache_size:
+            self._agent_cache = Cache(max_size=agent_cache_size,
+                                      ttl=agent_cache_ttl)
+            self._dp_cache = Cache(max_size=agent_cache_size,
+                                   ttl=agent_cache_ttl)
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    def set_batch_size(self, value=None):
+        if value is None:
+            value = 0
+        self._batch_size = value
+        log.debug('%s batch_size set to %d' % (self.facility,
+                                               self.batch_size))
+
+    @property
+    def pending(self):
+        return self._pending
+
+    @property
+    def prefetch_chunk_size(self):
+        return self._prefetch_chunk_size
+
+    def set_prefetch_chunk_size(self, value):
+        self._prefetch_chunk_size = value
+        log.debug('%s prefetch_chunk_size set to %d' %
+                  (self.facility, self.prefetch_chunk_size))
+
+    @property
+    def agent_cache(self):
+        return self._agent_cache
+
+    @property
+    def dp_cache(self):
+        return self._dp_cache
+
+    @property
+    def agent_stamp(self):
+        return self._agent_stamp
+
+    def set_agent_stamp(self, value=None):
+        self._agent_stamp = value
+        self._agent_stamp_mtime = None
+        log.debug('%s agent_stamp set to "%s"' % (self.facility,
+                                                  self.agent_stamp))
+
+    def check_agent_stamp(self):
+        """Invalidate the agent caches if the :attr:`agent_stamp` file
+        has been modified since the last check.
+
+        **Returns:**
+            boolean ``True`` if the agent caches were invalidated
+
+            boolean ``False`` otherwise
+
+        """
+        invalidated = False
+
+        if self.agent_stamp is not None and self.agent_cache is not None:
+            mtime = None
+            try:
+                mtime = os.stat(self.agent_stamp).st_mtime
+            except OSError, err:
+                log.debug('Agent stamp "%s" stat error: %s' %
+                          (self.agent_stamp, err))
+
+            if mtime != self._agent_stamp_mtime:
+                if self._agent_stamp_mtime is not None:
+                    log.info('Agent stamp "%s" changed: invalidating cache' %
+                             self.agent_stamp)
+                    self.invalidate_agent_cache()
+                    invalidated = True
+                self._agent_stamp_mtime = mtime
+
+        return invalidated
+
+    def invalidate_agent_cache(self):
+        """Clear the agent lookup caches.
+        """
+        if self.agent_cache is not None:
+            self.agent_cache.invalidate()
+        if self.dp_cache is not None:
+            self.dp_cache.invalidate()
+
+    def cache_stats(self):
+        """Dump of the agent lookup cache counters.
+
+        **Returns:**
+            string representation of the cache counters.  Similar
+            construct is::
+
+                agent cache size:2 hits:10 misses:2|dp cache size:...
+
+            ``None`` if caching is disabled
+
+        """
+        stats = None
+
+        if self.agent_cache is not None:
+            stats = ('agent cache %s|dp cache %s' %
+                     (self.agent_cache.stats(), self.dp_cache.stats()))
+
+        return stats
+
     def process(self,
                 time,
                 raw_record,
@@ -176,6 +348,13 @@ class Loader(top.Service):
             skip_jobitem_chk = False
 
             connote = job_item_data.get('connote_nbr')
+
+            # Queued records are not visible to the DB lookups.
+            if self.pending_conflict(barcode,
+                                     connote,
+                                     job_item_data.get('item_nbr')):
+                self.flush()
+
             if self.match_connote(connote, barcode):
                 # Manufactured barcode.
                 item_nbr = fields.get('Item Number')
@@ -189,9 +368,25 @@ class Loader(top.Service):
                 if barcodes:
                     job_id = barcodes[0]
 
-            # OK, update or create ...
             agent_id = fields.get('Agent Id')
             agent_id_row_id = job_data.get('agent_id')
+
+            # Does BU's Delivery Partner trigger comms?
+            args = [agent_id, delivery_partners]
+            dp_trigger_comms = self.delivery_partner_comms_trigger(*args)
+
+            comms = None
+            if not dp_trigger_comms:
+                log.info('Agent ID %d Delivery Partner comms suppressed' %
+                         (agent_id))
+            else:
+                comms = {'cond_map': cond_map,
+                         'service_code': job_data.get('service_code'),
+                         'email_addr': job_item_data.get('email_addr'),
+                         'phone_nbr': job_item_data.get('phone_nbr'),
+                         'dry': dry}
+
+            # OK, update or create ...
             job_item_id = None
             if job_id is not None:
                 log.info('Updating barcode "%s" agent ID "%s"' %
@@ -199,31 +394,17 @@ class Loader(top.Service):
                 job_item_id = self.update(job_id,
                                           agent_id_row_id,
                                           job_item_data,
-                                          skip_jobitem_chk)
+                                          skip_jobitem_chk,
+                                          comms=comms)
             else:
                 log.info('Creating job/job_item for barcode "%s"' % barcode)
-                job_item_id = self.create(job_data, job_item_data)
-
-            # Does BU's Delivery Partner trigger comms?
-            args = [agent_id, delivery_partners]
-            dp_trigger_comms = self.delivery_partner_comms_trigger(*args)
+                job_item_id = self.create(job_data,
+                                          job_item_data,
+                                          comms=comms)
 
-            # Send comms?
-            if not dp_trigger_comms:
-                log.info('Agent ID %d Delivery Partner comms suppressed' %
-                         (agent_id))
-            else:
-                if job_item_id is not None:
-                    service_code = job_data.get('service_code')
-                    email_addr = job_item_data.get('email_addr')
-                    phone_nbr = job_item_data.get('phone_nbr')
-
-                    self.send_comms(job_item_id,
-                                    cond_map,
-                                    service_code,
-                                    email_addr,
-                                    phone_nbr,
-                                    dry=dry)
+            # Send comms?  Queued records send comms on flush.
+            if job_item_id is not None and comms is not None:
+                self.send_comms(job_item_id, **comms)
 
         log.info('Conn Note: "%s" parse complete' % connote_literal)
 
@@ -437,6 +618,13 @@ class Loader(top.Service):
         """
         barcode_list = []
 
+        key = self.index_key(barcode)
+        if key in self._barcode_index:
+            barcode_list = list(self._barcode_index[key])
+            log.info('Prefetched "job" records with barcode "%s": %s' %
+                     (barcode, str(barcode_list)))
+            return barcode_list
+
         log.info('Checking if barcode "%s" exists in "job" table ...' %
                  barcode)
         self.db(self.db._job.check_barcode(barcode=barcode))
@@ -460,6 +648,13 @@ class Loader(top.Service):
             the *agent* details.  ``None`` otherwise.
 
         """
+        if self.agent_cache is not None:
+            agent_id_row_id = self.agent_cache.get(agent)
+            if agent_id_row_id is not None:
+                log.debug('Agent Id "%s" cached: %s' %
+                          (agent, agent_id_row_id))
+                return agent_id_row_id
+
         log.info('Checking if Agent Id "%s" exists in system ...' % agent)
         self.db(self.db._agent.check_agent_id(agent_code=agent))
         agent_id_row_id = self.db.row
@@ -467,6 +662,8 @@ class Loader(top.Service):
         if agent_id_row_id is not None:
             agent_id_row_id = agent_id_row_id[0]
             log.info('Agent Id "%s" found: %s' % (agent, agent_id_row_id))
+            if self.agent_cache is not None:
+                self.agent_cache.put(agent, agent_id_row_id)
         else:
             self.set_alerts('Agent Id "%s" does not exist' % agent)
 
@@ -495,6 +692,13 @@ class Loader(top.Service):
             ``None`` otherwise
 
         """
+        if self.dp_cache is not None:
+            dp = self.dp_cache.get(agent_id)
+            if dp is not None:
+                log.debug('agent.id %d Delivery Partner cached: "%s"' %
+                          (agent_id, dp))
+                return dp
+
         log.info('Get agent.id %d Delivery Partner ...' % agent_id)
         sql = self.db._agent.agent_sql(agent_id)
 
@@ -515,6 +719,8 @@ class Loader(top.Service):
                           err)
 
         log.info('agent.id %d Delivery Partner: "%s"' % (agent_id, dp))
+        if dp is not None and self.dp_cache is not None:
+            self.dp_cache.put(agent_id, dp)
 
         return dp
 
@@ -671,11 +877,37 @@ class Loader(top.Service):
         """
         return self.db.date_now()
 
+    def checkpoint(self):
+        """Write out any queued records and commit the current DB
+        transaction.  Unlike :meth:`reset`, the alert list and
+        :meth:`prefetch` index are retained as the load continues.
+
+        """
+        self.flush()
+
+        log.info('Checkpoint: committing transaction state to the DB ...')
+        self.db.commit()
+
     def reset(self, commit=False):
-        """Reset the alert list.
+        """Reset the alert list and :meth:`prefetch` index.
+
+        If *commit* is set, any queued records are written out before
+        the DB transaction is committed.  Otherwise, the queued records
+        are discarded (see :meth:`discard`) as they would only be rolled
+        back after their comms events are triggered.
+
         """
+        if commit:
+            self.flush()
+        else:
+            self.discard()
         self.set_alerts()
 
+        self._barcode_index.clear()
+        self._prefetched_connotes.clear()
+        self._jobitem_index.clear()
+        self._jobitem_job_index.clear()
+
         if commit:
             log.info('Committing transaction state to the DB ...')
             self.db.commit()
@@ -685,6 +917,9 @@ class Loader(top.Service):
             self.db.rollback()
             log.info('Rollback OK')
 
+            # Cached agent IDs may relate to rolled back inserts.
+            self.invalidate_agent_cache()
+
     def match_connote(self, connote, barcode):
         """Pre-check to see if barcode value is based on connote.
 
@@ -743,12 +978,19 @@ class Loader(top.Service):
                  (connote, item_nbr))
         job_id = None
 
-        sql = self.db.job.jobitem_based_job_search_sql(connote=connote,
-                                                       item_nbr=item_nbr)
-        self.db(sql)
         received = []
-        for row in self.db.rows():
-            received.append(row[0])
+        if self.index_key(connote) in self._prefetched_connotes:
+            key = (self.index_key(connote), self.index_key(item_nbr))
+            prefetched_id = self._jobitem_job_index.get(key)
+            if prefetched_id is not None:
+                received.append(prefetched_id)
+        else:
+            job = self.db.job
+            (sql, params) = job.jobitem_based_job_search_params_sql(connote,
+                                                                    item_nbr)
+            self.db(sql, params)
+            for row in self.db.rows():
+                received.append(row[0])
 
         if received:
             # Results are sorted by job_ts so grab the first index.
@@ -774,8 +1016,8 @@ class Loader(top.Service):
         log.info('Check for job records with item_nbr "%s"' % item_nbr)
         job_id = None
 
-        sql = self.db.job.item_nbr_based_job_sql(item_nbr=item_nbr)
-        self.db(sql)
+        (sql, params) = self.db.job.item_nbr_based_job_params_sql(item_nbr)
+        self.db(sql, params)
         received = []
         for row in self.db.rows():
             received.append(row[0])
@@ -787,33 +1029,45 @@ class Loader(top.Service):
 
         return job_id
 
-    def create(self, job_data, jobitem_data):
+    def create(self, job_data, jobitem_data, comms=None):
         """
         **Args:**
             *job_data*: dictionary of the ``job`` table fields
 
             *jobitem_data*: dictionary of the ``jobitem`` table fields
 
+        **Kwargs:**
+            *comms*: dictionary of :meth:`send_comms` keyword arguments
+            to apply once a queued record is written (only used if
+            :attr:`batch_size` is set)
+
         **Returns:**
-            integer representing the new ``job_item.id``
+            integer representing the new ``job_item.id`` or ``None`` if
+            the record has been queued for a bulk write
 
         """
-        job_id = self.db.insert(self.db.job.insert_sql(job_data))
+        if self.batch_size:
+            self.queue(job_data, jobitem_data, comms=comms)
+            return None
+
+        job_id = self.db.insert_params(self.db.job, job_data)
         log.info('"job.id" %d created' % job_id)
 
         # Set the "jobitem" table's foreign key.
         jobitem_data['job_id'] = job_id
-        sql = self.db.jobitem.insert_sql(jobitem_data)
-        jobitem_id = self.db.insert(sql)
+        jobitem_id = self.db.insert_params(self.db.jobitem, jobitem_data)
         log.info('"jobitem.id" %d created' % jobitem_id)
 
+        self.index_jobitem(job_id, jobitem_data, jobitem_id, job_data)
+
         return jobitem_id
 
     def update(self,
                job_id,
                agent_id,
                jobitem_data,
-               skip_jobitem_chk=False):
+               skip_jobitem_chk=False,
+               comms=None):
         """Updates and existing barcode.
 
         Updates the job.agent_id and will create a new job_item.connote_nbr
@@ -829,32 +1083,51 @@ class Loader(top.Service):
             skip_jobitem_chk: bypass jobitem insert check and only update
             the job record (default ``False``)
 
+            comms: as per :meth:`create`
+
         **Returns:**
-            integer representing the new ``job_item.id``
+            integer representing the new ``job_item.id`` or ``None`` if
+            the ``job_item`` has been queued for a bulk write
 
         """
         job_item_id = None
 
-        sql = self.db.job.update_sql(job_id, agent_id)
-        self.db(sql)
+        (sql, params) = self.db.job.update_params_sql({'agent_id': agent_id},
+                                                      keys=(job_id, ))
+        self.db(sql, params)
 
         if not skip_jobitem_chk:
             connote = jobitem_data.get('connote_nbr')
             item_nbr = jobitem_data.get('item_nbr')
+            if (job_id in self._pending_job_ids or
+                self.pending_conflict(None, connote, item_nbr)):
+                self.flush()
+
             log.debug('Look for jobitems with connote/item_nbr: "%s"/"%s"' %
                       (connote, item_nbr))
-            sql = self.db.jobitem.connote_item_nbr_sql(connote, item_nbr)
             job_item_ids = []
-            self.db(sql)
-            for row in self.db.rows():
-                job_item_ids.append(row[0])
-
-            if not job_item_ids:
+            if self.index_key(connote) in self._prefetched_connotes:
+                key = (self.index_key(connote), self.index_key(item_nbr))
+                prefetched_id = self._jobitem_index.get(key)
+                if prefetched_id is not None:
+                    job_item_ids.append(prefetched_id)
+            else:
+                jobitem = self.db.jobitem
+                (sql, params) = jobitem.connote_item_nbr_params_sql(connote,
+                                                                    item_nbr)
+                self.db(sql, params)
+                for row in self.db.rows():
+                    job_item_ids.append(row[0])
+
+            if not job_item_ids and self.batch_size:
+                self.queue(None, jobitem_data, job_id=job_id, comms=comms)
+            elif not job_item_ids:
                 # Set the "jobitem" table's foreign key.
                 jobitem_data['job_id'] = job_id
-                sql = self.db.jobitem.insert_sql(jobitem_data)
-                job_item_id = self.db.insert(sql)
+                job_item_id = self.db.insert_params(self.db.jobitem,
+                                                    jobitem_data)
                 log.info('"jobitem.id" %d created' % job_item_id)
+                self.index_jobitem(job_id, jobitem_data, job_item_id)
             else:
                 log.info('"jobitem.id" %d exists' % job_item_ids[0])
                 job_item_id = job_item_ids[0]
@@ -863,6 +1136,275 @@ class Loader(top.Service):
 
         return job_item_id
 
+    def queue(self, job_data, jobitem_data, job_id=None, comms=None):
+        """Queue a ``job``/``job_item`` record for a bulk write.
+
+        The queue is written to the DB via :meth:`flush` once it reaches
+        :attr:`batch_size` records.  The queue is also flushed before
+        the new record is added if the new record's barcode or
+        ``job.id`` is already queued as the bulk insert relies on these
+        being unique.
+
+        **Args:**
+            *job_data*: dictionary of the ``job`` table fields.  ``None``
+            if the ``job_item`` belongs to an existing ``job``
+
+            *jobitem_data*: dictionary of the ``jobitem`` table fields
+
+        **Kwargs:**
+            *job_id*: ``job.id`` of an existing ``job``
+
+            *comms*: as per :meth:`create`
+
+        """
+        barcode = None
+        if job_data is not None:
+            barcode = self.index_key(job_data.get('card_ref_nbr'))
+
+        if (barcode in self._pending_barcodes or
+            (job_id is not None and job_id in self._pending_job_ids)):
+            self.flush()
+
+        log.debug('Queueing connote/item_nbr "%s"/"%s" for bulk write' %
+                  (jobitem_data.get('connote_nbr'),
+                   jobitem_data.get('item_nbr')))
+        self._pending.append({'job': job_data,
+                              'job_id': job_id,
+                              'job_item': jobitem_data,
+                              'comms': comms})
+        if barcode is not None:
+            self._pending_barcodes.add(barcode)
+        if job_id is not None:
+            self._pending_job_ids.add(job_id)
+        key = (self.index_key(jobitem_data.get('connote_nbr')),
+               self.index_key(jobitem_data.get('item_nbr')))
+        self._pending_jobitems.add(key)
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def pending_conflict(self, barcode, connote, item_nbr):
+        """Check if a record with *barcode* or *connote*/*item_nbr* is
+        queued for a bulk write.
+
+        **Args:**
+            *barcode*: ``job.card_ref_nbr`` value
+
+            *connote*: ``job_item.connote_nbr`` value
+
+            *item_nbr*: ``job_item.item_nbr`` value
+
+        **Returns:**
+            boolean ``True`` if a matching record is queued
+
+            boolean ``False`` otherwise
+
+        """
+        key = (self.index_key(connote), self.index_key(item_nbr))
+
+        return (self.index_key(barcode) in self._pending_barcodes or
+                key in self._pending_jobitems)
+
+    def discard(self):
+        """Drop the queued ``job``/``job_item`` records without writing
+        them to the DB (or triggering their comms).
+
+        """
+        if self._pending:
+            log.info('Discarding %d queued job_item records' %
+                     len(self._pending))
+
+        self._pending = []
+        self._pending_barcodes.clear()
+        self._pending_jobitems.clear()
+        self._pending_job_ids.clear()
+
+    def flush(self):
+        """Write the queued ``job``/``job_item`` records to the DB via
+        :meth:`top.DbSession.insert_many` and trigger the comms of each
+        record once its ``job_item.id`` is known.
+
+        **Returns:**
+            list of the new ``job_item.id`` values
+
+        """
+        jobitem_ids = []
+
+        pending = self._pending
+        self._pending = []
+        self._pending_barcodes.clear()
+        self._pending_jobitems.clear()
+        self._pending_job_ids.clear()
+
+        if pending:
+            log.info('Flushing %d queued job_item records ...' %
+                     len(pending))
+
+            new_jobs = [x for x in pending if x['job'] is not None]
+            if new_jobs:
+                job_ids = self.db.insert_many(self.db.job,
+                                              [x['job'] for x in new_jobs],
+                                              'card_ref_nbr')
+                for record, job_id in zip(new_jobs, job_ids):
+                    record['job_id'] = job_id
+
+            records = []
+            for record in pending:
+                if record['job_id'] is None:
+                    self.set_alerts('Barcode "%s" job insert failed' %
+                                    record['job'].get('card_ref_nbr'))
+                else:
+                    # Set the "jobitem" table's foreign key.
+                    record['job_item']['job_id'] = record['job_id']
+                    records.append(record)
+
+            if records:
+                ids = self.db.insert_many(self.db.jobitem,
+                                          [x['job_item'] for x in records],
+                                          'job_id')
+                for record, jobitem_id in zip(records, ids):
+                    if jobitem_id is None:
+                        self.set_alerts('Connote "%s" job_item insert failed' %
+                                        record['job_item'].get('connote_nbr'))
+                        continue
+
+                    log.info('"jobitem.id" %d created' % jobitem_id)
+                    jobitem_ids.append(jobitem_id)
+                    self.index_jobitem(record['job_id'],
+                                       record['job_item'],
+                                       jobitem_id,
+                                       record['job'])
+                    if record['comms'] is not None:
+                        self.send_comms(jobitem_id, **record['comms'])
+
+        return jobitem_ids
+
+    def prefetch(self, records):
+        """Pre-scan the raw T1250 *records* and resolve the existing
+        ``job`` barcodes and ``job_item`` connote/item number pairs in
+        chunked ``IN (...)`` queries.
+
+        The results are held in an in-memory index that
+        :meth:`barcode_exists`, :meth:`get_jobitem_based_job_id` and
+        :meth:`update` consult in place of a per-record query.  The
+        index is kept current as new records are written and is cleared
+        by :meth:`reset`.
+
+        **Args:**
+            *records*: iterable of raw T1250 records.  For example, an
+            open T1250 file object
+
+        """
+        fields = {'Bar code': FIELDS.get('Bar code'),
+                  'Conn Note': FIELDS.get('Conn Note')}
+        parser = top.Parser(fields=fields)
+        barcode_index = parser.field_names.index('Bar code')
+        connote_index = parser.field_names.index('Conn Note')
+
+        barcodes = {}
+        connotes = {}
+        for record in parser.parse_lines(records):
+            if record[connote_index] == '%%EOF':
+                break
+            barcode = record[barcode_index]
+            key = self.index_key(barcode)
+            if barcode and key not in self._barcode_index:
+                barcodes[key] = barcode
+            connote = record[connote_index]
+            key = self.index_key(connote)
+            if connote and key not in self._prefetched_connotes:
+                connotes[key] = connote
+
+        barcodes = sorted(barcodes.values())
+        connotes = sorted(connotes.values())
+        log.info('%s prefetching %d barcodes and %d connotes' %
+                 (self.facility, len(barcodes), len(connotes)))
+
+        size = self.prefetch_chunk_size
+        for i in range(0, len(barcodes), size):
+            chunk = barcodes[i:i + size]
+            for barcode in chunk:
+                self._barcode_index[self.index_key(barcode)] = []
+
+            self.db(self.db.job.check_barcodes_sql(chunk))
+            for (job_id, barcode, job_ts) in self.db.rows():
+                key = self.index_key(barcode)
+                self._barcode_index.setdefault(key, []).append(job_id)
+
+        for i in range(0, len(connotes), size):
+            chunk = connotes[i:i + size]
+            self._prefetched_connotes.update([self.index_key(x)
+                                              for x in chunk])
+
+            # Results are sorted by job_item.created_ts so the first
+            # job_item.id for a connote/item_nbr pair is retained.
+            job_ts_index = {}
+            sql = self.db.jobitem.connotes_item_nbr_sql(chunk)
+            self.db(sql)
+            for row in self.db.rows():
+                (jobitem_id, connote, item_nbr, job_id, job_ts) = row
+                key = (self.index_key(connote), self.index_key(item_nbr))
+                self._jobitem_index.setdefault(key, jobitem_id)
+
+                if job_id is None:
+                    continue
+                if key not in job_ts_index or job_ts > job_ts_index[key]:
+                    job_ts_index[key] = job_ts
+                    self._jobitem_job_index[key] = job_id
+
+    def index_key(self, value):
+        """Normalise a barcode, connote or item number *value* for the
+        :meth:`prefetch` index and the bulk write queue.
+
+        The DB matches these values without regard to case or trailing
+        whitespace (default MSSQL collation), so the in-memory lookups
+        that replace the per-record queries must do the same.
+
+        **Args:**
+            *value*: the value to normalise
+
+        **Returns:**
+            the stripped, upper case *value* or ``None`` if *value* is
+            ``None``
+
+        """
+        key = value
+        if key is not None:
+            key = key.rstrip().upper()
+
+        return key
+
+    def index_jobitem(self, job_id, jobitem_data, jobitem_id, job_data=None):
+        """Add a new ``job_item`` (and optionally its parent ``job``) to
+        the :meth:`prefetch` index.  Only values that were prefetched
+        are indexed.
+
+        **Args:**
+            *job_id*: the ``job.id`` of the parent ``job``
+
+            *jobitem_data*: dictionary of the ``jobitem`` table fields
+
+            *jobitem_id*: the new ``job_item.id``
+
+        **Kwargs:**
+            *job_data*: dictionary of the ``job`` table fields if a new
+            ``job`` was also created
+
+        """
+        if job_data is not None:
+            barcode = self.index_key(job_data.get('card_ref_nbr'))
+            if barcode in self._barcode_index:
+                self._barcode_index[barcode].insert(0, job_id)
+
+        connote = self.index_key(jobitem_data.get('connote_nbr'))
+        if connote in self._prefetched_connotes:
+            key = (connote, self.index_key(jobitem_data.get('item_nbr')))
+            self._jobitem_index[key] = jobitem_id
+
+            # The newest job is the match (as per the job_ts ordered
+            # jobitem_based_job_search_sql query).
+            self._jobitem_job_index[key] = job_id
+
     def verify_postcodes(self, dry=False):
         """Cycle through each ``job.state`` column and enusure that the
         ``job.postcode`` evaluates as expected.
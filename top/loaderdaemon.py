@@ -6,14 +6,241 @@ import re
 import time
 import datetime
 import signal
+try:
+    import multiprocessing
+except ImportError:
+    # Python < 2.6: files are loaded serially.
+    multiprocessing = None
 
 import top
 from top.utils.log import log
-from top.utils.files import (get_directory_files,
-                             check_eof_flag,
-                             move_file,
+from top.utils.files import (move_file,
                              copy_file,
-                             check_filename)
+                             remove_files)
+
+
+def build_loader(kwargs):
+    """Create a :class:`top.Loader` from *kwargs* as provided by
+    :attr:`LoaderDaemon.loader_kwargs`.
+
+    """
+    kwargs = dict(kwargs)
+    agent_stamp = kwargs.pop('agent_stamp', None)
+
+    loader = top.Loader(**kwargs)
+    loader.set_agent_stamp(agent_stamp)
+
+    return loader
+
+
+def checkpoint_path(file):
+    """Name of the sidecar checkpoint state file for T1250 *file*.
+
+    The sidecar is a hidden file alongside *file* so that it will not
+    match the T1250 filename format.
+
+    """
+    return os.path.join(os.path.dirname(file),
+                        '.%s.ckpt' % os.path.basename(file))
+
+
+def read_checkpoint(file):
+    """Read the checkpoint state for T1250 *file*.
+
+    **Args:**
+        *file*: the T1250 file
+
+    **Returns:**
+        tuple of the form (*offset*, *line_nbr*) representing the file
+        position and line number after the last committed record.
+        ``(0, 0)`` if *file* has no valid checkpoint
+
+    """
+    state = (0, 0)
+
+    ckpt = checkpoint_path(file)
+    if os.path.exists(ckpt):
+        try:
+            fh = open(ckpt)
+            (offset, line_nbr) = [int(x) for x in fh.read().split()]
+            fh.close()
+
+            if offset > os.path.getsize(file):
+                log.error('Checkpoint offset %d beyond end of "%s"' %
+                          (offset, file))
+            else:
+                state = (offset, line_nbr)
+        except (IOError, OSError, ValueError), err:
+            log.error('Checkpoint "%s" read error: %s' % (ckpt, err))
+
+    return state
+
+
+def write_checkpoint(file, offset, line_nbr):
+    """Persist the checkpoint state for T1250 *file*.
+
+    The state is written to a temporary file and renamed into place so
+    that a partially written checkpoint is never read.
+
+    **Args:**
+        *file*: the T1250 file
+
+        *offset*: file position after the last committed record
+
+        *line_nbr*: line number of the last committed record
+
+    """
+    ckpt = checkpoint_path(file)
+    tmp_ckpt = '%s.tmp' % ckpt
+    try:
+        fh = open(tmp_ckpt, 'w')
+        fh.write('%d %d\n' % (offset, line_nbr))
+        fh.close()
+        os.rename(tmp_ckpt, ckpt)
+        log.debug('Checkpoint "%s" at line %d (offset %d)' %
+                  (file, line_nbr, offset))
+    except (IOError, OSError), err:
+        log.error('Checkpoint "%s" write error: %s' % (ckpt, err))
+
+
+def load_file(loader, spec, dry=False, commit=True):
+    """Load a single T1250 file into the DB via *loader*.
+
+    If *spec* defines a ``checkpoint`` interval then the DB transaction
+    is committed every ``checkpoint`` records and the file position is
+    recorded in a sidecar state file (see :func:`checkpoint_path`).  A
+    subsequent load of the same file resumes after the last checkpoint.
+    Checkpoints are not taken if *dry* or not *commit*.
+
+    **Args:**
+        *loader*: a :class:`top.Loader` object
+
+        *spec*: load specification dictionary as produced by
+        :meth:`LoaderDaemon.partition_files`
+
+    **Kwargs:**
+        *dry*: only report, do not execute
+
+        *commit*: commit the DB transaction on success (otherwise roll
+        back)
+
+    **Returns:**
+        dictionary structure of the form::
+
+            {'file': ...,
+             'status': <True|False>,
+             'reporter': <top.Reporter>,
+             'alerts': [...],
+             'aggregate': <True|False>,
+             'cache_stats': ...}
+
+    """
+    file = spec.get('file')
+    result = {'file': file,
+              'status': False,
+              'reporter': top.Reporter(identifier=file),
+              'alerts': [],
+              'aggregate': spec.get('cond_map').get('aggregate_files'),
+              'cache_stats': None}
+
+    checkpoint = spec.get('checkpoint')
+    if dry or not commit:
+        checkpoint = None
+
+    log.info('Processing file: "%s" ...' % file)
+    loader.check_agent_stamp()
+    reader = top.T1250Reader(file)
+    if not reader.open():
+        return result
+
+    log.info('File "%s" record count: %d' % (file, reader.record_count()))
+
+    # Resolve existing barcodes/connotes in bulk.
+    loader.prefetch(reader.lines())
+
+    (offset, line_nbr) = (0, 0)
+    if checkpoint:
+        (offset, line_nbr) = read_checkpoint(file)
+        if line_nbr:
+            log.info('Resuming "%s" after line %d' % (file, line_nbr))
+
+    reporter = result.get('reporter')
+    since_checkpoint = 0
+    for (line, next_offset) in reader.records(offset):
+        line_nbr += 1
+        reporter(loader.process(spec.get('file_timestamp'),
+                                line.rstrip('\r\n'),
+                                spec.get('bu_id'),
+                                spec.get('cond_map'),
+                                spec.get('dps'),
+                                dry=dry))
+
+        since_checkpoint += 1
+        if checkpoint and since_checkpoint >= checkpoint:
+            loader.checkpoint()
+            write_checkpoint(file, next_offset, line_nbr)
+            since_checkpoint = 0
+
+    if reader.eof_found:
+        log.info('EOF found')
+        result['status'] = True
+    reader.close()
+    reporter.end
+
+    if result.get('status'):
+        # Alerts can be raised as the queued records are written out.
+        if commit:
+            loader.flush()
+        result['alerts'] = list(loader.alerts)
+        loader.reset(commit=commit)
+        result['cache_stats'] = loader.cache_stats()
+        if checkpoint and os.path.exists(checkpoint_path(file)):
+            remove_files(checkpoint_path(file))
+    else:
+        log.error("%s - %s" % ('File closed before EOF found',
+                               'all line items ignored'))
+        loader.reset(commit=False)
+
+    return result
+
+
+def init_worker():
+    """Worker process initialiser.  SIGTERM is handled by the parent
+    daemon process only.
+
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def load_files(args):
+    """Worker process entry point that loads a list of T1250 files
+    in order against a dedicated :class:`top.Loader` (and hence
+    :class:`top.DbSession`).
+
+    **Args:**
+        *args*: tuple of the form (*loader_kwargs*, *specs*, *dry*,
+        *commit*)
+
+    **Returns:**
+        list of :func:`load_file` result dictionaries
+
+    """
+    (loader_kwargs, specs, dry, commit) = args
+
+    results = []
+    loader = build_loader(loader_kwargs)
+    for spec in specs:
+        try:
+            results.append(load_file(loader, spec, dry=dry, commit=commit))
+        except Exception, err:
+            log.error('File "%s" load error: %s' % (spec.get('file'), err))
+
+            # Don't carry the failed file's queue, indexes and cached
+            # agents over to the next file.
+            loader.reset(commit=False)
+            results.append({'file': spec.get('file'), 'status': False})
+
+    return results
 
 
 class LoaderDaemon(top.DaemonService):
@@ -120,8 +347,8 @@ class LoaderDaemon(top.DaemonService):
         """
         signal.signal(signal.SIGTERM, self._exit_handler)
 
-        loader = top.Loader(db=self.config.db_kwargs(),
-                            comms_dir=self.config.comms_dir)
+        loader_kwargs = self.loader_kwargs
+        loader = build_loader(loader_kwargs)
         commit = True
         if self.dry:
             commit = False
@@ -140,68 +367,32 @@ class LoaderDaemon(top.DaemonService):
                 continue
 
             # Start processing files.
-            for file in files:
-                log.info('Processing file: "%s" ...' % file)
-                status = False
+            partitions = self.partition_files(files)
+            workers = min(self.config.loader_workers, len(partitions))
+            if workers > 1 and multiprocessing is None:
+                log.warn('multiprocessing not available -- loading serially')
+                workers = 1
+            if workers > 1:
+                log.info('Processing %d BU file sets across %d workers' %
+                         (len(partitions), workers))
+                pool = multiprocessing.Pool(processes=workers,
+                                            initializer=init_worker)
+                args = [(loader_kwargs, x, self.dry, commit)
+                        for x in partitions]
                 try:
-                    f = open(file, 'r')
-                except IOError, e:
-                    log.error('File error "%s": %s' % (file, str(e)))
-                    continue
-
-                # We should have a file handle.
-                self.reporter.reset(identifier=file)
-                (bu, file_timestamp) = self.validate_file(file)
-                if bu is None or file_timestamp is None:
-                    log.error('Unable to validate file "%s":' % file)
-                    continue
-
-                bu_id = self.config.file_bu.get(bu.lower())
-                if bu_id is None:
-                    log.error('Unable to get a BU Id from "%s"' % bu)
-                    continue
-
-                bu_id = int(bu_id)
-                condition_map = self.config.condition_map(bu)
-                eof_found = False
-                for line in f:
-                    record = line.rstrip('\r\n')
-                    if record == '%%EOF':
-                        log.info('EOF found')
-                        status = True
-                        eof_found = True
-                        break
-                    else:
-                        dps = self.get_comms_delivery_partners(bu_id)
-                        self.reporter(loader.process(file_timestamp,
-                                                     record,
-                                                     bu_id,
-                                                     condition_map,
-                                                     dps,
-                                                     dry=self.dry))
-                f.close()
-
-                if not status and not eof_found:
-                    log.error("%s - %s" % ('File closed before EOF found',
-                                           'all line items ignored'))
-
-                # Report the results.
-                if status and eof_found:
-                    self.send_table(recipients=self.support_emails,
-                                    table_data=list(loader.alerts),
-                                    identifier=file,
-                                    dry=self.dry)
-                    loader.reset(commit=commit)
-
-                    # Aggregate the files for further processing.
-                    if not self.dry and self.file is None:
-                        aggregate = condition_map.get('aggregate_files')
-                        self.distribute_file(file, aggregate)
-
-                    stats = self.reporter.report()
-                    log.info(stats)
-                else:
-                    log.error('%s processing failed.' % file)
+                    for results in pool.imap_unordered(load_files, args):
+                        for result in results:
+                            self.report_file(result)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                for specs in partitions:
+                    for spec in specs:
+                        self.report_file(load_file(loader,
+                                                   spec,
+                                                   dry=self.dry,
+                                                   commit=commit))
 
             if not event.isSet():
                 if self.dry:
@@ -211,7 +402,101 @@ class LoaderDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.config.loader_loop)
+                    self.wait(self.config.loader_loop,
+                              dirs=self.config.in_dirs)
+
+    @property
+    def loader_kwargs(self):
+        """Keyword arguments used to build each :class:`top.Loader`.
+        Kept to simple types so that they can be passed to the worker
+        processes.
+
+        """
+        return {'db': self.config.db_kwargs(),
+                'comms_dir': self.config.comms_dir,
+                'comms_spool': self.config.comms_spool,
+                'batch_size': self.config.loader_batch_size,
+                'agent_cache_size': self.config.agent_cache_size,
+                'agent_cache_ttl': self.config.agent_cache_ttl,
+                'agent_stamp': self.config.agent_stamp}
+
+    def partition_files(self, files):
+        """Validate *files* and group the resultant load specifications
+        by Business Unit.
+
+        Files within a Business Unit group retain their original
+        (oldest first) order so that updates to the same connote are
+        applied in sequence.  Each group can be processed independently.
+
+        **Args:**
+            *files*: list of T1250 files to process
+
+        **Returns:**
+            list of lists of load specification dictionaries as
+            consumed by :func:`load_file`
+
+        """
+        partitions = []
+        bu_partition = {}
+
+        for file in files:
+            (bu, file_timestamp) = self.validate_file(file)
+            if bu is None or file_timestamp is None:
+                log.error('Unable to validate file "%s":' % file)
+                continue
+
+            bu_id = self.config.file_bu.get(bu.lower())
+            if bu_id is None:
+                log.error('Unable to get a BU Id from "%s"' % bu)
+                continue
+
+            bu_id = int(bu_id)
+            spec = {'file': file,
+                    'file_timestamp': file_timestamp,
+                    'bu_id': bu_id,
+                    'cond_map': self.config.condition_map(bu),
+                    'dps': self.get_comms_delivery_partners(bu_id),
+                    'checkpoint': self.config.loader_checkpoint}
+
+            if bu_id not in bu_partition:
+                bu_partition[bu_id] = []
+                partitions.append(bu_partition[bu_id])
+            bu_partition[bu_id].append(spec)
+
+        return partitions
+
+    def report_file(self, result):
+        """Report on the outcome of a :func:`load_file` *result*.
+
+        Merges the file's counters into :attr:`reporter`, sends the
+        support alert table and distributes the file.
+
+        **Args:**
+            *result*: dictionary structure as returned by
+            :func:`load_file`
+
+        """
+        file = result.get('file')
+
+        if result.get('status'):
+            self.reporter.reset(identifier=file)
+            self.reporter.merge(result.get('reporter'))
+
+            self.send_table(recipients=self.support_emails,
+                            table_data=result.get('alerts'),
+                            identifier=file,
+                            dry=self.dry)
+
+            # Aggregate the files for further processing.
+            if not self.dry and self.file is None:
+                self.distribute_file(file, result.get('aggregate'))
+
+            log.info(self.reporter.report(set_end=False))
+
+            if result.get('cache_stats') is not None:
+                log.info('%s %s' % (file, result.get('cache_stats')))
+        else:
+            log.error('%s processing failed.' % file)
 
     def get_files(self):
         """Checks inbound directories (defined by the
@@ -224,31 +509,46 @@ class LoaderDaemon(top.DaemonService):
 
         * contain the T1250 EOF flag
 
+        Only files that are new or have changed since the previous call
+        are re-validated (see :class:`top.utils.files.FileScanner`).
+
         **Returns:**
             list of fully qualified and sorted (oldest first) T1250 files
             to be processed
 
         """
-        files_to_process = []
-
-        for dir in self.config.in_dirs:
-            log.info('Looking for files at: %s ...' % dir)
-            for file in get_directory_files(dir):
-                if (check_filename(file, self.file_format) and
-                    check_eof_flag(file)):
-                    log.info('Found file: "%s" ' % file)
-                    archive_path = self.get_customer_archive(file)
-                    if (archive_path is not None and
-                        os.path.exists(archive_path)):
-                        log.error('File %s is archived' % file)
-                    else:
-                        files_to_process.append(file)
-
-        files_to_process.sort()
+        self.scanner.set_formats([self.file_format])
+        self.scanner.set_validator(self.validate_inbound)
+
+        files_to_process = self.scanner.scan(self.config.in_dirs)
         log.debug('Files set to be processed: "%s"' % str(files_to_process))
 
         return files_to_process
 
+    def validate_inbound(self, file):
+        """Checks that inbound T1250 *file* is complete (contains the
+        T1250 EOF flag) and has not already been archived.
+
+        **Args:**
+            *file*: fully qualified path to the T1250 file
+
+        **Returns:**
+            boolean ``True`` if *file* can be processed
+
+            boolean ``False`` otherwise
+
+        """
+        status = top.T1250Reader(file).check_eof()
+
+        if status:
+            log.info('Found file: "%s" ' % file)
+            archive_path = self.get_customer_archive(file)
+            if archive_path is not None and os.path.exists(archive_path):
+                log.error('File %s is archived' % file)
+                status = False
+
+        return status
+
     def validate_file(self, filename):
         """Parse the T1250-format filename string and attempt to extract
         the Business Unit and file timestamp.
@@ -2,17 +2,13 @@ __all__ = [
     "MapperDaemon",
 ]
 import signal
-import time
 import re
 import os
 import datetime
 
 import top
 from top.utils.log import log
-from top.utils.files import (get_directory_files,
-                             check_eof_flag,
-                             check_filename,
-                             move_file)
+from top.utils.files import move_file
 from top.utils.setter import set_scalar
 
 
@@ -146,31 +142,25 @@ class MapperDaemon(top.DaemonService):
                 dir = os.path.dirname(file)
                 self.set_processing_ts()
 
-                try:
-                    f = open(file, 'r')
-                except IOError, e:
-                    log.error('File open error "%s": %s' % (file, str(e)))
+                reader = top.T1250Reader(file)
+                if not reader.open():
                     continue
 
                 reporter.reset(identifier=file)
-                eof_found = False
-                for line in f:
-                    record = line.rstrip('\r\n')
-                    if record == '%%EOF':
-                        log.info('EOF found')
-                        status = True
-                        eof_found = True
-                        break
-                    else:
-                        translated_line = mapper.process(line)
-                        reporter(translated_line)
-                        if translated_line:
-                            self.write(translated_line,
-                                       fhs,
-                                       dir,
-                                       dry=self.dry)
-
-                f.close()
+                for line in reader.lines():
+                    translated_line = mapper.process(line)
+                    reporter(translated_line)
+                    if translated_line:
+                        self.write(translated_line,
+                                   fhs,
+                                   dir,
+                                   dry=self.dry)
+
+                eof_found = reader.eof_found
+                if eof_found:
+                    log.info('EOF found')
+                    status = True
+                reader.close()
 
                 if status:
                     log.info('%s processing OK.' % file)
@@ -206,7 +196,7 @@ class MapperDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop, dirs=self.in_dirs)
 
     def get_files(self, dir=None):
         """Identifies GIS-special WebMethod files that are to be processed.
@@ -225,30 +215,42 @@ class MapperDaemon(top.DaemonService):
             date sorted list of WebMethods files to process
 
         """
-        files_to_process = []
-
         dirs_to_check = self.in_dirs
         if dir is not None:
             dirs_to_check = dir
 
-        for dir_to_check in dirs_to_check:
-            log.debug('Looking for files at: %s ...' % dir_to_check)
-            for file in get_directory_files(dir_to_check):
-                if (check_filename(file, self.file_format) and
-                    check_eof_flag(file)):
-                    log.info('Found file: %s' % file)
-                    archive_path = self.get_customer_archive(file)
-                    if (archive_path is not None and
-                        os.path.exists(archive_path)):
-                        log.error('File %s is already archived' % file)
-                    else:
-                        files_to_process.append(file)
+        self.scanner.set_formats([self.file_format])
+        self.scanner.set_validator(self.validate_inbound)
 
-        files_to_process.sort()
+        files_to_process = self.scanner.scan(dirs_to_check)
         log.debug('Files set to be processed: "%s"' % str(files_to_process))
 
         return files_to_process
 
+    def validate_inbound(self, file):
+        """Checks that inbound T1250 *file* is complete (contains the
+        T1250 EOF flag) and has not already been archived.
+
+        **Args:**
+            *file*: fully qualified path to the T1250 file
+
+        **Returns:**
+            boolean ``True`` if *file* can be processed
+
+            boolean ``False`` otherwise
+
+        """
+        status = top.T1250Reader(file).check_eof()
+
+        if status:
+            log.info('Found file: %s' % file)
+            archive_path = self.get_customer_archive(file)
+            if archive_path is not None and os.path.exists(archive_path):
+                log.error('File %s is already archived' % file)
+                status = False
+
+        return status
+
     def get_customer_archive(self, file):
         """Returns the archive target path based on GIS T1250 filename
         *file*.  For example, if the source file is
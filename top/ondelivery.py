@@ -12,7 +12,8 @@ class OnDelivery(top.Service):
 
     .. attribute:: parser
 
-        :mod:`top.StopParser` parser object
+        :mod:`top.StopParser` parser object (or a persistent
+        :class:`top.TcdIndex`) that holds the TCD delivery index
 
     .. attribute:: ts_db_kwargs
 
@@ -50,6 +51,11 @@ class OnDelivery(top.Service):
         :mod:`cx_Oracle` object to manage the TransSend database
         connectivity
 
+    .. attribute:: ts_chunk_size
+
+        maximum number of connotes resolved by a single TransSend
+        query during :meth:`process` (default 500)
+
     """
     _parser = top.StopParser()
     _ts_db_kwargs = None
@@ -58,6 +64,7 @@ class OnDelivery(top.Service):
     _scan_desc_header = 'latest_scanner_description'
     _scan_desc_keys = ['IDS - TOLL FAST GRAYS ONLINE']
     _ts_db = None
+    _ts_chunk_size = 500
 
     def __init__(self, db_kwargs=None, ts_db_kwargs=None, comms_dir=None):
         """OnDelivery initialisation.
@@ -78,6 +85,9 @@ class OnDelivery(top.Service):
     def parser(self):
         return self._parser
 
+    def set_parser(self, value):
+        self._parser = value
+
     @property
     def ts_db_kwargs(self):
         return self._ts_db_kwargs
@@ -121,6 +131,14 @@ class OnDelivery(top.Service):
     def ts_db(self):
         return self._ts_db
 
+    @property
+    def ts_chunk_size(self):
+        return self._ts_chunk_size
+
+    @set_scalar
+    def set_ts_chunk_size(self, value):
+        pass
+
     def get_primary_elect_job_item_id(self, connote):
         """Return ``jobitem.id`` whose connote is associated with a
         ``job`` that is defined *Primary Elect* (``job.service_code`` = 3).
@@ -182,6 +200,66 @@ class OnDelivery(top.Service):
         for row in self.db.rows():
             yield row
 
+    def get_uncollected_job_items_by_bu(self,
+                                        service_code,
+                                        bu_delivery_partners,
+                                        day_range=14):
+        """Extract the uncollected *service_code* based job items of
+        several Business Units with a single query and partition them
+        by Business Unit.
+
+        **Args:**
+            *service_code*: integer of ``job.service_code`` columns
+
+            *bu_delivery_partners*: dictionary of Business Unit IDs and
+            the tuple of Delivery Partner names to filter each Business
+            Unit's uncollected ``job_items`` against.  For example::
+
+                {1: ('Nparcel', 'ParcelPoint'), 2: ('Nparcel', )}
+
+        **Kwargs:**
+            *day_range*: number of days from current time to include
+            in search (default 14.0 days)
+
+        **Returns:**
+            dictionary of Business Unit IDs and their uncollected job
+            items in the form::
+
+                {<bu_id>: [(<jobitem.id>,
+                            <jobitem.connote_nbr>,
+                            <jobitem.item_nbr>), ...]}
+
+        """
+        job_items = {}
+        delivery_partners = set()
+        bu_dps = {}
+        for bu_id, dps in bu_delivery_partners.iteritems():
+            job_items[bu_id] = []
+            delivery_partners.update(dps)
+
+            # Match the Delivery Partner names as the query does
+            # (without regard to case or trailing whitespace).
+            bu_dps[bu_id] = set([x.rstrip().lower() for x in dps])
+
+        if delivery_partners:
+            kwargs = {'service_code': service_code,
+                      'bu_ids': tuple(sorted(job_items.keys())),
+                      'delivery_partners': tuple(sorted(delivery_partners)),
+                      'day_range': day_range,
+                      'with_bu': True}
+            sql = self.db.jobitem.uncollected_jobitems_sql(**kwargs)
+            self.db(sql)
+            for (id, connote, item_nbr, bu_id, dp) in self.db.rows():
+                dps = bu_dps.get(bu_id, set())
+                if dp is not None and dp.rstrip().lower() in dps:
+                    job_items[bu_id].append((id, connote, item_nbr))
+
+        log.debug('Uncollected service code %d job_items per BU: %s' %
+                  (service_code,
+                   dict([(k, len(v)) for k, v in job_items.iteritems()])))
+
+        return job_items
+
     def process(self,
                 template,
                 service_code,
@@ -207,7 +285,9 @@ class OnDelivery(top.Service):
             *job_items*: list of ``(<id>, <connote>, <item_nbr>)``
             that can be fed into the process loop directly
 
-            *in_files*: list of paths to the input file
+            *in_files*: list of paths to the input file.  If ``None``,
+            the delivery index loaded by :meth:`load_delivery_index`
+            is used
 
             *day_range*: limit uncollected parcel search to within nominated
             value
@@ -233,8 +313,7 @@ class OnDelivery(top.Service):
             delivery_partners = ('Nparcel', )
 
         if in_files is not None:
-            self.parser.set_in_files(in_files)
-            self.parser.read()
+            self.load_delivery_index(in_files)
 
         if job_items is None:
             kwargs = {'service_code': service_code,
@@ -245,32 +324,66 @@ class OnDelivery(top.Service):
         else:
             log.debug('Received job_items list inline')
 
+        # Items that are not delivered as per the TCD reports are
+        # resolved against TransSend in bulk.
+        pending = []
         for (id, connote, item_nbr) in job_items:
             log.debug('Processing On Del id|connote|item: "%s|%s|%s ..."' %
                       (id, connote, item_nbr))
 
-            delivered_status = False
-            if (not self.flag_comms_previous('email', id, template) and
-                not self.flag_comms_previous('sms', id, template)):
-                if (self.parser.connote_delivered(connote, item_nbr) or
-                    self.connote_delivered(connote, item_nbr)):
-                    delivered_status = True
+            if (self.flag_comms_previous('email', id, template) or
+                self.flag_comms_previous('sms', id, template)):
+                continue
+
+            tcd_delivered = self.parser.connote_delivered(connote, item_nbr)
+            pending.append((id, connote, item_nbr, tcd_delivered))
+
+        ts_delivered = self.connotes_delivered([(x[1], x[2])
+                                                for x in pending
+                                                if not x[3]])
+
+        for (id, connote, item_nbr, delivered_status) in pending:
+            if not delivered_status:
+                delivered_status = (connote, item_nbr) in ts_delivered
 
-                if delivered_status:
-                    log.debug('Preparing comms for job_item.id: %d' % id)
-                    if not dry:
-                        if (self.flag_comms('email', id, template) and
-                            self.flag_comms('sms', id, template)):
-                            processed_ids.append(id)
+            if delivered_status:
+                log.debug('Preparing comms for job_item.id: %d' % id)
+                if not dry:
+                    if (self.flag_comms('email', id, template) and
+                        self.flag_comms('sms', id, template)):
+                        processed_ids.append(id)
 
             log.debug('On Del id|connote|item: "%s|%s|%s" check complete' %
                       (id, connote, item_nbr))
 
         if in_files is not None:
-            self.parser.purge()
+            self.purge_delivery_index()
 
         return processed_ids
 
+    def load_delivery_index(self, in_files):
+        """Parse the TCD delivery reports *in_files* into the
+        :attr:`parser` delivery index.
+
+        The index is only read by :meth:`process` so it can be loaded
+        once and shared by successive :meth:`process` calls that do
+        not provide *in_files*.  Release it with
+        :meth:`purge_delivery_index`.
+
+        **Args:**
+            *in_files*: list of paths to the TCD delivery reports
+
+        """
+        self.parser.set_in_files(in_files)
+        self.parser.read()
+        log.debug('TCD delivery index loaded from %d files' %
+                  len(in_files))
+
+    def purge_delivery_index(self):
+        """Release the :attr:`parser` delivery index.
+        """
+        self.parser.purge()
+
     def connote_delivered(self, connote_nbr, item_nbr):
         """Check if *connote_nbr* and *item_nbr* has been delivered.
 
@@ -293,9 +406,9 @@ class OnDelivery(top.Service):
 
         delivered = False
         if self.ts_db is not None:
-            sql = self.ts_db.transsend.connote_sql(connote_nbr=connote_nbr,
-                                                   item_nbr=item_nbr)
-            self.ts_db(sql)
+            sql = self.ts_db.transsend.connote_bind_sql()
+            self.ts_db(sql, {'connote_nbr': connote_nbr,
+                             'item_nbr': item_nbr})
 
             headers = self.ts_db.columns()
             log.debug('Headers received: %s' % str(headers))
@@ -305,24 +418,7 @@ class OnDelivery(top.Service):
             log.debug('Scanned desc header index: %d' % scan_index)
 
             for row in self.ts_db.rows():
-                log.debug('TransSend "%s" value: "%s"' %
-                          (self.delivered_header, row[index].lower()))
-
-                # Check if the scanned description suggests that we need
-                # to suppress the row.
-                suppress = False
-                for scanned_desc in self.scan_desc_keys:
-                    log.debug('scanned desc|row value "%s|%s"' %
-                              (scanned_desc, str(row[scan_index])))
-                    if (row[scan_index] is not None and
-                        row[scan_index].lower() == scanned_desc.lower()):
-                        suppress = True
-                        break
-
-                log.debug('Suppress scanned desc row value "%s"?: %s' %
-                          (row[scan_index], str(suppress)))
-                if (not suppress and
-                    row[index].lower() == self.delivered_event_key):
+                if self.ts_event_delivered(row[index], row[scan_index]):
                     delivered = True
                     break
 
@@ -331,3 +427,85 @@ class OnDelivery(top.Service):
                     (connote_nbr, item_nbr, delivered))
 
         return delivered
+
+    def connotes_delivered(self, connotes):
+        """Bulk variant of :meth:`connote_delivered`.
+
+        TransSend is queried in chunks of :attr:`ts_chunk_size`
+        connotes and the item numbers (and scanned description
+        suppression) are matched in memory.
+
+        **Args:**
+            *connotes*: list of (*connote_nbr*, *item_nbr*) tuples
+
+        **Returns:**
+            set of the *connotes* (*connote_nbr*, *item_nbr*) tuples
+            that have been delivered
+
+        """
+        delivered = set()
+
+        pairs = set(connotes)
+        # Connotes sourced from the ODBC driver may be unicode.
+        connote_nbrs = sorted(set([str(x[0]) for x in pairs]))
+        columns = [self.delivered_header, self.scan_desc_header]
+
+        if self.ts_db is not None and connote_nbrs:
+            log.debug('TransSend bulk check of %d connote|item pairs' %
+                      len(pairs))
+            size = min(self.ts_chunk_size, len(connote_nbrs))
+            sql = self.ts_db.transsend.connotes_bind_sql(size,
+                                                         columns=columns)
+            for i in range(0, len(connote_nbrs), size):
+                chunk = connote_nbrs[i:i + size]
+
+                # Pad the last chunk so that every chunk reuses the
+                # same (parsed) statement.
+                chunk.extend([chunk[-1]] * (size - len(chunk)))
+                params = dict([('connote_%d' % x, chunk[x])
+                               for x in range(size)])
+                self.ts_db(sql, params)
+                for row in self.ts_db.rows():
+                    (connote_nbr, item_nbr, event, scan_desc) = row
+                    key = (connote_nbr, item_nbr)
+                    if (key in pairs and
+                        key not in delivered and
+                        self.ts_event_delivered(event, scan_desc)):
+                        log.info('TransSend connote|item "%s|%s" delivery '
+                                 'status: True' % key)
+                        delivered.add(key)
+
+        return delivered
+
+    def ts_event_delivered(self, event, scan_desc):
+        """Check if a TransSend row denotes a delivered item.
+
+        A row is delivered if its latest scan *event* matches
+        :attr:`delivered_event_key` and its scanned description
+        *scan_desc* is not one of the :attr:`scan_desc_keys`.
+
+        **Args:**
+            *event*: the :attr:`delivered_header` column value
+
+            *scan_desc*: the :attr:`scan_desc_header` column value
+
+        **Returns:**
+            boolean ``True`` if the row is delivered
+
+        """
+        log.debug('TransSend "%s" value: "%s"' %
+                  (self.delivered_header, event.lower()))
+
+        # Check if the scanned description suggests that we need
+        # to suppress the row.
+        suppress = False
+        if scan_desc is not None:
+            for scanned_desc in self.scan_desc_keys:
+                if scan_desc.lower() == scanned_desc.lower():
+                    suppress = True
+                    break
+
+        log.debug('Suppress scanned desc row value "%s"?: %s' %
+                  (scan_desc, str(suppress)))
+
+        return not suppress and event.lower() == self.delivered_event_key
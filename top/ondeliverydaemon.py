@@ -1,7 +1,6 @@
 __all__ = [
     "OnDeliveryDaemon",
 ]
-import time
 import signal
 
 import top
@@ -83,6 +82,13 @@ class OnDeliveryDaemon(top.DaemonService):
         number of date-orderd TCD files to load during a processing loop
         (default 5)
 
+    .. attribute:: tcd_index
+
+        path to a persistent :class:`top.TcdIndex` TCD delivery index.
+        If set, only TCD files that have not been indexed before are
+        parsed each processing loop.  Otherwise, the TCD files are
+        parsed into memory every loop (default ``None``)
+
     .. attribute:: business_units
 
          dictionary of business units names and their bu_ids as per the
@@ -105,6 +111,7 @@ class OnDeliveryDaemon(top.DaemonService):
     _sc4_delay_bu_ids = ()
     _day_range = 14
     _file_cache_size = 5
+    _tcd_index = None
     _business_units = {}
     _comms_delivery_partners = {}
 
@@ -208,6 +215,14 @@ class OnDeliveryDaemon(top.DaemonService):
     def set_file_cache_size(self, value):
         pass
 
+    @property
+    def tcd_index(self):
+        return self._tcd_index
+
+    @set_scalar
+    def set_tcd_index(self, value):
+        pass
+
     def __init__(self,
                  pidfile,
                  file=None,
@@ -233,6 +248,7 @@ class OnDeliveryDaemon(top.DaemonService):
             self.set_sc4_delay_bu_ids(self.config.sc4_delay_ids)
             self.set_day_range(self.config.uncollected_day_range)
             self.set_file_cache_size(self.config.file_cache_size)
+            self.set_tcd_index(self.config.tcd_index)
             self.set_business_units(self.config.business_units)
             dps = self.config.comms_delivery_partners
             self.set_comms_delivery_partners(dps)
@@ -266,12 +282,17 @@ class OnDeliveryDaemon(top.DaemonService):
                                       comms_dir=comms_dir)
 
             if self.config is not None:
+                self._od.set_comms_spool(self.config.comms_spool)
                 self._od.set_delivered_header(self.config.delivered_header)
                 event_key = self.config.delivered_event_key
                 self._od.set_delivered_event_key(event_key)
                 self._od.set_scan_desc_header(self.config.scan_desc_header)
                 self._od.set_scan_desc_keys(self.config.scan_desc_keys)
 
+            if self.tcd_index is not None:
+                index = top.TcdIndex(self.tcd_index, day_range=self.day_range)
+                self._od.set_parser(index)
+
     def _start(self, event):
         """Override the :method:`top.utils.Daemon._start` method.
 
@@ -302,36 +323,38 @@ class OnDeliveryDaemon(top.DaemonService):
                 else:
                     tcd_files.extend(self.get_files(dry=self.dry))
 
-            log.debug('Attempting On Delivery Primary Elect check ...')
-            for bu_id in self.pe_bu_ids:
-                log.debug('PE check for bu_id: %d' % bu_id)
-                dps = self.delivery_partner_lookup(bu_id)
-                kwargs = {'template': 'pe',
-                          'service_code': 3,
-                          'bu_ids': (bu_id, ),
-                          'in_files': tcd_files,
-                          'day_range': self.day_range,
-                          'delivery_partners': dps,
-                          'dry': self.dry}
-                processed_ids = self.od.process(**kwargs)
-                log.debug('PE (BU: %d) job_items.id comms created: "%s"' %
-                          (bu_id, processed_ids))
-
-            log.debug('Attempting Service Code 4 On Delivery check ...')
-            for bu_id in self.sc4_bu_ids:
-                log.debug('SC4 check for bu_id: %d' % bu_id)
-                dps = self.delivery_partner_lookup(bu_id)
-                template = self.template_lookup(bu_id)
-                kwargs = {'template': template,
-                          'service_code': 4,
-                          'bu_ids': (bu_id, ),
-                          'in_files': tcd_files,
-                          'day_range': self.day_range,
-                          'delivery_partners': dps,
-                          'dry': self.dry}
-                processed_ids = self.od.process(**kwargs)
-                log.debug('SC4 (BU: %d) job_items.id comms created: "%s"' %
-                          (bu_id, processed_ids))
+            # Parse the TCD reports once and share the delivery index
+            # across all BU passes of this cycle.
+            self.od.load_delivery_index(tcd_files)
+            try:
+                log.debug('Attempting On Delivery Primary Elect check ...')
+                job_items = self.uncollected_job_items(3, self.pe_bu_ids)
+                for bu_id in self.pe_bu_ids:
+                    log.debug('PE check for bu_id: %d' % bu_id)
+                    kwargs = {'template': 'pe',
+                              'service_code': 3,
+                              'bu_ids': (bu_id, ),
+                              'job_items': job_items.get(bu_id, []),
+                              'dry': self.dry}
+                    processed_ids = self.od.process(**kwargs)
+                    log.debug('PE (BU: %d) job_items.id comms created: "%s"' %
+                              (bu_id, processed_ids))
+
+                log.debug('Attempting Service Code 4 On Delivery check ...')
+                job_items = self.uncollected_job_items(4, self.sc4_bu_ids)
+                for bu_id in self.sc4_bu_ids:
+                    log.debug('SC4 check for bu_id: %d' % bu_id)
+                    template = self.template_lookup(bu_id)
+                    kwargs = {'template': template,
+                              'service_code': 4,
+                              'bu_ids': (bu_id, ),
+                              'job_items': job_items.get(bu_id, []),
+                              'dry': self.dry}
+                    processed_ids = self.od.process(**kwargs)
+                    log.debug('SC4 (BU: %d) job_items.id comms created: "%s"' %
+                              (bu_id, processed_ids))
+            finally:
+                self.od.purge_delivery_index()
 
             if not event.isSet():
                 if self.dry:
@@ -341,7 +364,7 @@ class OnDeliveryDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop, dirs=self.report_in_dirs)
 
     def get_files(self, dry=False):
         """Searches the :attr:`top.OnDeliveryDaemon.report_in_dirs`
@@ -382,6 +405,34 @@ class OnDeliveryDaemon(top.DaemonService):
 
         return files_to_parse
 
+    def uncollected_job_items(self, service_code, bu_ids):
+        """Extract the uncollected *service_code* based job items of all
+        *bu_ids* with a single query.  Each Business Unit's job items are
+        filtered against its :meth:`delivery_partner_lookup` Delivery
+        Partners.
+
+        **Args:**
+            *service_code*: integer of ``job.service_code`` columns
+
+            *bu_ids*: the Business Unit IDs to search against
+
+        **Returns:**
+            dictionary of Business Unit IDs and their list of uncollected
+            job items as per
+            :meth:`top.OnDelivery.get_uncollected_job_items_by_bu`
+
+        """
+        job_items = {}
+
+        if bu_ids:
+            dps = dict([(x, self.delivery_partner_lookup(x)) for x in bu_ids])
+            kwargs = {'service_code': service_code,
+                      'bu_delivery_partners': dps,
+                      'day_range': self.day_range}
+            job_items = self.od.get_uncollected_job_items_by_bu(**kwargs)
+
+        return job_items
+
     def delivery_partner_lookup(self, bu_id):
         """Lookup method that identifies the business unit name associated
         with *bu_id* and returns a tuple of Delivery Partners to filter
@@ -1,7 +1,10 @@
 ora__all__ = [
     "oradbsession",
 ]
-import sqlite
+try:
+    from pysqlite2 import dbapi2 as sqlite
+except ImportError:
+    import sqlite
 import datetime
 import cx_Oracle
 
@@ -26,9 +29,22 @@ class OraDbSession(object):
 
         TransSend database ORM object based on :mod:`top.TransSend`
 
+    .. attribute:: arraysize
+
+        number of rows fetched (and prefetched) per database round-trip
+        (default 500)
+
+    .. attribute:: stmt_cache_size
+
+        number of parsed statements cached by the Oracle connection so
+        that repeated bind variable based statements avoid a hard parse
+        (default 50)
+
     """
     _connection = None
     _cursor = None
+    _arraysize = 500
+    _stmt_cache_size = 50
     _transsend = top.TransSend()
     _host = None
     _database = None
@@ -50,12 +66,31 @@ class OraDbSession(object):
                 except ValueError, e:
                     log.error('Port "%s" could not cast to int: %s' % e)
             self._sid = kwargs.get('sid')
+            if kwargs.get('arraysize') is not None:
+                self.set_arraysize(kwargs.get('arraysize'))
+            if kwargs.get('stmt_cache_size') is not None:
+                self.set_stmt_cache_size(kwargs.get('stmt_cache_size'))
+
+    def __call__(self, sql=None, params=None):
+        """Class callable that can execute *sql* or perform a simple
+        connection check if *sql* is ``None``.
 
-    def __call__(self, sql=None):
+        **Kwargs:**
+            *sql*: the SQL string to execute
+
+            *params*: dictionary of bind variable values for the
+            ``:<name>`` placeholders in *sql*.  Executing the same *sql*
+            with different *params* reuses the parsed statement
+
+        """
         if sql is not None:
             try:
                 log.debug('Executing SQL:\n%s' % sql)
-                self.cursor.execute(sql)
+                if params is None:
+                    self.cursor.execute(sql)
+                else:
+                    log.debug('Bind variables: %s' % str(params))
+                    self.cursor.execute(sql, params)
             except Exception, e:
                 if self.connection is not None:
                     log.error('ODBC error: %s' % str(e))
@@ -110,6 +145,31 @@ class OraDbSession(object):
     def transsend(self):
         return self._transsend
 
+    @property
+    def arraysize(self):
+        return self._arraysize
+
+    def set_arraysize(self, value):
+        self._arraysize = value
+        log.debug('Set DB arraysize to %d' % self.arraysize)
+
+        if self.cursor is not None:
+            self.cursor.arraysize = self.arraysize
+            if hasattr(self.cursor, 'prefetchrows'):
+                self.cursor.prefetchrows = self.arraysize
+
+    @property
+    def stmt_cache_size(self):
+        return self._stmt_cache_size
+
+    def set_stmt_cache_size(self, value):
+        self._stmt_cache_size = value
+        log.debug('Set DB statement cache size to %d' %
+                  self.stmt_cache_size)
+
+        if self.connection is not None and self.host is not None:
+            self.connection.stmtcachesize = self.stmt_cache_size
+
     @property
     def conn_string(self):
         return '%s/%s@%s:%d/%s' % (self.user,
@@ -129,10 +189,17 @@ class OraDbSession(object):
         return time[:-3]
 
     def rows(self):
+        """Generator that streams the rows of the current cursor context
+        in batches of :attr:`arraysize`.
+
         """
-        """
-        for row in self.cursor.fetchall():
-            yield row
+        while True:
+            rows = self.cursor.fetchmany(self.arraysize)
+            if not rows:
+                break
+
+            for row in rows:
+                yield row
 
     def set_connection(self, value):
         self._connection = value
@@ -156,6 +223,8 @@ class OraDbSession(object):
 
         if self.connection is not None:
             self.set_cursor(self.connection.cursor())
+            self.set_arraysize(self.arraysize)
+            self.set_stmt_cache_size(self.stmt_cache_size)
             log.info('DB session creation OK')
             if self.host is not None:
                 self('ALTER SESSION SET CURRENT_SCHEMA = transsendops_prd')
@@ -1,6 +1,7 @@
 __all__ = [
     "Parser",
 ]
+import operator
 
 
 class Parser(object):
@@ -11,6 +12,11 @@ class Parser(object):
         A dictionary based data structure that identifies the elements
         of interest.
 
+    .. attribute:: field_names
+
+        tuple of the :attr:`fields` names in the order that the values
+        are presented by :meth:`parse_record`
+
     """
 
     def __init__(self,
@@ -22,23 +28,76 @@ class Parser(object):
         else:
             self._fields = {}
 
+        self.compile_fields()
+
+    @property
+    def field_names(self):
+        return self._field_names
+
+    def compile_fields(self):
+        """Build the slice plan for the current :attr:`fields`.
+
+        The field offsets and lengths are converted to :func:`slice`
+        objects once and wrapped in a single :func:`operator.itemgetter`
+        so that a line can be split in one call rather than walking the
+        :attr:`fields` dictionary for every line.
+
+        """
+        names = []
+        slices = []
+        for field_name, field_settings in self._fields.iteritems():
+            start = field_settings.get('offset')
+            end = start + field_settings.get('length')
+            names.append(field_name)
+            slices.append(slice(start, end))
+
+        self._field_names = tuple(names)
+
+        if not slices:
+            self._extractor = lambda line: ()
+        elif len(slices) == 1:
+            getter = operator.itemgetter(slices[0])
+            self._extractor = lambda line: (getter(line),)
+        else:
+            self._extractor = operator.itemgetter(*slices)
+
+    def parse_record(self, line):
+        """Extract the :attr:`fields` values from *line*.
+
+        **Args:**
+            **line:** string of characters to extract fields from.
+
+        **Returns:**
+            tuple of field values in :attr:`field_names` order
+
+        """
+        return tuple([x.rstrip() for x in self._extractor(line)])
+
     def parse_line(self, line):
         """
         **Args:**
             **line:** string of characters to extract fields from.
 
         **Returns:**
+            dictionary of field names and their values
 
         """
-        result = {}
+        return dict(zip(self._field_names, self.parse_record(line)))
 
-        for field_name, field_settings in self.get_fields().iteritems():
-            start = field_settings.get('offset')
-            end = start + field_settings.get('length')
-            value = line[start:end].rstrip()
-            result[field_name] = value
+    def parse_lines(self, lines):
+        """Bulk variant of :meth:`parse_record`.
+
+        **Args:**
+            **lines:** iterable of strings to extract fields from.  For
+            example, an open file object
 
-        return result
+        **Returns:**
+            generator of tuple records in :attr:`field_names` order
+
+        """
+        extractor = self._extractor
+        for line in lines:
+            yield tuple([x.rstrip() for x in extractor(line)])
 
     def get_fields(self):
         return self._fields
@@ -47,5 +106,6 @@ class Parser(object):
         if isinstance(value, dict):
             for k, v in value.iteritems():
                 self._fields[k] = v
+            self.compile_fields()
         else:
             raise TypeError('Token assignment expected dictionary')
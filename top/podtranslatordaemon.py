@@ -2,7 +2,6 @@ __all__ = [
     "PodTranslatorDaemon",
 ]
 import signal
-import time
 import os
 import datetime
 
@@ -153,7 +152,7 @@ class PodTranslatorDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop, dirs=self.in_dirs)
 
     def move_signature_files(self,
                              token,
@@ -66,7 +66,8 @@ class Reminder(top.Service):
         """
         top.Service.__init__(self,
                              db=kwargs.get('db'),
-                             comms_dir=kwargs.get('comms_dir'))
+                             comms_dir=kwargs.get('comms_dir'),
+                             comms_spool=kwargs.get('comms_spool'))
 
         if kwargs.get('notification_delay') is not None:
             self.set_notification_delay(kwargs.get('notification_delay'))
@@ -1,7 +1,6 @@
 __all__ = [
     "RemindDaemon",
 ]
-import time
 import signal
 
 import top
@@ -38,6 +37,7 @@ class ReminderDaemon(top.DaemonService):
 
         kwargs['db'] = self.config.db_kwargs()
         kwargs['comms_dir'] = self.config.comms_dir
+        kwargs['comms_spool'] = self.config.comms_spool
         kwargs['notification_delay'] = self.config.notification_delay
         kwargs['hold_period'] = self.config.hold_period
         kwargs['start_date'] = self.config.start_date
@@ -76,4 +76,4 @@ class ReminderDaemon(top.DaemonService):
                     log.info('Batch run iteration complete -- aborting')
                     event.set()
                 else:
-                    time.sleep(self.loop)
+                    self.wait(self.loop)
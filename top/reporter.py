@@ -88,6 +88,29 @@ class Reporter(object):
         self._start_time = datetime.datetime.now()
         self._end_time = None
 
+    def merge(self, reporter):
+        """Add the counters of another *reporter* into this reporter.
+
+        The merged duration spans the earliest start time and the latest
+        end time of both reporters.
+
+        **Args:**
+            *reporter*: a :class:`top.Reporter` object.  For example,
+            as returned from a loader worker process
+
+        """
+        self._total_count += reporter.total_count
+        self._good_records += reporter.good_records
+        self._bad_records += reporter.bad_records
+        self._other_records += reporter.other_records
+
+        if reporter.start_time < self.start_time:
+            self._start_time = reporter.start_time
+
+        if (reporter.end_time is not None and
+            (self.end_time is None or reporter.end_time > self.end_time)):
+            self._end_time = reporter.end_time
+
     @property
     def end(self):
         self._end_time = datetime.datetime.now()
@@ -1,10 +1,161 @@
 __all__ = [
     "Rest",
+    "HttpConnectionPool",
 ]
+import time
+import base64
+import select
 import socket
+import httplib
+import urlparse
+import threading
 
 from top.utils.log import log
 
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class HttpConnectionPool(object):
+    """Thread-safe pool of idle keep-alive HTTP/HTTPS connections.
+
+    Connections are keyed by scheme, host, port and proxy so that a
+    connection (including an established proxy ``CONNECT`` tunnel) is
+    only reused for the same endpoint.
+
+    .. attribute:: max_size
+
+        maximum number of idle connections held for each endpoint
+        (default 4)
+
+    .. attribute:: idle_timeout
+
+        time (seconds) after which an idle connection is discarded
+        rather than reused (default 60)
+
+    Idle connections that the server has since closed are also
+    discarded (see :meth:`stale`).
+
+    """
+    _max_size = 4
+    _idle_timeout = 60
+
+    def __init__(self, max_size=None, idle_timeout=None):
+        """:class:`top.HttpConnectionPool` initialiser.
+        """
+        self._lock = threading.Lock()
+        self._idle = {}
+
+        if max_size is not None:
+            self.set_max_size(max_size)
+
+        if idle_timeout is not None:
+            self.set_idle_timeout(idle_timeout)
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def set_max_size(self, value):
+        self._max_size = value
+        log.debug('HTTP connection pool max_size set to %d' % self.max_size)
+
+    @property
+    def idle_timeout(self):
+        return self._idle_timeout
+
+    def set_idle_timeout(self, value):
+        self._idle_timeout = value
+        log.debug('HTTP connection pool idle_timeout set to %d' %
+                  self.idle_timeout)
+
+    def get(self, key):
+        """Check out an idle connection for endpoint *key*.
+
+        **Args:**
+            *key*: endpoint tuple of the form
+            (*scheme*, *host*, *port*, *proxy*)
+
+        **Returns:**
+            :class:`httplib.HTTPConnection` type object or ``None`` if
+            there are no reusable idle connections
+
+        """
+        conn = None
+
+        now = time.time()
+        self._lock.acquire()
+        try:
+            idle = self._idle.get(key, [])
+            while idle and conn is None:
+                (candidate, last_used) = idle.pop()
+                if (now - last_used > self.idle_timeout or
+                        self.stale(candidate)):
+                    candidate.close()
+                else:
+                    conn = candidate
+        finally:
+            self._lock.release()
+
+        return conn
+
+    def stale(self, conn):
+        """Check if the server has closed the idle connection *conn*.
+
+        An idle keep-alive socket should have nothing to read.  If it
+        is readable then the server has either closed the connection
+        or sent unsolicited data and the connection cannot be reused.
+
+        **Returns:**
+            boolean ``True`` if *conn* should not be reused
+
+        """
+        is_stale = False
+
+        sock = conn.sock
+        if sock is not None:
+            try:
+                (readable, writable, errors) = select.select([sock],
+                                                             [],
+                                                             [],
+                                                             0)
+                is_stale = len(readable) > 0
+            except (select.error, socket.error, ValueError):
+                is_stale = True
+
+        return is_stale
+
+    def put(self, key, conn):
+        """Return *conn* to the pool for endpoint *key*.  The connection
+        is closed if the pool for *key* is already full.
+        """
+        self._lock.acquire()
+        try:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_size:
+                idle.append((conn, time.time()))
+                conn = None
+        finally:
+            self._lock.release()
+
+        if conn is not None:
+            conn.close()
+
+    def clear(self):
+        """Close all idle connections.
+        """
+        self._lock.acquire()
+        try:
+            for idle in self._idle.values():
+                for (conn, last_used) in idle:
+                    conn.close()
+            self._idle.clear()
+        finally:
+            self._lock.release()
+
+
+# Shared across all REST clients in the process.
+POOL = HttpConnectionPool()
+
 
 class Rest(object):
     """REST-based class.
@@ -34,9 +185,29 @@ class Rest(object):
         string containing the hostname of the machine where the Python
         interpreter is currently executing
 
+    .. attribute:: pool
+
+        :class:`top.HttpConnectionPool` that keep-alive connections to
+        the :attr:`api` host are drawn from (default is the pool shared
+        by all REST clients in the process)
+
+    .. attribute:: timeout
+
+        socket timeout (seconds) for the connection to the :attr:`api`
+        host (default 30)
+
+    .. attribute:: last_code
+
+        HTTP status code of the last :meth:`post`.  ``None`` if the
+        request could not be made and ``0`` if no request has been made
+        since :meth:`set_last_code` was called
+
     """
     _facility = None
     _hostname = socket.gethostname()
+    _pool = POOL
+    _timeout = 30
+    _last_code = 0
 
     def __init__(self,
                  proxy=None,
@@ -109,3 +280,197 @@ class Rest(object):
         self._hostname = value
         log.debug('%s hostname set to "%s"' %
                   (self.facility, self.hostname))
+
+    @property
+    def pool(self):
+        return self._pool
+
+    def set_pool(self, value):
+        self._pool = value
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    def set_timeout(self, value):
+        self._timeout = value
+        log.debug('%s timeout set to %s' % (self.facility, self.timeout))
+
+    @property
+    def last_code(self):
+        return self._last_code
+
+    def set_last_code(self, value=0):
+        self._last_code = value
+
+    def transient_failure(self):
+        """Check if the last :meth:`post` failed in a way that is likely
+        to be temporary: no response, HTTP 429 (too many requests) or
+        an HTTP 5xx server error.
+
+        **Returns:**
+            boolean ``True`` if the last request failed transiently
+
+        """
+        code = self.last_code
+
+        return code is None or code == 429 or code >= 500
+
+    def parse_proxy(self):
+        """Split :attr:`proxy` into its components.  :attr:`proxy` is of
+        the form ``[<scheme>://][<user>:<password>@]<host>[:<port>]``.
+
+        **Returns:**
+            tuple of the form (*host*, *port*, *credentials*) where
+            *credentials* is ``None`` if not provided
+
+        """
+        proxy = self.proxy
+        if '://' in proxy:
+            proxy = proxy.split('://', 1)[1]
+
+        credentials = None
+        if '@' in proxy:
+            (credentials, proxy) = proxy.rsplit('@', 1)
+
+        port = DEFAULT_PORTS.get(self.proxy_scheme, 80)
+        if ':' in proxy:
+            (proxy, port) = proxy.rsplit(':', 1)
+            port = int(port)
+
+        return (proxy, port, credentials)
+
+    def connect(self, scheme, host, port, proxy=None):
+        """Create a new (unconnected) HTTP/HTTPS connection to *host*.
+
+        If *proxy* is set then the connection is made to the proxy.
+        HTTPS connections are tunneled through the proxy.
+
+        **Returns:**
+            :class:`httplib.HTTPConnection` type object
+
+        """
+        connection_class = httplib.HTTPConnection
+        if scheme == 'https':
+            connection_class = httplib.HTTPSConnection
+
+        if proxy is None:
+            conn = connection_class(host, port)
+        else:
+            (proxy_host, proxy_port, credentials) = self.parse_proxy()
+            conn = connection_class(proxy_host, proxy_port)
+            if scheme == 'https':
+                headers = {}
+                if credentials is not None:
+                    auth = self.basic_auth(credentials)
+                    headers['Proxy-Authorization'] = auth
+                conn.set_tunnel(host, port, headers)
+
+        return conn
+
+    def basic_auth(self, credentials):
+        """HTTP Basic authentication header value for *credentials*
+        (``<user>:<password>``).
+        """
+        return 'Basic %s' % base64.b64encode(credentials)
+
+    def post(self, data, headers=None, url=None):
+        """POST *data* to *url* over a pooled keep-alive connection.
+
+        A connection that was reused from the :attr:`pool` and has been
+        closed by the server is retried once on a new connection, but
+        only if sending the request failed.  Once the request has been
+        sent it is never retried as the server may already have acted
+        on it.
+
+        **Args:**
+            *data*: the request body
+
+        **Kwargs:**
+            *headers*: dictionary of additional request headers
+
+            *url*: URL to POST to (default :attr:`api`)
+
+        **Returns:**
+            tuple of the form (*status_code*, *response*).  Both are
+            ``None`` if the request could not be made
+
+        """
+        if url is None:
+            url = self.api
+
+        (scheme, host, path, query, fragment) = urlparse.urlsplit(url)
+        if '@' in host:
+            host = host.rsplit('@', 1)[1]
+        port = DEFAULT_PORTS.get(scheme, 80)
+        if ':' in host:
+            (host, port) = host.rsplit(':', 1)
+            port = int(port)
+        if not path:
+            path = '/'
+        if query:
+            path += '?' + query
+
+        proxy = None
+        if self.proxy is not None and self.proxy_scheme == scheme:
+            proxy = self.proxy
+
+        request_headers = {'Content-Type':
+                           'application/x-www-form-urlencoded'}
+        if headers is not None:
+            request_headers.update(headers)
+
+        target = path
+        if proxy is not None and scheme == 'http':
+            # Plain HTTP proxies take the absolute URL.
+            target = url
+            (proxy_host, proxy_port, credentials) = self.parse_proxy()
+            if credentials is not None:
+                auth = self.basic_auth(credentials)
+                request_headers['Proxy-Authorization'] = auth
+
+        key = (scheme, host, port, proxy)
+        code = None
+        response = None
+        for attempt in range(2):
+            conn = None
+            if not attempt:
+                conn = self.pool.get(key)
+            reused = conn is not None
+            if conn is None:
+                conn = self.connect(scheme, host, port, proxy)
+
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                    conn.sock.settimeout(self.timeout)
+                conn.request('POST', target, data, request_headers)
+            except (httplib.HTTPException, socket.error), err:
+                conn.close()
+                if reused:
+                    log.debug('%s stale connection to %s: %s -- retrying' %
+                              (self.facility, host, err))
+                    continue
+                log.error('%s POST to %s failed: %s' %
+                          (self.facility, url, err))
+                break
+
+            try:
+                resp = conn.getresponse()
+                response = resp.read()
+                code = resp.status
+            except (httplib.HTTPException, socket.error), err:
+                conn.close()
+                log.error('%s POST to %s response failed: %s' %
+                          (self.facility, url, err))
+                break
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self.pool.put(key, conn)
+            break
+
+        self.set_last_code(code)
+
+        return (code, response)
@@ -4,7 +4,6 @@ __all__ = [
 import urllib
 
 import top
-import top.urllib2 as urllib2
 from top.utils.log import log
 
 
@@ -48,6 +47,18 @@ class RestEmailer(top.Emailer):
     def support(self):
         return self._support
 
+    @property
+    def last_code(self):
+        return self._rest.last_code
+
+    def set_last_code(self, value=0):
+        self._rest.set_last_code(value)
+
+    def transient_failure(self):
+        """See :meth:`top.Rest.transient_failure`.
+        """
+        return self._rest.transient_failure()
+
     def set_support(self, value):
         self._support = value.split(',')
 
@@ -118,28 +129,16 @@ class RestEmailer(top.Emailer):
                                   recipient=recipient,
                                   msg=msg)
 
-        proxy_kwargs = {}
-        if self._rest.proxy is not None:
-            proxy_kwargs = {self._rest.proxy_scheme: self.proxy}
-        proxy = urllib2.ProxyHandler(proxy_kwargs)
-        auth = urllib2.HTTPBasicAuthHandler()
-        opener = urllib2.build_opener(proxy,
-                                      auth,
-                                      urllib2.HTTPSHandler)
-        urllib2.install_opener(opener)
-
-        req = urllib2.Request(self._rest.api, data, {})
         if not dry:
-            try:
-                conn = urllib2.urlopen(req)
-                if conn.code != 200:
-                    log.error('Email comms return code: %d' % conn.code)
+            (code, response) = self._rest.post(data)
+            if code is None:
+                status = False
+                log.warn('Email failure: no response from API')
+            else:
+                if code != 200:
+                    log.error('Email comms return code: %d' % code)
                     status = False
-                response = conn.read()
                 log.info('Email receive: "%s"' % response)
-            except urllib2.URLError, e:
-                status = False
-                log.warn('Email failure: %s' % e)
 
         return status
 
@@ -209,27 +208,16 @@ class RestEmailer(top.Emailer):
                  ('message', data)]
             encoded_msg = urllib.urlencode(f)
 
-            proxy_kwargs = {}
-            if self._rest.proxy is not None:
-                proxy_kwargs = {self._rest.proxy_scheme: self._rest.proxy}
             log.debug('proxy_scheme: %s' % self._rest.proxy_scheme)
             log.debug('proxy: %s' % self._rest.proxy)
-            proxy = urllib2.ProxyHandler(proxy_kwargs)
-            auth = urllib2.HTTPBasicAuthHandler()
-            opener = urllib2.build_opener(proxy,
-                                          auth,
-                                          urllib2.HTTPSHandler)
-            urllib2.install_opener(opener)
 
             log.debug('Preparing request to API: "%s"' % self._rest.api)
-            req = urllib2.Request(self._rest.api, encoded_msg, {})
             if not dry:
-                try:
-                    conn = urllib2.urlopen(req)
-                    response = conn.read()
-                    log.info('Email receive: "%s"' % response)
-                except urllib2.URLError, e:
+                (code, response) = self._rest.post(encoded_msg)
+                if code is None or code >= 400:
                     status = False
-                    log.error('Email failure: %s' % e)
+                    log.error('Email failure: return code %s' % str(code))
+                else:
+                    log.info('Email receive: "%s"' % response)
 
         return status
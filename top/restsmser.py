@@ -5,12 +5,15 @@ import re
 import os
 import base64
 from elementtree import ElementTree
+from xml.parsers.expat import ExpatError
 
 import top
-import top.urllib2 as urllib2
 from top.utils.log import log
 from top.utils.files import templater
 
+# Per-message API statuses that indicate the message was not accepted.
+FAILED_STATUSES = ['failed', 'rejected']
+
 
 class RestSmser(top.Rest):
     """RestSmser.
@@ -18,8 +21,13 @@ class RestSmser(top.Rest):
     .. attribute:: template_base
         directory where templates are read from
 
+    .. attribute:: batch_size
+        maximum number of SMS messages sent in a single API request
+        by :meth:`send_batch` (default 1)
+
     """
     _facility = None
+    _batch_size = 1
     _template_base = os.path.join(os.path.expanduser('~'),
                                   '.top',
                                   'templates')
@@ -49,6 +57,15 @@ class RestSmser(top.Rest):
         log.debug('%s template_base set to "%s"' %
                   (self._facility, self.template_base))
 
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    def set_batch_size(self, value):
+        self._batch_size = max(1, int(value))
+        log.debug('%s batch_size set to %d' %
+                  (self._facility, self.batch_size))
+
     def create_comms(self,
                      data,
                      template='body',
@@ -125,46 +142,276 @@ class RestSmser(top.Rest):
 
         if status:
             log.debug('REST SMS data: %s' % data)
-            proxy_kwargs = {}
-            if self.proxy is not None:
-                proxy_kwargs = {self.proxy_scheme: self.proxy}
             log.debug('proxy_scheme: %s' % self.proxy_scheme)
             log.debug('proxy: %s' % self.proxy)
-            proxy = urllib2.ProxyHandler(proxy_kwargs)
-            auth = urllib2.HTTPBasicAuthHandler()
-            opener = urllib2.build_opener(proxy,
-                                          auth,
-                                          urllib2.HTTPSHandler)
-            urllib2.install_opener(opener)
-
-            log.debug('Preparing request to API: "%s"' % self.api)
-            hdr = {'Content-Type': 'application/xml'}
-            req = urllib2.Request(self.api, data, headers=hdr)
-            b64str = base64.encodestring('%s:%s' %
-                                         (self._api_username,
-                                          self._api_password))
-            log.debug('SMS API username: "%s"' % self._api_username)
-            if self._api_password:
-                log.debug('SMS API password: "********"')
-            else:
-                log.debug('SMS API password undefined')
-            req.add_header("Authorization",
-                           "Basic %s" % b64str.replace('\n', ''))
 
             if not dry:
-                try:
-                    conn = urllib2.urlopen(req)
-                    if conn.code != 200:
-                        log.error('SMS comms return code: %d' % conn.code)
+                (code, response) = self.post(data, headers=self.headers())
+                if code is None:
+                    log.error('SMS failure: no response from API')
+                    status = False
+                else:
+                    if code != 200:
+                        log.error('SMS comms return code: %d' % code)
                         status = False
-                    response = conn.read()
                     log.info('SMS receive: "%s"' % response)
-                except urllib2.URLError, e:
-                    log.error('SMS failure: %s' % e)
-                    status = False
 
         return status
 
+    def headers(self):
+        """Build the HTTP request headers for the SMS API.
+
+        **Returns:**
+            dictionary of HTTP headers
+
+        """
+        log.debug('Preparing request to API: "%s"' % self.api)
+        hdr = {'Content-Type': 'application/xml'}
+        b64str = base64.encodestring('%s:%s' %
+                                     (self._api_username,
+                                      self._api_password))
+        log.debug('SMS API username: "%s"' % self._api_username)
+        if self._api_password:
+            log.debug('SMS API password: "********"')
+        else:
+            log.debug('SMS API password undefined')
+        hdr['Authorization'] = 'Basic %s' % b64str.replace('\n', '')
+
+        return hdr
+
+    def send_batch(self, messages, dry=False):
+        """Send many SMS messages with as few API requests as possible.
+
+        The ``<message>`` elements of each of the *messages* are merged
+        into a single ``<messages>`` payload (up to :attr:`batch_size`
+        messages per request).  Only messages that share the same
+        ``<accountreference>`` are merged.
+
+        A payload rejected outright by the API (HTTP 4xx) is re-sent one
+        message at a time so that a single bad message does not fail
+        the rest of the batch.
+
+        **Args:**
+            *messages*: list of XML constructs as returned by
+            :meth:`create_comms`
+
+        **Kwargs:**
+            *dry*: do not send, only report what would happen
+
+        **Returns:**
+            list of boolean send statuses, one for each of the
+            *messages* and in the same order
+
+        """
+        log.info('Sending %d SMS comms in batches of %d ...' %
+                 (len(messages), self.batch_size))
+        statuses = [False] * len(messages)
+
+        groups = {}
+        keys = []
+        for index, message in enumerate(messages):
+            try:
+                root = ElementTree.fromstring(message)
+                key = root.findtext('accountreference')
+            except (ExpatError, SyntaxError), err:
+                log.error('SMS XML parse error: %s' % err)
+                continue
+            if key not in groups:
+                keys.append(key)
+            groups.setdefault(key, []).append(index)
+
+        for indexes in [groups[x] for x in keys]:
+            for i in range(0, len(indexes), self.batch_size):
+                chunk = indexes[i:i + self.batch_size]
+                results = self._send_chunk([messages[x] for x in chunk],
+                                           dry=dry)
+                for index, status in zip(chunk, results):
+                    statuses[index] = status
+
+        return statuses
+
+    def _send_chunk(self, messages, dry=False):
+        """Send *messages* in a single API request.
+
+        **Returns:**
+            list of boolean send statuses, one for each of the *messages*
+
+        """
+        if len(messages) == 1:
+            return [self.send(messages[0], dry=dry)]
+
+        if self.api is None:
+            log.error('No SMS API provided -- SMS not sent')
+            return [False] * len(messages)
+
+        data = self.merge_comms(messages)
+        log.debug('REST SMS batch data: %s' % data)
+        if dry:
+            return [True] * len(messages)
+
+        statuses = [False] * len(messages)
+        (code, response) = self.post(data, headers=self.headers())
+        if code is None:
+            log.error('SMS batch failure: no response from API')
+        elif code == 200:
+            log.info('SMS batch receive: "%s"' % response)
+            statuses = self.match_batch_response(messages, response)
+            accepted = len([x for x in statuses if x])
+            if accepted < len(messages):
+                log.error('SMS batch: only %d of %d messages accepted' %
+                          (accepted, len(messages)))
+        elif code >= 400 and code < 500:
+            log.warn('SMS batch rejected (%d) -- sending individually' %
+                     code)
+            statuses = [self.send(x, dry=dry) for x in messages]
+        else:
+            log.error('SMS batch comms return code: %d' % code)
+
+        return statuses
+
+    def merge_comms(self, messages):
+        """Merge the ``<message>`` elements of *messages* into the
+        ``<messages>`` construct of the first message.
+
+        **Args:**
+            *messages*: list of XML constructs as returned by
+            :meth:`create_comms`
+
+        **Returns:**
+            the merged XML construct as a string
+
+        """
+        content = None
+        for message in messages:
+            root = ElementTree.fromstring(message)
+            if content is None:
+                content = root
+            else:
+                for element in root.findall('message'):
+                    content.append(element)
+
+        return ElementTree.tostring(content, encoding='UTF-8')
+
+    def parse_batch_response(self, response):
+        """Extract the message identifiers from the SMS API *response*.
+
+        **Args:**
+            *response*: the SMS API response body
+
+        **Returns:**
+            list of message identifiers
+
+        """
+        ids = [x[0] for x in self.parse_batch_headers(response)]
+
+        log.debug('SMS batch message ids: %s' % str(ids))
+
+        return ids
+
+    def parse_batch_headers(self, response):
+        """Extract the ``<messageheader>`` details from the SMS API
+        *response*.  The recipient (``<to><phonenumber>``) and
+        ``<status>`` are only present if the API reports them.
+
+        **Args:**
+            *response*: the SMS API response body
+
+        **Returns:**
+            list of (*id*, *recipient*, *status*) tuples.  *recipient*
+            and *status* are ``None`` if not provided
+
+        """
+        headers = []
+
+        try:
+            root = ElementTree.fromstring(response)
+            for element in root.getiterator():
+                if self._local_tag(element) != 'messageheader':
+                    continue
+
+                recipient = None
+                status = None
+                for child in element.getiterator():
+                    tag = self._local_tag(child)
+                    if tag == 'phonenumber' and recipient is None:
+                        recipient = (child.text or '').strip()
+                    elif tag == 'status' and child is not element:
+                        status = (child.text or '').strip()
+                headers.append((element.get('id'), recipient, status))
+        except (ExpatError, SyntaxError), err:
+            log.error('SMS batch response parse error: %s' % err)
+
+        return headers
+
+    def match_batch_response(self, messages, response):
+        """Match the ``<messageheader>`` elements of the SMS API
+        *response* back to the *messages* that were sent.
+
+        Headers are matched on recipient when the API reports one for
+        every message.  Otherwise, the position of a header cannot be
+        trusted so the batch is only accepted if the API returned a
+        header for every message and none of them report a failed
+        status.
+
+        **Args:**
+            *messages*: list of XML constructs as sent by
+            :meth:`_send_chunk`
+
+            *response*: the SMS API response body
+
+        **Returns:**
+            list of boolean statuses, one for each of the *messages*
+
+        """
+        statuses = [False] * len(messages)
+
+        headers = self.parse_batch_headers(response)
+        if not headers:
+            return statuses
+
+        if None not in [x[1] for x in headers]:
+            accepted = {}
+            for (header_id, recipient, status) in headers:
+                key = self._recipient_key(recipient)
+                ok = (status or '').lower() not in FAILED_STATUSES
+                accepted.setdefault(key, []).append(ok)
+
+            for index, message in enumerate(messages):
+                try:
+                    root = ElementTree.fromstring(message)
+                    recipient = root.findtext('message/to') or ''
+                except (ExpatError, SyntaxError), err:
+                    log.error('SMS XML parse error: %s' % err)
+                    continue
+                matches = accepted.get(self._recipient_key(recipient))
+                if matches:
+                    statuses[index] = matches.pop(0)
+        elif len(headers) == len(messages):
+            failed = [x for x in headers
+                      if (x[2] or '').lower() in FAILED_STATUSES]
+            if not failed:
+                statuses = [True] * len(messages)
+        else:
+            log.error('SMS batch: %d message headers for %d messages '
+                      'cannot be matched -- failing batch' %
+                      (len(headers), len(messages)))
+
+        return statuses
+
+    def _local_tag(self, element):
+        """Strip the XML namespace from the tag of *element*.
+        """
+        return element.tag.split('}')[-1]
+
+    def _recipient_key(self, mobile_number):
+        """Normalise *mobile_number* for matching so that the local
+        (``04xxxxxxxx``) and international (``614xxxxxxxx``) forms of
+        a number are equal.
+        """
+        digits = re.sub('\D', '', mobile_number or '')
+
+        return digits[-9:]
+
     def validate(self, mobile_number):
         """Validate the *mobile_number*.
 
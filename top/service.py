@@ -1,11 +1,10 @@
 __all__ = [
     "Service",
 ]
-import os
-
 import top
 from top.utils.log import log
 from top.utils.files import create_dir
+from top.commsspool import create_comms_spool
 
 
 class Service(object):
@@ -19,6 +18,15 @@ class Service(object):
 
         directory where comms files are sent for further processing
 
+    .. attribute:: comms_spool
+
+        name of the comms event spool backend.  Either ``file``
+        (default, one event file per comms) or ``sqlite``
+
+    .. attribute:: spool
+
+        :class:`top.CommsSpool` type object for the :attr:`comms_dir`
+
     .. attribute:: alerts
 
         list if alerts that can be captured during the processing workflow
@@ -32,9 +40,11 @@ class Service(object):
     _facility = None
     _db = None
     _comms_dir = None
+    _comms_spool = 'file'
+    _spool = None
     _alerts = []
 
-    def __init__(self, db=None, comms_dir=None):
+    def __init__(self, db=None, comms_dir=None, comms_spool=None):
         """Service initialisation.
 
         """
@@ -48,6 +58,9 @@ class Service(object):
         if comms_dir is not None:
             self.set_comms_dir(comms_dir)
 
+        if comms_spool is not None:
+            self.set_comms_spool(comms_spool)
+
     def __del__(self):
         if self.db is not None:
             self.db.disconnect()
@@ -73,6 +86,26 @@ class Service(object):
     def set_comms_dir(self, value):
         if create_dir(value):
             self._comms_dir = value
+            self._spool = None
+
+    @property
+    def comms_spool(self):
+        return self._comms_spool
+
+    def set_comms_spool(self, value=None):
+        if value is None:
+            value = 'file'
+        self._comms_spool = value
+        self._spool = None
+        log.debug('%s comms_spool set to "%s"' %
+                  (self.facility, self.comms_spool))
+
+    @property
+    def spool(self):
+        if self._spool is None:
+            self._spool = create_comms_spool(self.comms_dir, self.comms_spool)
+
+        return self._spool
 
     @property
     def alerts(self):
@@ -88,7 +121,7 @@ class Service(object):
             self._alerts = []
 
     def flag_comms(self, action, id, service, dry=False):
-        """Prepare the comms file for further processsing.
+        """Prepare the comms event for further processsing.
 
         **Args:**
             *action*: type of communication (either ``sms`` or ``email``)
@@ -106,27 +139,13 @@ class Service(object):
             ``False`` for processing failure
 
         """
-        status = True
-
-        comms_file = "%s.%d.%s" % (action, id, service)
-        abs_comms_file = os.path.join(self.comms_dir, comms_file)
-        log.info('Writing comms file to "%s"' % abs_comms_file)
-        try:
-            if not dry:
-                fh = open(abs_comms_file, 'w')
-                fh.close()
-        except IOError, err:
-            log.error('Unable to open comms file %s: %s' %
-                      (abs_comms_file, err))
-            status = False
-
-        return status
+        return self.spool.enqueue(action, id, service, dry=dry)
 
     def flag_comms_previous(self, action, id, service, dry=False):
-        """Check if the comms file flag has already been set.
+        """Check if the comms event flag has already been set.
 
-        Additionally, if the comms has errored (``*.err`` file exists)
-        then comms event file should not be created.
+        Additionally, if the comms has errored then comms event should
+        not be created.
 
         **Args:**
             *action*: type of communication (either ``sms`` or ``email``)
@@ -141,16 +160,12 @@ class Service(object):
             ``False`` comms flag has not been previously set
 
         """
-        status = False
-
-        comms_file = "%s.%d.%s" % (action, id, service)
-        abs_comms_file = os.path.join(self.comms_dir, comms_file)
-        log.debug('Checking if comms file "%s" set previously' %
-                  abs_comms_file)
+        log.debug('Checking if comms event "%s.%d.%s" set previously' %
+                  (action, id, service))
 
-        if (os.path.exists(abs_comms_file + '.err') or
-            os.path.exists(abs_comms_file)):
-            status = True
-            log.debug('Comms file "%s" previously set' % abs_comms_file)
+        status = self.spool.exists(action, id, service)
+        if status:
+            log.debug('Comms event "%s.%d.%s" previously set' %
+                      (action, id, service))
 
         return status
@@ -9,6 +9,10 @@ from top.utils.log import log
 class StopParser(object):
     """GraysOnline Shipment Stop Report parser.
 
+    Parsed reports are held in a compact delivery index keyed by
+    connote and item number.  Only the arrival (delivery) timestamp of
+    each connote/item is kept so that delivery lookups are O(1).
+
     .. attribute:: fields
 
         A dictionary based data structure that identifies the elements
@@ -18,16 +22,33 @@ class StopParser(object):
 
         list of file to parse
 
+    .. attribute:: connotes
+
+        delivery index of the form::
+
+            {<connote>: {<item_nbr>: <arrival>, ...}, ...}
+
+        where *<arrival>* is ``None`` if the item has not been
+        delivered
+
     """
     _in_files = []
+    _fieldnames = ['Consignment Number',
+                   'Despatch Date',
+                   'Item Number',
+                   'Delivery Date']
     _connote_header = 'Consignment Number'
     _item_header = 'Item Number'
     _arrival_header = 'Delivery Date'
     _connotes = {}
+    _delivered_connotes = set()
 
     def __init__(self, files=None):
         """StopParser initialisation.
         """
+        self._connotes = {}
+        self._delivered_connotes = set()
+
         if files is not None:
             self.set_in_files(files)
 
@@ -43,6 +64,10 @@ class StopParser(object):
             self._in_files.extend(values)
             log.debug('Set input files to: %s' % self._in_files)
 
+    @property
+    def fieldnames(self):
+        return self._fieldnames
+
     @property
     def connote_header(self):
         return self._connote_header
@@ -73,22 +98,48 @@ class StopParser(object):
         return len(self._connotes)
 
     def set_connotes(self, dict):
-        connote = dict[self.connote_header]
-        if self._connotes.get(connote) is None:
-            self._connotes[connote] = []
+        """Add a parsed report row *dict* to the delivery index.
+        """
+        self.set_item(dict[self.connote_header],
+                      dict.get(self.item_header),
+                      dict.get(self.arrival_header))
+
+    def set_item(self, connote, item_nbr, arrival):
+        """Add *connote*/*item_nbr* to the delivery index.
+
+        The first occurrence of a *connote*/*item_nbr* pair is kept.
+        Rows without an item number only count towards connote-level
+        delivery checks.
+
+        **Args:**
+            *connote*: the report connote
+
+            *item_nbr*: the report item number (``None`` if not
+            provided)
 
-        item_nbr = dict.get(self.item_header)
-        item_found = False
-        for item in self._connotes.get(connote):
-            this_item = item.get(self.item_header)
-            if this_item is not None and this_item == item_nbr:
-                item_found = True
-                break
+            *arrival*: the report delivery timestamp (``None`` if not
+            delivered)
 
-        if not item_found:
-            self._connotes[connote].append(dict)
+        """
+        items = self._connotes.get(connote)
+        if items is None:
+            items = self._connotes[connote] = {}
+
+        if item_nbr is None or item_nbr not in items:
+            if arrival is not None:
+                # Delivery dates repeat across the report.
+                arrival = intern(arrival)
+                self._delivered_connotes.add(connote)
+            items.setdefault(item_nbr, arrival)
 
     def connote_lookup(self, connote):
+        """Delivery index items of *connote*.
+
+        **Returns:**
+            dictionary of *connote* item numbers and their arrival
+            timestamps or ``None`` if *connote* is not in the index
+
+        """
         return self.connotes.get(connote)
 
     def connote_delivered(self, connote, item_nbr=None):
@@ -116,22 +167,12 @@ class StopParser(object):
         log.debug('TCD checking connote "%s" delivery status' % connote)
 
         delivered = False
-        lookup_list = self.connote_lookup(connote)
-        if lookup_list is not None:
-            for lookup in lookup_list:
-                # Just cycle through the dictionary list with an
-                # anonymous item number.
-                if item_nbr is None:
-                    if lookup.get(self.arrival_header) is not None:
-                        delivered = True
-                else:
-                    if ((lookup.get(self.item_header) is not None) and
-                        (lookup.get(self.item_header) == item_nbr and
-                        (lookup.get(self.arrival_header) is not None))):
-                        delivered = True
-
-                if delivered:
-                    break
+        if item_nbr is None:
+            delivered = connote in self._delivered_connotes
+        else:
+            items = self.connote_lookup(connote)
+            if items is not None and items.get(item_nbr) is not None:
+                delivered = True
 
         log.debug('Connote "%s" delivery status: %s' % (connote, delivered))
 
@@ -140,27 +181,60 @@ class StopParser(object):
     def read(self):
         """Parses the contents of file denoted by :attr:`in_files`.
 
+        Rows are streamed straight into the delivery index.
+
         """
         for f in self.in_files:
+            for (connote, item_nbr, arrival) in self.parse(f):
+                self.set_item(connote, item_nbr, arrival)
+
+    def parse(self, file):
+        """Generator that streams the rows of TCD delivery report *file*.
+
+        **Args:**
+            *file*: path to the TCD delivery report
+
+        **Returns:**
+            generator object of (*connote*, *item_nbr*, *arrival*)
+            tuples.  *item_nbr* and *arrival* are ``None`` if not
+            provided
+
+        """
+        connote_index = self.fieldnames.index(self.connote_header)
+        item_index = self.fieldnames.index(self.item_header)
+        arrival_index = self.fieldnames.index(self.arrival_header)
+
+        fh = None
+        try:
+            log.debug('Parsing connotes in "%s"' % file)
+            fh = open(file, 'rb')
+        except IOError, err:
+            log.error('Unable to open file "%s"' % file)
+
+        if fh is not None:
             try:
-                log.debug('Parsing connotes in "%s"' % f)
-                fh = open(f, 'rb')
-                fieldnames = ['Consignment Number',
-                              'Despatch Date',
-                              'Item Number',
-                              'Delivery Date']
-                reader = csv.DictReader(fh,
-                                        delimiter=' ',
-                                        skipinitialspace=True,
-                                        fieldnames=fieldnames)
-                for rowdict in reader:
-                    self.set_connotes(rowdict)
-
-            except IOError, err:
-                log.error('Unable to open file "%s"' % f)
+                reader = csv.reader(fh,
+                                    delimiter=' ',
+                                    skipinitialspace=True)
+                for row in reader:
+                    if not row:
+                        continue
+
+                    fields = len(row)
+                    item_nbr = None
+                    if fields > item_index:
+                        item_nbr = row[item_index]
+                    arrival = None
+                    if fields > arrival_index:
+                        arrival = row[arrival_index]
+
+                    yield (row[connote_index], item_nbr, arrival)
+            finally:
+                fh.close()
 
     def purge(self):
         """Release :attr:`connotes` memory resources
 
         """
         self._connotes.clear()
+        self._delivered_connotes.clear()
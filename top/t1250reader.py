@@ -0,0 +1,193 @@
+__all__ = [
+    "T1250Reader",
+]
+import mmap
+
+from top.utils.log import log
+
+
+class T1250Reader(object):
+    """Memory mapped T1250 file reader.
+
+    The T1250 file is mapped read-only into memory so that the ``%%EOF``
+    trailer check, record count and record iteration all work against
+    the same mapping rather than through separate file handles and
+    seeks.
+
+    .. note::
+
+        Python 2 :mod:`mmap` slices are string copies so each record
+        yielded is a copy of that record only.  The file as a whole is
+        never read into a buffer.
+
+    .. attribute:: file
+
+        the T1250 file to read
+
+    """
+    _file = None
+    _mmap = None
+
+    def __init__(self, file=None):
+        """:class:`top.T1250Reader` initialiser.
+        """
+        if file is not None:
+            self.set_file(file)
+
+    @property
+    def file(self):
+        return self._file
+
+    def set_file(self, value):
+        self.close()
+        self._file = value
+        log.debug('T1250 reader file set to "%s"' % self.file)
+
+    @property
+    def size(self):
+        size = 0
+        if self._mmap is not None:
+            size = self._mmap.size()
+
+        return size
+
+    def open(self):
+        """Map :attr:`file` into memory.
+
+        **Returns:**
+            boolean ``True`` if the file was mapped
+
+            boolean ``False`` otherwise
+
+        """
+        status = False
+
+        self.close()
+        try:
+            fh = open(self.file, 'rb')
+            try:
+                self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                status = True
+            finally:
+                fh.close()
+        except (IOError, OSError, ValueError, TypeError), err:
+            # ValueError is raised against an empty file.
+            log.error('T1250 file "%s" open error: %s' % (self.file, err))
+
+        return status
+
+    def close(self):
+        """Release the memory mapping (if any).
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    @property
+    def eof_offset(self):
+        """Offset of the ``%%EOF`` trailer line.
+
+        **Returns:**
+            integer offset of the start of the trailer line or ``None``
+            if the file has not been opened or has no trailer
+
+        """
+        offset = None
+
+        if self._mmap is not None:
+            end = self.size
+            while end > 0 and self._mmap[end - 1] in '\r\n':
+                end -= 1
+
+            start = self._mmap.rfind('\n', 0, end) + 1
+            if self._mmap[start:end] == '%%EOF':
+                offset = start
+
+        return offset
+
+    @property
+    def eof_found(self):
+        return self.eof_offset is not None
+
+    def check_eof(self):
+        """Checks if :attr:`file` has a ``%%EOF`` trailer.  The file is
+        opened (and closed again) if it is not already mapped.
+
+        **Returns:**
+            boolean ``True`` if :attr:`file` has an ``%%EOF`` trailer
+
+            boolean ``False`` otherwise
+
+        """
+        status = False
+
+        if self._mmap is not None:
+            status = self.eof_found
+        elif self.open():
+            status = self.eof_found
+            self.close()
+
+        log.debug('File "%s" EOF found: %s' % (self.file, status))
+
+        return status
+
+    def record_count(self):
+        """Number of records before the ``%%EOF`` trailer.
+
+        **Returns:**
+            integer count of records
+
+        """
+        count = 0
+
+        end = self.eof_offset
+        if end is None:
+            end = self.size
+
+        offset = 0
+        while offset < end:
+            offset = self._mmap.find('\n', offset, end)
+            count += 1
+            if offset == -1:
+                break
+            offset += 1
+
+        return count
+
+    def records(self, offset=0):
+        """Generator over the raw records in :attr:`file` up to (but not
+        including) the ``%%EOF`` trailer.  If the file has no trailer
+        then all records are returned.
+
+        **Kwargs:**
+            *offset*: file position to start from.  For example, as
+            returned with a previous record
+
+        **Returns:**
+            tuple of the form (*record*, *next_offset*) where *record*
+            includes its line terminator and *next_offset* is the file
+            position of the following record
+
+        """
+        if self._mmap is None:
+            return
+
+        end = self.eof_offset
+        if end is None:
+            end = self.size
+
+        while offset < end:
+            next_offset = self._mmap.find('\n', offset, end)
+            if next_offset == -1:
+                next_offset = end
+            else:
+                next_offset += 1
+
+            yield (self._mmap[offset:next_offset], next_offset)
+            offset = next_offset
+
+    def lines(self, offset=0):
+        """As per :meth:`records` but only returns the raw record.
+        """
+        for record, next_offset in self.records(offset):
+            yield record
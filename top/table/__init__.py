@@ -57,6 +57,78 @@ VALUES (%s)""" % (self.name, ', '.join(columns), values)
 
         return sql
 
+    def insert_params_sql(self, kwargs, output=None):
+        """Parameterised variant of :meth:`insert_sql`.
+
+        The columns are sorted so that every insert of the same column
+        set produces the same statement text (and hence, the same
+        prepared statement and query plan).
+
+        **Args:**
+            *kwargs*: the table column name and values to insert
+
+        **Kwargs:**
+            *output*: as per :meth:`insert_many_sql`
+
+        **Returns:**
+            tuple of the SQL DML insert string with ``?`` placeholders
+            and the list of parameter values
+
+        """
+        columns = sorted(kwargs.keys())
+        params = self.params([kwargs.get(x) for x in columns])
+
+        output_clause = str()
+        if output is not None:
+            output_clause = ('\nOUTPUT %s' %
+                             ', '.join(['INSERTED.%s' % x for x in output]))
+
+        sql = """INSERT INTO %s (%s)%s
+VALUES (%s)""" % (self.name,
+                  ', '.join(columns),
+                  output_clause,
+                  ', '.join(['?'] * len(columns)))
+
+        return (sql, params)
+
+    def insert_many_sql(self, rows, output=None):
+        """Build a multi-row SQL DML insert statement based on the list
+        of *rows* dictionaries.  Each *rows* element takes the same form
+        as the *kwargs* of :meth:`insert_sql`.  The column set is taken
+        from the first element of *rows* so all elements should share the
+        same keys.
+
+        **Args:**
+            *rows*: list of table column name and value dictionaries
+
+        **Kwargs:**
+            *output*: list of column names to return from the inserted
+            rows via an MSSQL ``OUTPUT INSERTED`` clause.  For example,
+            ``['id', 'card_ref_nbr']``
+
+        **Returns:**
+            an SQL DML insert string
+
+        """
+        columns = rows[0].keys()
+        values = []
+        for row in rows:
+            values.append('(%s)' % self.sanitise([row.get(x)
+                                                  for x in columns]))
+
+        output_clause = str()
+        if output is not None:
+            output_clause = ('\nOUTPUT %s' %
+                             ', '.join(['INSERTED.%s' % x for x in output]))
+
+        sql = """INSERT INTO %s (%s)%s
+VALUES %s""" % (self.name,
+                ', '.join(columns),
+                output_clause,
+                ',\n'.join(values))
+
+        return sql
+
     def update_sql(self, kwargs, where_column='id', keys=None):
         """Build an SQL DML update statement based on the *kwargs*
         dictionary.  The *kwargs* keys are the table column names whilst the
@@ -101,6 +173,63 @@ SET %s
 
         return sql
 
+    def update_params_sql(self, kwargs, where_column='id', keys=None):
+        """Parameterised variant of :meth:`update_sql`.
+
+        **Args:**
+            *kwargs*: the table column name and values to update
+
+        **Kwargs:**
+            *where_column*: the table column to use in the WHERE clause.
+            Defaults to ``id``
+
+            *keys*: tuple of *where_column* values to update
+
+        **Returns:**
+            tuple of the SQL DML update string with ``?`` placeholders
+            and the list of parameter values
+
+        """
+        columns = sorted(kwargs.keys())
+        params = self.params([kwargs.get(x) for x in columns])
+
+        set_clause = ['%s=?' % x for x in columns]
+
+        where_clause = str()
+        if keys is not None:
+            where_clause = ('WHERE %s IN (%s)' %
+                            (where_column, ', '.join(['?'] * len(keys))))
+            params.extend(keys)
+
+        sql = """UPDATE %s
+SET %s
+%s""" % (self.name, ', '.join(set_clause), where_clause)
+
+        return (sql, params)
+
+    def params(self, values):
+        """Prepares raw data for use as SQL DML parameter values.
+
+        Parameter values are passed to the database as is (no quoting or
+        escaping is required) except for the ``'NULL'`` string which
+        :meth:`sanitise` treats as the SQL ``NULL``.
+
+        **Args:**
+            *values*: list of table values.  For example, [1, 'NULL']
+
+        **Returns:**
+            list of parameter values.  For example, ``[1, None]``
+
+        """
+        params = []
+
+        for value in values:
+            if isinstance(value, str) and value == 'NULL':
+                value = None
+            params.append(value)
+
+        return params
+
     def sanitise(self, values, as_string=True):
         """Prepares raw data for safe use in an SQL DML.
 
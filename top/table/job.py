@@ -41,6 +41,23 @@ ORDER by job_ts DESC""" % barcode
 
         return sql
 
+    def check_barcodes_sql(self, barcodes):
+        """Bulk variant of :meth:`check_barcode`.
+
+        **Args:**
+            *barcodes*: list of ``job.card_ref_nbr`` values to search for
+
+        **Returns:**
+            the SQL string
+
+        """
+        sql = """SELECT id, card_ref_nbr, job_ts
+FROM %s
+WHERE card_ref_nbr IN (%s)
+ORDER by job_ts DESC""" % (self.name, self.sanitise(barcodes))
+
+        return sql
+
     def update_sql(self, job_id, agent_id_row_id):
         """
         """
@@ -88,6 +105,20 @@ ORDER by j.job_ts DESC""" % item_nbr
 
         return sql
 
+    def item_nbr_based_job_params_sql(self, item_nbr):
+        """Parameterised variant of :meth:`item_nbr_based_job_sql`.
+
+        **Returns:**
+            tuple of the SQL string and the list of parameter values
+
+        """
+        sql = """SELECT j.id
+FROM job as j, job_item as ji
+WHERE (ji.item_nbr = ? AND j.id = ji.job_id)
+ORDER by j.job_ts DESC"""
+
+        return (sql, [item_nbr])
+
     def jobitem_based_job_search_sql(self, connote, item_nbr):
         """Generate SQL that queries the job table for records that are
         related to a job_item record with *connote* and *item_nbr*
@@ -112,6 +143,22 @@ ORDER by j.job_ts DESC""" % (connote, item_nbr)
 
         return sql
 
+    def jobitem_based_job_search_params_sql(self, connote, item_nbr):
+        """Parameterised variant of :meth:`jobitem_based_job_search_sql`.
+
+        **Returns:**
+            tuple of the SQL string and the list of parameter values
+
+        """
+        sql = """SELECT j.id
+FROM job as j, job_item as ji
+WHERE (ji.connote_nbr = ? AND
+       ji.item_nbr = ? AND
+       j.id = ji.job_id)
+ORDER by j.job_ts DESC"""
+
+        return (sql, [connote, item_nbr])
+
     def postcode_sql(self):
         """Generate SQL that queries the job table for records for the
         postcode and state.
@@ -91,6 +91,19 @@ WHERE id = %d""" % (time, id)
 
         return sql
 
+    def upd_collected_params_sql(self, id, time):
+        """Parameterised variant of :meth:`upd_collected_sql`.
+
+        **Returns:**
+            tuple of the SQL string and the list of parameter values
+
+        """
+        sql = """UPDATE %s
+SET extract_ts = ?
+WHERE id = ?""" % self.name
+
+        return (sql, [time, id])
+
     def upd_file_based_collected_sql(self, connote, item_nbr, time=None):
         """SQL wrapper to update the collected items from the "jobitems"
         table.
@@ -166,6 +179,48 @@ ORDER BY created_ts DESC""" % (self.name, connote, item_nbr)
 
         return sql
 
+    def connote_item_nbr_params_sql(self, connote, item_nbr):
+        """Parameterised variant of :meth:`connote_item_nbr_sql`.
+
+        **Returns:**
+            tuple of the SQL string and the list of parameter values
+
+        """
+        sql = """SELECT id
+FROM %s
+WHERE connote_nbr = ?
+AND item_nbr = ?
+ORDER BY created_ts DESC""" % self.name
+
+        return (sql, [connote, item_nbr])
+
+    def connotes_item_nbr_sql(self, connotes):
+        """SQL wrapper to extract the job_item records (and the parent
+        job's job_ts) for a list of *connotes*.  Serves as a bulk
+        variant of :meth:`connote_item_nbr_sql`.
+
+        **Args:**
+            connotes: list of Connote values relating to the
+            job_item.connote_nbr column.
+
+        **Returns:**
+            the SQL string
+
+        """
+        sql = """SELECT ji.id,
+       ji.connote_nbr,
+       ji.item_nbr,
+       j.id,
+       j.job_ts
+FROM %s as ji
+LEFT OUTER JOIN %s as j ON j.id = ji.job_id
+WHERE ji.connote_nbr IN (%s)
+ORDER BY ji.created_ts DESC""" % (self.name,
+                                  self._job.name,
+                                  self.sanitise(connotes))
+
+        return sql
+
     def item_number_sql(self, item_nbr):
         """SQL wrapper to extract records where job_item.item_nbr
         is equal to *item_nbr*.
@@ -247,6 +302,38 @@ AND ji.id = %d""" % job_item_id
 
         return sql
 
+    def job_item_agent_details_ids_sql(self, job_item_ids):
+        """Bulk variant of :meth:`job_item_agent_details_sql`.
+
+        The ``jobitem.id`` is returned as the first column.
+
+        **Args:**
+            job_item_ids: list of jobitem.id values to search against
+
+        **Returns:**
+            the SQL string
+
+        """
+        sql = """SELECT ji.id,
+       ag.name,
+       ag.address,
+       ag.suburb,
+       ag.postcode,
+       ji.connote_nbr,
+       ji.item_nbr,
+       ji.notify_ts,
+       ji.created_ts,
+       ji.email_addr,
+       ji.phone_nbr,
+       ji.pickup_ts,
+       j.bu_id
+FROM job_item as ji, job as j, agent as ag
+WHERE ji.job_id = j.id
+AND j.agent_id = ag.id
+AND ji.id IN (%s)""" % self.sanitise(job_item_ids)
+
+        return sql
+
     def update_reminder_ts_sql(self, id, ts=None):
         return self.update_timestamp_sql(id, column='reminder_ts', ts=ts)
 
@@ -279,6 +366,22 @@ WHERE id = %d
 
         return sql
 
+    def update_timestamp_params_sql(self, id, column, ts=None):
+        """Parameterised variant of :meth:`update_timestamp_sql`.
+
+        **Returns:**
+            tuple of the SQL string and the list of parameter values
+
+        """
+        if ts is None:
+            ts = datetime.datetime.now().isoformat(' ').split('.', 1)[0]
+
+        sql = """UPDATE %s
+SET %s = ?
+WHERE id = ?""" % (self.name, column)
+
+        return (sql, [ts, id])
+
     def connote_base_primary_elect_job(self, connote):
         """SQL wrapper to verify if a *connote* is associated with a primary
         elect job.
@@ -307,7 +410,8 @@ AND j.service_code = 3""" % (self.name, connote)
                                  service_code=3,
                                  bu_ids=None,
                                  delivery_partners=None,
-                                 day_range=14):
+                                 day_range=14,
+                                 with_bu=False):
         """SQL wrapper to extract uncollected Service Code-based jobs.
 
         Service Code jobs are identified by a integer value in the
@@ -328,6 +432,10 @@ AND j.service_code = 3""" % (self.name, connote)
             *day_range*: number of days from current time to include
             in search (default 14.0 days)
 
+            *with_bu*: also return the ``job.bu_id`` and
+            ``delivery_partner.name`` columns so that the results of a
+            multi-BU search can be partitioned
+
         **Returns:**
             the SQL string
 
@@ -346,7 +454,11 @@ AND j.service_code = 3""" % (self.name, connote)
         start_ts = now - datetime.timedelta(days=day_range)
         start_date = start_ts.strftime('%Y-%m-%d %H:%M:%S')
 
-        sql = """SELECT ji.id, ji.connote_nbr, ji.item_nbr
+        columns = 'ji.id, ji.connote_nbr, ji.item_nbr'
+        if with_bu:
+            columns += ', j.bu_id, dp.name'
+
+        sql = """SELECT %(columns)s
 FROM job AS j, %(name)s AS ji, agent AS ag, delivery_partner AS dp
 WHERE ji.job_id = j.id
 AND j.agent_id = ag.id
@@ -357,7 +469,8 @@ AND ji.notify_ts IS NULL
 AND (ji.email_addr NOT IN ('', '.') OR ji.phone_nbr NOT IN ('', '.'))
 AND j.bu_id IN %(bu_ids)s
 AND j.service_code = %(sc)d
-AND ji.created_ts > '%(start_date)s'""" % {'name': self.name,
+AND ji.created_ts > '%(start_date)s'""" % {'columns': columns,
+                                           'name': self.name,
                                            'dps': str(delivery_partners),
                                            'bu_ids': str(bu_ids),
                                            'sc': service_code,
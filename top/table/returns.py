@@ -63,3 +63,40 @@ AND ag.id = %(alias)s.agent_id""" % {'alias': self.alias,
         self.set_alias(old_alias)
 
         return sql
+
+    def extract_ids_sql(self, ids, alias=None):
+        """Bulk variant of :meth:`extract_id_sql`.
+
+        The ``returns.id`` is returned as the first column.
+
+        **Args:**
+            *ids*: list of ``returns.id`` values
+
+        **Kwargs:**
+            *alias*: override the :attr:`alias` value
+
+        **Returns:**
+            the SQL string
+        """
+        old_alias = self.alias
+        if alias is not None:
+            self.set_alias(alias)
+
+        sql = """SELECT %(alias)s.id,
+       %(alias)s.email_addr,
+       %(alias)s.phone_nbr,
+       %(alias)s.created_ts,
+       ag.name,
+       ag.address,
+       ag.suburb,
+       ag.postcode,
+       ag.state
+FROM %(name)s AS %(alias)s, agent AS ag
+WHERE %(alias)s.id IN (%(ids)s)
+AND ag.id = %(alias)s.agent_id""" % {'alias': self.alias,
+                                     'name': self.name,
+                                     'ids': self.sanitise(ids)}
+
+        self.set_alias(old_alias)
+
+        return sql
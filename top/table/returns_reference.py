@@ -49,3 +49,32 @@ WHERE returns_id = %(id)d""" % {'name': self.name,
         self.set_alias(old_alias)
 
         return sql
+
+    def reference_nbrs_sql(self, returns_ids, alias=None):
+        """Bulk variant of :meth:`reference_nbr_sql`.
+
+        **Args:**
+            *returns_ids*: list of ``returns.id`` values
+
+        **Kwargs:**
+            *alias*: override the :attr:`alias` value
+
+        **Returns:**
+            the SQL string which returns ``returns_id`` and
+            ``reference_nbr`` columns
+
+        """
+        old_alias = self.alias
+        if alias is not None:
+            self.set_alias(alias)
+
+        sql = """SELECT %(alias)s.returns_id,
+       %(alias)s.reference_nbr
+FROM %(name)s AS %(alias)s
+WHERE %(alias)s.returns_id IN (%(ids)s)""" % {'name': self.name,
+                                             'alias': self.alias,
+                                             'ids': self.sanitise(returns_ids)}
+
+        self.set_alias(old_alias)
+
+        return sql
@@ -265,6 +265,30 @@ WHERE id = 2""" % {'dt': delayed_dt}
         msg = 'Agent details based on job_item.id not as expected'
         self.assertListEqual(received, expected, msg)
 
+    def test_job_item_agent_details_ids_sql(self):
+        """Verify the job_item_agent_details_ids_sql SQL string.
+        """
+        job_item_ids = [self._valid_job_item_id_01, 999]
+        sql = self._db.jobitem.job_item_agent_details_ids_sql(job_item_ids)
+        self._db(sql)
+
+        received = list(self._db.rows())
+        expected = [(self._valid_job_item_id_01,
+                     'N031 Name',
+                     'N031 Address',
+                     'N031 Suburb',
+                     '1234',
+                     '218501217863',
+                     'priority_item_nbr_001',
+                     None,
+                     self._now.isoformat(' '),
+                     'loumar@tollgroup.com',
+                     '0431602145',
+                     self._now.isoformat(' '),
+                     1)]
+        msg = 'Agent details based on job_item.id list not as expected'
+        self.assertListEqual(received, expected, msg)
+
     def test_update_reminder_ts_sql(self):
         """Verify the update_reminder_ts SQL string.
         """
@@ -418,6 +442,30 @@ AND notify_ts IS NOT NULL""" % job_item_id
         msg = 'uncollected_primary_elect_jobitems_sql error (PP SC4)'
         self.assertListEqual(sorted(received), sorted(expected), msg)
 
+    def test_uncollected_jobitems_sql_with_bu(self):
+        """uncollected_jobitems SQL -- with BU and Delivery Partner.
+        """
+        kwargs = {'bu_ids': (1, 2, 3),
+                  'delivery_partners': ('Nparcel', 'ParcelPoint'),
+                  'with_bu': True}
+        sql = self._db.jobitem.uncollected_jobitems_sql(**kwargs)
+        self._db(sql)
+
+        received = []
+        for row in self._db.rows():
+            received.append(row)
+        expected = [(3, 'pe_connote', 'pe_item_nbr', 1, 'Nparcel'),
+                    (10, 'ARTZ124110', '00393403250085050506', 1, 'Nparcel'),
+                    (12, 'ANWD011307', 'ANWD011307001', 1, 'Nparcel'),
+                    (13, 'IANZ012764', 'IANZ012764', 1, 'Nparcel'),
+                    (25,
+                     'pp_dp_connote_nbr',
+                     'pp_dp_item_nbr',
+                     1,
+                     'ParcelPoint')]
+        msg = 'uncollected_jobitems_sql (with BU) return list incorrect'
+        self.assertListEqual(sorted(received), sorted(expected), msg)
+
     def test_uncollected_primary_elect_jobitems_sql_parcelpoint_dp(self):
         """uncollected_primary_elect_jobitems SQL (ParcelPoint - PE).
         """
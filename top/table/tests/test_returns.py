@@ -57,6 +57,25 @@ SET created_ts = '%s'""" % cls._now
         msg = 'extract_id_sql returned values error'
         self.assertListEqual(received, expected, msg)
 
+    def test_extract_ids_sql(self):
+        """Verify the extract_ids_sql string.
+        """
+        sql = self._db.returns.extract_ids_sql([2, 999])
+        self._db(sql)
+
+        received = list(self._db.rows())
+        expected = [(2,
+                     'loumar@tollgroup.com',
+                     '0431602145',
+                     '%s' % self._now,
+                     'Bunters We Never Sleep News + Deli',
+                     '693 Albany Hwy',
+                     'Victoria Park',
+                     '6101',
+                     'WA')]
+        msg = 'extract_ids_sql returned values error'
+        self.assertListEqual(received, expected, msg)
+
     @classmethod
     def tearDownClass(cls):
         cls._db.disconnect()
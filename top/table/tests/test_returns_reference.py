@@ -45,6 +45,17 @@ class TestReturnsReference(unittest2.TestCase):
         msg = 'reference_nbr_sql returned values error'
         self.assertListEqual(received, expected, msg)
 
+    def test_reference_nbrs_sql(self):
+        """Verify the reference_nbrs_sql string.
+        """
+        sql = self._db.returns_reference.reference_nbrs_sql([2, 999])
+        self._db(sql)
+
+        received = list(self._db.rows())
+        expected = [(2, 'bbbbbb'), (2, 'cccccc')]
+        msg = 'reference_nbrs_sql returned values error'
+        self.assertListEqual(received, expected, msg)
+
     @classmethod
     def tearDownClass(cls):
         cls._db.disconnect()
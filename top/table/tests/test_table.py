@@ -117,6 +117,64 @@ WHERE id IN (1, 2)"""
         msg = 'UPDATE SQL error with multiple keys'
         self.assertEqual(received, expected, msg)
 
+    def test_insert_many_sql(self):
+        """Check multi-row INSERT SQL statement.
+        """
+        rows = [{'sample_char': 'xxx', 'sample_int': 1},
+                {'sample_char': "can't", 'sample_int': 2}]
+        received = self._table.insert_many_sql(rows, output=['id',
+                                                             'sample_int'])
+        expected = """INSERT INTO dummy (sample_int, sample_char)
+OUTPUT INSERTED.id, INSERTED.sample_int
+VALUES (1, 'xxx'),
+(2, 'can''t')"""
+        msg = 'Multi-row INSERT SQL error'
+        self.assertEqual(received, expected, msg)
+
+    def test_insert_params_sql(self):
+        """Check parameterised INSERT SQL statement.
+        """
+        kwargs = {'sample_char': "can't",
+                  'sample_int': 'NULL'}
+        received = self._table.insert_params_sql(kwargs, output=['id'])
+        expected = ("""INSERT INTO dummy (sample_char, sample_int)
+OUTPUT INSERTED.id
+VALUES (?, ?)""", ["can't", None])
+        msg = 'Parameterised INSERT SQL error'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_update_params_sql(self):
+        """Check parameterised UPDATE SQL statement.
+        """
+        kwargs = {'sample_char': 'xxx',
+                  'sample_int': 1}
+        received = self._table.update_params_sql(kwargs, keys=(1, 2))
+        expected = ("""UPDATE dummy
+SET sample_char=?, sample_int=?
+WHERE id IN (?, ?)""", ['xxx', 1, 1, 2])
+        msg = 'Parameterised UPDATE SQL error'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_params_insert_and_update(self):
+        """Insert and update via parameterised SQL.
+        """
+        kwargs = {'sample_char': "can't",
+                  'sample_int': 1}
+        id = self._db.insert_params(self._table, kwargs)
+
+        kwargs = {'sample_char': 'dummy',
+                  'sample_int': 'NULL'}
+        self._db(*self._table.update_params_sql(kwargs, keys=(id, )))
+
+        self._db('SELECT * FROM dummy WHERE id = ?', [id])
+        received = self._db.row
+        expected = (id, 'dummy', None)
+        msg = 'Parameterised insert/update error'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        self._db.rollback()
+
     def test_sanitise(self):
         """Sanitise data kwargs for safe use in SQL DML.
         """
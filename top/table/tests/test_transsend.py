@@ -53,6 +53,44 @@ class TestTransSend(unittest2.TestCase):
         msg = 'TransSend job_item.connote return value not as expected'
         self.assertListEqual(received, expected, msg)
 
+    def test_connotes_sql(self):
+        """Verify the bulk connotes_sql string.
+        """
+        connotes = ['APLD029228', 'TWAD358893', 'banana']
+
+        sql = self._db.transsend.connotes_sql(connotes)
+        self._db(sql)
+
+        received = sorted(self._db.rows())
+        expected = [('APLD029228', 'APLD029228001', 'ON FOR DEL', None),
+                    ('APLD029228', 'APLD029228002', 'ON FOR DEL', None),
+                    ('TWAD358893', 'TWAD358893001', 'DELIVERED', None)]
+        msg = 'TransSend bulk connotes return value not as expected'
+        self.assertListEqual(received, expected, msg)
+
+    def test_connote_bind_sql(self):
+        """Verify the bind variable connote_bind_sql string.
+        """
+        sql = self._db.transsend.connote_bind_sql()
+        self._db(sql, {'connote_nbr': 'APLD029228',
+                       'item_nbr': 'APLD029228001'})
+
+        received = [x[1] for x in self._db.rows()]
+        expected = ['APLD029228']
+        msg = 'TransSend bind variable connote return value not as expected'
+        self.assertListEqual(received, expected, msg)
+
+    def test_connotes_bind_sql(self):
+        """Verify the bind variable connotes_bind_sql string.
+        """
+        sql = self._db.transsend.connotes_bind_sql(2)
+        self._db(sql, {'connote_0': 'TWAD358893', 'connote_1': 'banana'})
+
+        received = list(self._db.rows())
+        expected = [('TWAD358893', 'TWAD358893001', 'DELIVERED', None)]
+        msg = 'TransSend bind variable connotes return value not as expected'
+        self.assertListEqual(received, expected, msg)
+
     @classmethod
     def tearDownClass(cls):
         cls._transsend = None
@@ -48,3 +48,78 @@ WHERE connote_number = '%s'
 AND item_number = '%s'""" % (self.name, connote_nbr, item_nbr)
 
         return sql
+
+    def connotes_sql(self, connotes, columns=None):
+        """SQL wrapper to extract the TransSend records for a list of
+        *connotes*.  Serves as a bulk variant of :meth:`connote_sql`.
+
+        **Args:**
+            *connotes*: list of Connote values relating to the
+            ``transsend.connote_number`` column
+
+        **Kwargs:**
+            *columns*: list of additional columns to return (default
+            ``latest_scan_event_action`` and
+            ``latest_scanner_description``)
+
+        **Returns:**
+            the SQL string.  Each row starts with the
+            ``connote_number`` and ``item_number`` columns followed by
+            *columns*
+
+        """
+        if columns is None:
+            columns = ['latest_scan_event_action',
+                       'latest_scanner_description']
+
+        sql = """SELECT %s
+FROM %s
+WHERE connote_number IN (%s)""" % (', '.join(['connote_number',
+                                              'item_number'] + columns),
+                                   self.name,
+                                   self.sanitise(connotes))
+
+        return sql
+
+    def connote_bind_sql(self):
+        """Bind variable variant of :meth:`connote_sql`.
+
+        **Returns:**
+            the SQL string with ``:connote_nbr`` and ``:item_nbr`` bind
+            variables
+
+        """
+        sql = """SELECT *
+FROM %s
+WHERE connote_number = :connote_nbr
+AND item_number = :item_nbr""" % self.name
+
+        return sql
+
+    def connotes_bind_sql(self, size, columns=None):
+        """Bind variable variant of :meth:`connotes_sql`.
+
+        **Args:**
+            *size*: number of ``:connote_<n>`` bind variables (``0`` to
+            *size* - 1) in the ``IN`` list
+
+        **Kwargs:**
+            *columns*: see :meth:`connotes_sql`
+
+        **Returns:**
+            the SQL string
+
+        """
+        if columns is None:
+            columns = ['latest_scan_event_action',
+                       'latest_scanner_description']
+
+        binds = [':connote_%d' % x for x in range(size)]
+        sql = """SELECT %s
+FROM %s
+WHERE connote_number IN (%s)""" % (', '.join(['connote_number',
+                                              'item_number'] + columns),
+                                   self.name,
+                                   ', '.join(binds))
+
+        return sql
@@ -0,0 +1,323 @@
+__all__ = [
+    "TcdIndex",
+]
+import os
+import time
+try:
+    import sqlite3
+except ImportError:
+    # Python < 2.5.
+    from pysqlite2 import dbapi2 as sqlite3
+
+import top
+from top.utils.log import log
+from top.utils.files import create_dir
+
+
+class TcdIndex(object):
+    """Persistent, incremental index of delivered TCD connote/items.
+
+    A drop-in alternative to the in-memory :class:`top.StopParser`
+    delivery index.  Delivered connote/items are kept in a local SQLite
+    database (memory mapped for lookups) that survives between
+    processing cycles and restarts.  :meth:`read` only parses the
+    :attr:`in_files` that have not been indexed before and prunes the
+    connote/items that were delivered more than :attr:`day_range` days
+    ago.
+
+    .. attribute:: db_file
+
+        path to the SQLite index database
+
+    .. attribute:: in_files
+
+        list of TCD delivery reports to index
+
+    .. attribute:: day_range
+
+        number of days that delivered connote/items (and indexed file
+        records) are retained for (default 14.0)
+
+    .. attribute:: mmap_size
+
+        maximum number of bytes of the index database that are memory
+        mapped (default 256MB)
+
+    .. attribute:: parser
+
+        :class:`top.StopParser` used to stream the TCD delivery reports
+
+    """
+    _db_file = None
+    _in_files = []
+    _day_range = 14.0
+    _mmap_size = 268435456
+    _connection = None
+
+    def __init__(self, db_file, day_range=None):
+        """:class:`top.TcdIndex` initialiser.
+        """
+        self._db_file = db_file
+        self._in_files = []
+        self._parser = top.StopParser()
+
+        if day_range is not None:
+            self.set_day_range(day_range)
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def db_file(self):
+        return self._db_file
+
+    @property
+    def in_files(self):
+        return self._in_files
+
+    def set_in_files(self, values):
+        self._in_files = []
+
+        if values is not None:
+            self._in_files.extend(values)
+            log.debug('Set TCD index input files to: %s' % self._in_files)
+
+    @property
+    def day_range(self):
+        return self._day_range
+
+    def set_day_range(self, value):
+        self._day_range = value
+        log.debug('TCD index day_range set to %s' % str(self.day_range))
+
+    @property
+    def mmap_size(self):
+        return self._mmap_size
+
+    @property
+    def parser(self):
+        return self._parser
+
+    @property
+    def connection(self):
+        """Lazily open (and initialise) the index database.
+        """
+        if self._connection is None:
+            create_dir(os.path.dirname(os.path.abspath(self.db_file)))
+            log.debug('Opening TCD index "%s"' % self.db_file)
+            self._connection = sqlite3.connect(self.db_file,
+                                               timeout=30,
+                                               isolation_level=None)
+            self._connection.text_factory = str
+            self._connection.execute('PRAGMA mmap_size=%d' %
+                                     self.mmap_size)
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS
+tcd_file (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    indexed_ts REAL NOT NULL)""")
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS
+tcd_delivered (
+    connote TEXT NOT NULL,
+    item_nbr TEXT NOT NULL,
+    arrival TEXT NOT NULL,
+    arrival_ts REAL NOT NULL,
+    PRIMARY KEY (connote, item_nbr))""")
+            self._connection.execute("""CREATE INDEX IF NOT EXISTS
+tcd_delivered_arrival_idx ON tcd_delivered (arrival_ts)""")
+
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @property
+    def size(self):
+        """Number of delivered connote/items in the index.
+        """
+        cursor = self.connection.execute("""SELECT COUNT(*)
+FROM tcd_delivered""")
+
+        return cursor.fetchone()[0]
+
+    def indexed(self, file):
+        """Check if TCD delivery report *file* (as identified by its
+        name, modified time and size) has already been indexed.
+
+        **Returns:**
+            boolean ``True`` if *file* is in the index
+
+        """
+        stat_info = os.stat(file)
+        cursor = self.connection.execute("""SELECT 1
+FROM tcd_file
+WHERE name = ?
+AND mtime = ?
+AND size = ?""", (os.path.basename(file),
+                  stat_info.st_mtime,
+                  stat_info.st_size))
+
+        return cursor.fetchone() is not None
+
+    def read(self):
+        """Index the :attr:`in_files` that have not been indexed before
+        and prune expired connote/items.
+
+        Each file is indexed within a single transaction so a file is
+        either fully indexed or retried on the next :meth:`read`.
+
+        """
+        for f in self.in_files:
+            try:
+                if self.indexed(f):
+                    log.debug('TCD file "%s" already indexed' % f)
+                    continue
+            except OSError, err:
+                log.error('Unable to stat TCD file "%s": %s' % (f, err))
+                continue
+
+            self.index_file(f)
+
+        self.prune()
+
+    def index_file(self, file):
+        """Stream the delivered connote/items of *file* into the index.
+
+        **Args:**
+            *file*: path to the TCD delivery report
+
+        **Returns:**
+            boolean ``True`` if *file* was indexed
+
+        """
+        status = True
+
+        log.info('Indexing TCD file "%s"' % file)
+        stat_info = os.stat(file)
+        now = time.time()
+
+        try:
+            conn = self.connection
+            conn.execute('BEGIN IMMEDIATE')
+            # The first delivery of a connote/item is kept.
+            conn.executemany("""INSERT OR IGNORE INTO tcd_delivered
+(connote, item_nbr, arrival, arrival_ts)
+VALUES (?, ?, ?, ?)""", self._delivered_rows(file, now))
+            conn.execute("""INSERT OR REPLACE INTO tcd_file
+(name, mtime, size, indexed_ts)
+VALUES (?, ?, ?, ?)""", (os.path.basename(file),
+                         stat_info.st_mtime,
+                         stat_info.st_size,
+                         now))
+            conn.execute('COMMIT')
+        except sqlite3.Error, err:
+            log.error('Unable to index TCD file "%s": %s' % (file, err))
+            self.rollback()
+            status = False
+
+        return status
+
+    def rollback(self):
+        try:
+            self.connection.execute('ROLLBACK')
+        except sqlite3.Error:
+            pass
+
+    def _delivered_rows(self, file, now):
+        """Generator of the delivered *file* rows in the form
+        (*connote*, *item_nbr*, *arrival*, *arrival_ts*).  Rows without
+        an item number are stored against an empty item number.
+        """
+        for (connote, item_nbr, arrival) in self.parser.parse(file):
+            if arrival is None:
+                continue
+
+            try:
+                arrival_ts = time.mktime(time.strptime(arrival, '%Y%m%d'))
+            except ValueError:
+                arrival_ts = now
+
+            if item_nbr is None:
+                item_nbr = str()
+
+            yield (connote, item_nbr, arrival, arrival_ts)
+
+    def prune(self, now=None):
+        """Remove connote/items delivered (and file records indexed)
+        more than :attr:`day_range` days before *now*.
+
+        **Kwargs:**
+            *now*: override the current time (epoch seconds)
+
+        **Returns:**
+            number of connote/items removed
+
+        """
+        if now is None:
+            now = time.time()
+        cutoff = now - self.day_range * 86400
+
+        conn = self.connection
+        cursor = conn.execute("""DELETE FROM tcd_delivered
+WHERE arrival_ts < ?""", (cutoff, ))
+        pruned = cursor.rowcount
+        conn.execute("""DELETE FROM tcd_file
+WHERE indexed_ts < ?""", (cutoff, ))
+
+        if pruned:
+            log.info('Pruned %d expired TCD index connote/items' % pruned)
+
+        return pruned
+
+    def connote_lookup(self, connote):
+        """Delivered items of *connote*.
+
+        **Returns:**
+            dictionary of *connote* delivered item numbers and their
+            arrival timestamps or ``None`` if *connote* has no delivered
+            items in the index
+
+        """
+        cursor = self.connection.execute("""SELECT item_nbr, arrival
+FROM tcd_delivered
+WHERE connote = ?""", (connote, ))
+        items = dict(cursor.fetchall())
+
+        if not items:
+            items = None
+
+        return items
+
+    def connote_delivered(self, connote, item_nbr=None):
+        """Check if *connote* has been "delivered".
+
+        See :meth:`top.StopParser.connote_delivered`.
+
+        """
+        log.debug('TCD index checking connote "%s" delivery status' %
+                  connote)
+
+        if item_nbr is None:
+            cursor = self.connection.execute("""SELECT 1
+FROM tcd_delivered
+WHERE connote = ?
+LIMIT 1""", (connote, ))
+        else:
+            cursor = self.connection.execute("""SELECT 1
+FROM tcd_delivered
+WHERE connote = ?
+AND item_nbr = ?""", (connote, item_nbr))
+        delivered = cursor.fetchone() is not None
+
+        log.debug('Connote "%s" delivery status: %s' % (connote, delivered))
+
+        return delivered
+
+    def purge(self):
+        """Release the index database resources.  The index itself is
+        retained on disk.
+        """
+        self.close()
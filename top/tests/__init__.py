@@ -1,5 +1,7 @@
 from test_parser import TestParser
+from test_t1250reader import TestT1250Reader
 from test_stopparser import TestStopParser
+from test_tcdindex import TestTcdIndex
 from test_adpparser import TestAdpParser
 from test_dbsession import TestDbSession
 from test_oradbsession import TestOraDbSession
@@ -33,6 +35,9 @@ from test_exporter_fast import TestExporterFast
 from test_config import TestConfig
 from test_ftp import TestFtp
 from test_service import TestService
+from test_commsspool import TestCommsSpool
+from test_commsdispatcher import TestCommsDispatcher
+from test_commsscheduler import TestCommsScheduler
 from test_reminder import TestReminder
 from test_ondelivery import TestOnDelivery
 from test_adp import TestAdp
@@ -369,6 +369,36 @@ class TestComms(unittest2.TestCase):
         os.removedirs(dir)
         self._c.db.rollback()
 
+    def test_process_batch_loader(self):
+        """Test batch processing -- loader.
+        """
+        dry = True
+
+        files = ['email.1.body', 'sms.1.body',
+                 'email.2.body', 'sms.2.body',
+                 'email.6.body', 'sms.6.body']
+        dodgy = ['banana', 'email.rem.3']
+
+        dir = tempfile.mkdtemp()
+        comms_files = []
+        for f in files + dodgy:
+            fh = open(os.path.join(dir, f), 'w')
+            comms_files.append(fh.name)
+            fh.close()
+
+        old_batch_size = self._c._smser.batch_size
+        self._c._smser.set_batch_size(10)
+        received = self._c.process_batch(comms_files, dry=dry)
+        expected = [False, False, True, True, True, True, False, False]
+        msg = 'Loader comms files batch processing error'
+        self.assertListEqual(received, expected, msg)
+
+        # Cleanup.
+        self._c._smser.set_batch_size(old_batch_size)
+        remove_files(get_directory_files_list(dir))
+        os.removedirs(dir)
+        self._c.db.rollback()
+
     def test_process_loader_sms_error_comms(self):
         """Test processing -- loader SMS error comms.
         """
@@ -690,6 +720,21 @@ WHERE id = 6"""
         msg = 'job_item.id based Agent details incorrect'
         self.assertDictEqual(received, expected, msg)
 
+    def test_prefetch_agent_details(self):
+        """Verify prefetched agent details.
+        """
+        files = ['email.6.body', 'sms.6.body', 'email.999.body', 'banana']
+        received = self._c.prefetch_agent_details(files).keys()
+        expected = [('job_item', 6)]
+        msg = 'Prefetched agent details keys error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._c.get_agent_details(6)
+        self._c.set_agent_details()
+        expected = self._c.get_agent_details(6)
+        msg = 'Prefetched agent details differ from queried details'
+        self.assertDictEqual(received, expected, msg)
+
     def test_parse_comms_filename(self):
         """Verify the parse_comms_filename.
         """
@@ -823,6 +868,45 @@ WHERE id = 6"""
         remove_files([comms_file, err_file])
         os.removedirs(dir)
 
+    def test_limited_send(self):
+        """Throttle REST API sends through the limiter.
+        """
+        class Limiter(object):
+            def __init__(self):
+                self.calls = []
+
+            def acquire(self, channel, count):
+                self.calls.append(('acquire', channel, count))
+
+            def release(self, channel):
+                self.calls.append(('release', channel))
+
+        def send(data, dry=False):
+            return data
+
+        limiter = Limiter()
+        old_limiter = self._c.limiter
+        self._c.set_limiter(limiter)
+
+        received = self._c.limited_send('sms', 3, send, data=True)
+        msg = 'Limited send return value error'
+        self.assertTrue(received, msg)
+
+        received = limiter.calls
+        expected = [('acquire', 'sms', 3), ('release', 'sms')]
+        msg = 'Limited send should charge the limiter'
+        self.assertListEqual(received, expected, msg)
+
+        # Dry runs do not reach the API.
+        limiter.calls = []
+        self._c.limited_send('email', 1, send, data=True, dry=True)
+        received = limiter.calls
+        msg = 'Dry limited send should not charge the limiter'
+        self.assertListEqual(received, [], msg)
+
+        # Clean up.
+        self._c.set_limiter(old_limiter)
+
     @classmethod
     def tearDownClass(cls):
         cls._c = None
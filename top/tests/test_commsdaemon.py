@@ -353,6 +353,12 @@ class TestCommsDaemon(unittest2.TestCase):
         """
         received = self._cd.comms_kwargs
         expected = {'db': None,
+                    'comms_dir': None,
+                    'comms_spool': 'file',
+                    'sms_batch_size': 1,
+                    'retry_attempts': 3,
+                    'retry_delay': 60,
+                    'retry_max_delay': 3600,
                     'prod': None,
                     'email_api': {'api': self._email_api,
                                   'api_password': '<email_pw>',
@@ -376,6 +382,12 @@ class TestCommsDaemon(unittest2.TestCase):
 
         received = cd.comms_kwargs
         expected = {'db': None,
+                    'comms_dir': None,
+                    'comms_spool': 'file',
+                    'sms_batch_size': 1,
+                    'retry_attempts': 3,
+                    'retry_delay': 60,
+                    'retry_max_delay': 3600,
                     'prod': None,
                     'email_api': {},
                     'proxy': None,
@@ -429,6 +441,12 @@ class TestCommsDaemon(unittest2.TestCase):
 
         received = cd.comms_kwargs
         expected = {'prod': 'faswbaup02',
+                    'comms_dir': None,
+                    'comms_spool': 'file',
+                    'sms_batch_size': 1,
+                    'retry_attempts': 3,
+                    'retry_delay': 60,
+                    'retry_max_delay': 3600,
                     'db': {'driver': 'FreeTDS',
                            'host': 'SQVDBAUT07',
                            'database': 'Nparcel',
@@ -460,6 +478,12 @@ class TestCommsDaemon(unittest2.TestCase):
         sa = 'https://apps.cinder.co/tollgroup/wsemail/emailservice.svc/sendemail'
         ea = 'https://api.esendex.com/v1.0/messagedispatcher'
         expected = {'db': None,
+                    'comms_dir': None,
+                    'comms_spool': 'file',
+                    'sms_batch_size': 1,
+                    'retry_attempts': 3,
+                    'retry_delay': 60,
+                    'retry_max_delay': 3600,
                     'email_api': {'api': sa,
                                   'api_password': '<email_pw>',
                                   'api_username': '<email_user>',
@@ -475,6 +499,28 @@ class TestCommsDaemon(unittest2.TestCase):
         msg = 'comms_kwargs structure error'
         self.assertDictEqual(received, expected, msg)
 
+    def test_limiter(self):
+        """Rate limits apply when comms are sent serially.
+        """
+        daemon = top.CommsDaemon(pidfile=None)
+        daemon.set_rates({'sms': 5})
+
+        msg = 'Single worker daemon should not have a dispatcher'
+        self.assertIsNone(daemon.dispatcher, msg)
+
+        received = daemon.limiter.rates
+        expected = {'sms': 5}
+        msg = 'Serial comms limiter rates error'
+        self.assertDictEqual(received, expected, msg)
+
+        daemon = top.CommsDaemon(pidfile=None)
+        daemon._config = top.CommsB2CConfig()
+        daemon.set_workers({'email': 1, 'sms': 2})
+        received = daemon.limiter
+        expected = daemon.dispatcher
+        msg = 'Concurrent comms limiter should be the dispatcher'
+        self.assertEqual(received, expected, msg)
+
     @classmethod
     def tearDownClass(cls):
         cls._cd.config.remove_section('db')
@@ -0,0 +1,74 @@
+import unittest2
+
+import top
+
+
+class TestCommsDispatcher(unittest2.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._d = top.CommsDispatcher(workers={'email': 2, 'sms': 3},
+                                     rates={'sms': 5})
+
+    def test_init(self):
+        """Initialise a CommsDispatcher object.
+        """
+        msg = 'Object is not a top.CommsDispatcher'
+        self.assertIsInstance(self._d, top.CommsDispatcher, msg)
+
+        received = self._d.concurrency
+        expected = 5
+        msg = 'Dispatcher concurrency error'
+        self.assertEqual(received, expected, msg)
+
+    def test_channel(self):
+        """Extract the channel from a comms event file.
+        """
+        received = self._d.channel('/data/comms/sms.1234.body')
+        expected = 'sms'
+        msg = 'Comms event channel error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._d.channel('/data/comms/banana')
+        msg = 'Unknown comms event channel should be None'
+        self.assertIsNone(received, msg)
+
+    def test_group_events(self):
+        """Group comms events by job_item.id.
+        """
+        files = ['/data/comms/email.1.body',
+                 '/data/comms/email.2.body',
+                 '/data/comms/sms.1.body',
+                 '/data/comms/banana']
+        received = self._d.group_events(files)
+        expected = [['/data/comms/email.1.body', '/data/comms/sms.1.body'],
+                    ['/data/comms/email.2.body'],
+                    ['/data/comms/banana']]
+        msg = 'Comms event grouping error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_pack_groups(self):
+        """Pack comms event groups into SMS batch sized tasks.
+        """
+        d = top.CommsDispatcher(comms_kwargs={'sms_batch_size': 2})
+        groups = [['/data/comms/email.1.body', '/data/comms/sms.1.body'],
+                  ['/data/comms/email.2.body'],
+                  ['/data/comms/sms.3.body'],
+                  ['/data/comms/sms.4.body']]
+        received = d.pack_groups(groups)
+        expected = [['/data/comms/email.2.body'],
+                    ['/data/comms/email.1.body',
+                     '/data/comms/sms.1.body',
+                     '/data/comms/sms.3.body'],
+                    ['/data/comms/sms.4.body']]
+        msg = 'Comms event packing error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._d.pack_groups(groups)
+        msg = 'Comms event packing error - no SMS batching'
+        self.assertListEqual(received, groups, msg)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._d = None
+        del cls._d
@@ -0,0 +1,79 @@
+import unittest2
+
+import top
+
+
+class TestCommsScheduler(unittest2.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._s = top.CommsScheduler(priorities={'rem': 4},
+                                    deadlines={'rem': 600})
+
+    def test_init(self):
+        """Initialise a CommsScheduler object.
+        """
+        msg = 'Object is not a top.CommsScheduler'
+        self.assertIsInstance(self._s, top.CommsScheduler, msg)
+
+        received = self._s.priority('rem')
+        expected = 4
+        msg = 'Overridden template priority error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._s.priority('banana')
+        expected = self._s.default_priority
+        msg = 'Unknown template priority error'
+        self.assertEqual(received, expected, msg)
+
+    def test_template(self):
+        """Extract the template from a comms event.
+        """
+        received = self._s.template('/data/comms/sms.1234.ret')
+        expected = 'ret'
+        msg = 'Comms event template error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._s.template('/data/comms/banana')
+        msg = 'Unknown comms event template should be None'
+        self.assertIsNone(received, msg)
+
+    def test_schedule(self):
+        """Order comms events by deadline and priority.
+        """
+        now = 10000.0
+        events = ['email.1.rem',
+                  'email.2.rem',
+                  'email.3.ret',
+                  'email.4.body',
+                  'sms.5.body',
+                  'banana']
+        created = {'email.1.rem': now - 60,
+                   'email.2.rem': now - 900,
+                   'email.3.ret': now - 60,
+                   'email.4.body': now - 30,
+                   'sms.5.body': now - 120,
+                   'banana': now - 9000}
+
+        received = self._s.schedule(events, created=created, now=now)
+        expected = ['email.2.rem',
+                    'sms.5.body',
+                    'email.4.body',
+                    'email.3.ret',
+                    'email.1.rem',
+                    'banana']
+        msg = 'Scheduled comms event order error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._s.stats['rem']
+        expected = {'depth': 2,
+                    'overdue': 1,
+                    'max_wait': 900.0,
+                    'mean_wait': 480.0}
+        msg = 'Comms scheduler template stats error'
+        self.assertDictEqual(received, expected, msg)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._s = None
+        del cls._s
@@ -0,0 +1,173 @@
+import unittest2
+import tempfile
+import os
+import time
+
+import top
+from top.utils.files import (remove_files,
+                             move_file)
+
+
+class TestCommsSpool(unittest2.TestCase):
+
+    def test_init(self):
+        """Initialise a CommsSpool object.
+        """
+        spool = top.CommsSpool()
+        msg = 'Object is not a top.CommsSpool'
+        self.assertIsInstance(spool, top.CommsSpool, msg)
+
+    def test_file_spool(self):
+        """File based comms spool event lifecycle.
+        """
+        dir = tempfile.mkdtemp()
+        spool = top.CommsSpool(comms_dir=dir)
+
+        msg = 'Enqueue should succeed'
+        self.assertTrue(spool.enqueue('email', 1, 'body'), msg)
+        self.assertTrue(spool.enqueue('sms', 1, 'body'), msg)
+
+        msg = 'Enqueued event should exist'
+        self.assertTrue(spool.exists('email', 1, 'body'), msg)
+
+        received = spool.claim('body')
+        expected = [os.path.join(dir, 'email.1.body'),
+                    os.path.join(dir, 'sms.1.body')]
+        msg = 'Claimed comms events error'
+        self.assertListEqual(sorted(received), expected, msg)
+
+        received = sorted(spool.created(expected).keys())
+        msg = 'Comms event creation times error'
+        self.assertListEqual(received, expected, msg)
+
+        spool.complete(expected[0])
+        msg = 'Completed event should not exist'
+        self.assertFalse(spool.exists('email', 1, 'body'), msg)
+
+        spool.error(expected[1])
+        msg = 'Errored event should still exist'
+        self.assertTrue(spool.exists('sms', 1, 'body'), msg)
+        msg = 'Errored event should be flagged as errored'
+        self.assertTrue(spool.errored(expected[1]), msg)
+
+        # Clean up.
+        remove_files(expected[1] + '.err')
+        os.removedirs(dir)
+
+    def test_file_spool_retry(self):
+        """File based comms spool event retry.
+        """
+        dir = tempfile.mkdtemp()
+        spool = top.CommsSpool(comms_dir=dir)
+        spool.enqueue('email', 1, 'body')
+        event = os.path.join(dir, 'email.1.body')
+
+        spool.retry(spool.claim()[0], 1, time.time() + 60)
+        msg = 'Retrying event should not be claimed before it is due'
+        self.assertListEqual(spool.claim(), [], msg)
+        msg = 'Retrying event should still exist'
+        self.assertTrue(spool.exists('email', 1, 'body'), msg)
+
+        # Make the retry due.
+        fh = open(event + '.retry', 'w')
+        fh.write('2 %f\n' % (time.time() - 1))
+        fh.close()
+        received = spool.claim()
+        msg = 'Due retry event should be claimed'
+        self.assertListEqual(received, [event], msg)
+
+        received = spool.attempts(event)
+        expected = 2
+        msg = 'Retry event attempts error'
+        self.assertEqual(received, expected, msg)
+
+        fh = open(event)
+        received = fh.read()
+        fh.close()
+        msg = 'Claimed retry event file should not hold retry state'
+        self.assertEqual(received, '', msg)
+
+        # Errored events do not carry their retry state.
+        spool.error(event)
+        msg = 'Errored event retry state should be removed'
+        self.assertFalse(os.path.exists(event + '.retry'), msg)
+
+        move_file(event + '.err', event)
+        received = spool.attempts(event)
+        msg = 'Requeued errored event should restart attempts'
+        self.assertEqual(received, 0, msg)
+
+        # Clean up.
+        spool.complete(event)
+        os.removedirs(dir)
+
+    def test_sqlite_spool(self):
+        """SQLite comms spool event lifecycle.
+        """
+        dir = tempfile.mkdtemp()
+        spool = top.SqliteCommsSpool(comms_dir=dir)
+
+        msg = 'Enqueue should succeed'
+        self.assertTrue(spool.enqueue('email', 1, 'body'), msg)
+        self.assertTrue(spool.enqueue('sms', 1, 'body'), msg)
+        self.assertTrue(spool.enqueue('email', 2, 'ret'), msg)
+        msg = 'Duplicate enqueue should succeed'
+        self.assertTrue(spool.enqueue('email', 1, 'body'), msg)
+
+        msg = 'Enqueued event should exist'
+        self.assertTrue(spool.exists('email', 1, 'body'), msg)
+        msg = 'Unknown event should not exist'
+        self.assertFalse(spool.exists('email', 3, 'body'), msg)
+
+        received = spool.claim('body')
+        expected = [os.path.join(dir, 'email.1.body'),
+                    os.path.join(dir, 'sms.1.body')]
+        msg = 'Claimed comms events error'
+        self.assertListEqual(received, expected, msg)
+
+        received = sorted(spool.created(expected).keys())
+        msg = 'Comms event creation times error'
+        self.assertListEqual(received, expected, msg)
+
+        received = spool.claim('body')
+        msg = 'Claimed events should not be claimed again'
+        self.assertListEqual(received, [], msg)
+
+        spool.complete(expected[0])
+        msg = 'Completed event should not exist'
+        self.assertFalse(spool.exists('email', 1, 'body'), msg)
+
+        spool.error(expected[1])
+        msg = 'Errored event should still exist'
+        self.assertTrue(spool.exists('sms', 1, 'body'), msg)
+        msg = 'Errored event should be flagged as errored'
+        self.assertTrue(spool.errored(expected[1]), msg)
+
+        # Unfinished claims are returned to the spool on release.
+        claimed = spool.claim()
+        spool.release()
+        received = spool.claim()
+        msg = 'Released events should be claimed again'
+        self.assertListEqual(received, claimed, msg)
+
+        # Failed events are held back until their retry is due.
+        event = claimed[0]
+        spool.retry(event, 1, time.time() + 60)
+        msg = 'Retrying event should not be claimed before it is due'
+        self.assertNotIn(event, spool.claim(), msg)
+        spool.release()
+
+        spool.retry(event, 2, time.time() - 1)
+        msg = 'Due retry event should be claimed'
+        self.assertIn(event, spool.claim(), msg)
+
+        received = spool.attempts(event)
+        expected = 2
+        msg = 'Retry event attempts error'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        spool.close()
+        db_files = [os.path.join(dir, x) for x in os.listdir(dir)]
+        remove_files(db_files)
+        os.removedirs(dir)
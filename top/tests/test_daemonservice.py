@@ -1,4 +1,6 @@
 import unittest2
+import tempfile
+import sys
 import os
 
 import top
@@ -59,6 +61,41 @@ class TestDaemonService(unittest2.TestCase):
         msg = 'HTML table creation error'
         self.assertEqual(received, expected, msg)
 
+    @unittest2.skipUnless(sys.platform.startswith('linux'), 'Linux only')
+    def test_wait_ignore(self):
+        """Wait ignores the daemon's own file events.
+        """
+        dir = tempfile.mkdtemp()
+        ds = top.DaemonService(pidfile=None)
+        ds.set_inotify(True)
+
+        # Prime the directory watch.
+        ds.wait(0, dirs=[dir])
+
+        err_file = os.path.join(dir, 'email.1.body.err')
+        gone_file = os.path.join(dir, 'email.2.body')
+        for file in [err_file, gone_file]:
+            open(file, 'w').close()
+        os.remove(gone_file)
+
+        received = ds.wait(0.1, dirs=[dir], ignore='\\.(err|retry)$')
+        expected = []
+        msg = 'Ignored and removed file events should not end the wait'
+        self.assertListEqual(received, expected, msg)
+
+        new_file = os.path.join(dir, 'email.3.body')
+        open(new_file, 'w').close()
+        received = ds.wait(5, dirs=[dir], ignore='\\.(err|retry)$')
+        expected = [new_file]
+        msg = 'New file event should end the wait'
+        self.assertListEqual(received, expected, msg)
+
+        # Clean up.
+        ds._watcher.close()
+        for file in [err_file, new_file]:
+            os.remove(file)
+        os.removedirs(dir)
+
     @classmethod
     def tearDownClass(cls):
         del cls._recipients
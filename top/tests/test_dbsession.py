@@ -38,6 +38,71 @@ VALUES ('xxx')"""
         msg = 'Dummy table column names not as expected'
         self.assertListEqual(received, expected, msg)
 
+    def test_call_with_params(self):
+        """Execute parameterised SQL.
+        """
+        sql = """INSERT INTO dummy (dummy_field)
+VALUES (?)"""
+        for value in ['aaa', "can't"]:
+            self._db(sql, [value])
+
+        sql = """SELECT dummy_field
+FROM dummy
+WHERE dummy_field = ?"""
+        self._db(sql, ["can't"])
+        received = list(self._db.rows())
+        expected = [("can't", )]
+        msg = 'Parameterised query return value not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._db.columns()
+        expected = ['dummy_field']
+        msg = 'Parameterised query column names not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        # and clean up.
+        self._db.connection.rollback()
+
+    def test_insert_with_params(self):
+        """Insert into the DB table via parameterised SQL.
+        """
+        sql = """INSERT INTO dummy (dummy_field)
+VALUES (?)"""
+        received = self._db.insert(sql, ['xxx'])
+        expected = 1
+        msg = 'Parameterised insert should return the row ID'
+        self.assertEqual(received, expected, msg)
+
+        # and clean up.
+        self._db.connection.rollback()
+
+    def test_statement_cursor(self):
+        """Statement cursor cache.
+        """
+        old_stmt_cache_size = self._db.stmt_cache_size
+        self._db.set_stmt_cache_size(2)
+
+        sql = 'SELECT id FROM dummy WHERE id = ?'
+        cursor = self._db.statement_cursor(sql)
+        received = self._db.statement_cursor(sql)
+        msg = 'Statement should reuse its cursor'
+        self.assertIs(received, cursor, msg)
+
+        self._db.statement_cursor('SELECT 1 FROM dummy WHERE id = ?')
+        self._db.statement_cursor('SELECT 2 FROM dummy WHERE id = ?')
+        received = sql in self._db.statements
+        msg = 'Least recently used statement cursor should be closed'
+        self.assertFalse(received, msg)
+
+        received = len(self._db.statements)
+        expected = 2
+        msg = 'Statement cursor cache size error'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        self._db.clear_statements()
+        self._db.set_stmt_cache_size(old_stmt_cache_size)
+
     @classmethod
     def tearDownClass(cls):
         cls._db.disconnect()
@@ -1,8 +1,13 @@
 import unittest2
 import os
 import socket
+import email
+import tempfile
 
 import top
+from top.emailer import (get_mime_part,
+                         clear_part_cache,
+                         PART_CACHE)
 
 
 class TestEmailer(unittest2.TestCase):
@@ -106,6 +111,93 @@ class TestEmailer(unittest2.TestCase):
         msg = 'E-mail send override subject should return True'
         self.assertTrue(received, msg)
 
+    def test_create_comms_structure(self):
+        """Create comms MIME structure -- attachment and inline image.
+        """
+        data = {}
+        file = os.path.join('top', 'tests', 'files', 'test.xlsx')
+        image = os.path.join('top', 'images', 'toll_logo.png')
+        mime = self._e.create_comms(data,
+                                    template='test',
+                                    files=[file],
+                                    images=[image])
+        parsed = email.message_from_string(mime)
+
+        received = [x.get_content_type() for x in parsed.walk()]
+        expected = ['multipart/related',
+                    'multipart/alternative',
+                    'application/octet-stream',
+                    'text/html',
+                    'image/png']
+        msg = 'MIME structure not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        received = parsed.get_payload(0).get_payload(0)
+        msg = 'Attachment payload not as expected'
+        self.assertEqual(received.get_payload(decode=True),
+                         open(file, 'rb').read(),
+                         msg)
+
+        received = parsed.get_payload(1)
+        msg = 'Inline image Content-ID not as expected'
+        self.assertEqual(received['Content-ID'], '<toll_logo>', msg)
+
+        msg = 'Inline image payload not as expected'
+        self.assertEqual(received.get_payload(decode=True),
+                         open(image, 'rb').read(),
+                         msg)
+
+    def test_build_mime_long_header(self):
+        """Build MIME message -- long headers wrapped.
+        """
+        subject = ' '.join(['Subject'] * 20)
+        mime = self._e.build_mime([('Subject', subject)], '<p>body</p>')
+        parsed = email.message_from_string(mime)
+
+        msg = 'Long subject should be folded'
+        self.assertTrue(mime.count('\n Subject') > 0, msg)
+
+        received = ' '.join(parsed['Subject'].split())
+        msg = 'Folded subject not as expected'
+        self.assertEqual(received, subject, msg)
+
+        received = parsed.get_payload(0).get_payload(0).get_payload()
+        msg = 'HTML body not as expected'
+        self.assertEqual(received, '<p>body</p>', msg)
+
+    def test_get_mime_part_cache(self):
+        """Source MIME part from the process-wide cache.
+        """
+        clear_part_cache()
+        fd, path = tempfile.mkstemp()
+        os.write(fd, 'content')
+        os.close(fd)
+
+        part = get_mime_part(path)
+        msg = 'MIME part not cached'
+        self.assertIn((path, False), PART_CACHE, msg)
+
+        received = get_mime_part(path)
+        msg = 'Cached MIME part should be reused'
+        self.assertTrue(received is part, msg)
+
+        f = open(path, 'w')
+        f.write('changed content')
+        f.close()
+        received = email.message_from_string(get_mime_part(path))
+        msg = 'Changed file should be re-encoded'
+        self.assertEqual(received.get_payload(decode=True),
+                         'changed content',
+                         msg)
+
+        os.remove(path)
+        received = get_mime_part(path)
+        msg = 'Missing file should return None'
+        self.assertIsNone(received, msg)
+
+        # Clean up.
+        clear_part_cache()
+
     def test_check_subject(self):
         """Check subject context based on PROD and non-PROD instance.
         """
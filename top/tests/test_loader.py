@@ -385,6 +385,90 @@ FROM job_item"""
         # Restore DB state.
         self._ldr.db.rollback()
 
+    def test_processor_valid_record_batched(self):
+        """Process valid raw T1250 lines -- batched inserts.
+        """
+        # Seed the Agent Ids.
+        agent_fields = {'code': 'N031',
+                        'dp_id': 1}
+        self._ldr.db(self._ldr.db._agent.insert_sql(agent_fields))
+        agent_fields = {'code': 'N014',
+                        'dp_id': 1}
+        self._ldr.db(self._ldr.db._agent.insert_sql(agent_fields))
+
+        old_batch_size = self._ldr.batch_size
+        self._ldr.set_batch_size(10)
+
+        line = self._c.get('test_lines', 'VALID_LINE')
+        msg = 'Batched T1250 record should process successfully'
+        self.assertTrue(self._ldr.process(self._job_ts,
+                                          line,
+                                          FILE_BU.get('tolp'),
+                                          COND_MAP), msg)
+
+        sql = self._ldr.db.job.check_barcode(VALID_LINE_BARCODE)
+        self._ldr.db(sql)
+        received = list(self._ldr.db.rows())
+        msg = 'Batched job should not be written before flush'
+        self.assertListEqual(received, [], msg)
+
+        # Same barcode forces a flush of the queued record.
+        line = self._c.get('test_lines', 'VALID_LINE_AGENT_UPD')
+        msg = 'Batched T1250 record update should process successfully'
+        self.assertTrue(self._ldr.process(self._job_ts,
+                                          line,
+                                          FILE_BU.get('tolp'),
+                                          COND_MAP), msg)
+
+        self._ldr.db(sql)
+        received = len(list(self._ldr.db.rows()))
+        expected = 1
+        msg = 'Batched job should be written on barcode conflict'
+        self.assertEqual(received, expected, msg)
+
+        self._ldr.flush()
+        sql = self._ldr.db.jobitem.connote_sql(VALID_LINE_CONNOTE)
+        self._ldr.db(sql)
+        received = len(list(self._ldr.db.rows()))
+        expected = 1
+        msg = 'Batched job_item count error after flush'
+        self.assertEqual(received, expected, msg)
+
+        # Restore DB state.
+        self._ldr.set_batch_size(old_batch_size)
+        self._ldr.db.rollback()
+
+    def test_reset_discards_queued_records(self):
+        """Reset without commit discards the queued records.
+        """
+        # Seed the Agent Id.
+        agent_fields = {'code': 'N031',
+                        'dp_id': 1}
+        self._ldr.db(self._ldr.db._agent.insert_sql(agent_fields))
+        dps = ['Nparcel']
+
+        old_batch_size = self._ldr.batch_size
+        self._ldr.set_batch_size(10)
+
+        line = self._c.get('test_lines', 'VALID_LINE_WITH_RECIPIENTS')
+        self._ldr.process(self._job_ts,
+                          line,
+                          FILE_BU.get('tolp'),
+                          COND_MAP_COMMS,
+                          dps)
+        self._ldr.reset()
+
+        received = self._ldr.pending
+        msg = 'Queued records should be discarded on rollback'
+        self.assertListEqual(received, [], msg)
+
+        received = get_directory_files_list(self._comms_dir)
+        msg = 'Discarded records should not trigger comms'
+        self.assertListEqual(received, [], msg)
+
+        # Restore state.
+        self._ldr.set_batch_size(old_batch_size)
+
     def test_processor_invalid_postcode_record(self):
         """Process valid raw T1250 line -- missing Postcode.
         """
@@ -829,6 +913,170 @@ FROM job_item"""
         received = self._ldr.get_agent_id(test_agent_id)
         self.assertIsNotNone(received, msg)
 
+    def test_prefetch(self):
+        """Prefetch barcode and connote/item_nbr index.
+        """
+        # Seed the Agent Id.
+        agent_fields = {'code': 'N031',
+                        'dp_id': 1}
+        self._ldr.db(self._ldr.db._agent.insert_sql(agent_fields))
+
+        line = self._c.get('test_lines', 'VALID_LINE')
+        msg = 'Valid T1250 record should process successfully'
+        self.assertTrue(self._ldr.process(self._job_ts,
+                                          line,
+                                          FILE_BU.get('tolp'),
+                                          COND_MAP), msg)
+        job_ids = self._ldr.barcode_exists(VALID_LINE_BARCODE)
+
+        self._ldr.prefetch([line, '%%EOF'])
+
+        # Remove the DB records to prove that the index is used.
+        self._ldr.db('DELETE FROM job')
+
+        received = self._ldr.barcode_exists(VALID_LINE_BARCODE)
+        expected = job_ids
+        msg = 'Prefetched barcode lookup error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._ldr.get_jobitem_based_job_id(VALID_LINE_CONNOTE,
+                                                      VALID_LINE_CONNOTE)
+        expected = job_ids[0]
+        msg = 'Prefetched connote/item_nbr lookup error'
+        self.assertEqual(received, expected, msg)
+
+        # Restore DB state.
+        self._ldr.reset()
+
+    def test_prefetch_mixed_case(self):
+        """Prefetch index matches barcodes and connotes of any case.
+        """
+        # Seed the Agent Id.
+        agent_fields = {'code': 'N031',
+                        'dp_id': 1}
+        self._ldr.db(self._ldr.db._agent.insert_sql(agent_fields))
+
+        line = self._c.get('test_lines', 'VALID_LINE')
+        line = 'AB0121786CDE' + line[12:438] + 'ABC6536111' + line[448:]
+        self._ldr.process(self._job_ts, line, FILE_BU.get('tolp'), COND_MAP)
+        job_ids = self._ldr.barcode_exists('ABC6536111')
+
+        # The DB matches without regard to case (as per MSSQL).
+        job = self._ldr.db.job
+        jobitem = self._ldr.db.jobitem
+        check_barcodes_sql = job.check_barcodes_sql
+        connotes_item_nbr_sql = jobitem.connotes_item_nbr_sql
+
+        def upper_barcodes_sql(barcodes):
+            return check_barcodes_sql([x.upper() for x in barcodes])
+
+        def upper_connotes_sql(connotes):
+            return connotes_item_nbr_sql([x.upper() for x in connotes])
+
+        job.check_barcodes_sql = upper_barcodes_sql
+        jobitem.connotes_item_nbr_sql = upper_connotes_sql
+
+        self._ldr.prefetch([line.lower(), '%%EOF'])
+
+        del job.check_barcodes_sql
+        del jobitem.connotes_item_nbr_sql
+
+        # Remove the DB records to prove that the index is used.
+        self._ldr.db('DELETE FROM job')
+
+        received = self._ldr.barcode_exists('abc6536111')
+        expected = job_ids
+        msg = 'Prefetched mixed case barcode lookup error'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._ldr.get_jobitem_based_job_id('ab0121786cde',
+                                                      'Ab0121786cdE')
+        expected = job_ids[0]
+        msg = 'Prefetched mixed case connote/item_nbr lookup error'
+        self.assertEqual(received, expected, msg)
+
+        # Restore DB state.
+        self._ldr.reset()
+
+    def test_index_jobitem_newest_job(self):
+        """Index a new job_item -- newest job wins.
+        """
+        # Seed the Agent Id.
+        agent_fields = {'code': 'N031',
+                        'dp_id': 1}
+        self._ldr.db(self._ldr.db._agent.insert_sql(agent_fields))
+
+        line = self._c.get('test_lines', 'VALID_LINE')
+        self._ldr.process(self._job_ts,
+                          line,
+                          FILE_BU.get('tolp'),
+                          COND_MAP)
+        self._ldr.prefetch([line, '%%EOF'])
+
+        jobitem_data = {'connote_nbr': VALID_LINE_CONNOTE,
+                        'item_nbr': VALID_LINE_CONNOTE}
+        self._ldr.index_jobitem(999, jobitem_data, 1000)
+
+        received = self._ldr.get_jobitem_based_job_id(VALID_LINE_CONNOTE,
+                                                      VALID_LINE_CONNOTE)
+        expected = 999
+        msg = 'Indexed connote/item_nbr should return the newest job'
+        self.assertEqual(received, expected, msg)
+
+        # Restore DB state.
+        self._ldr.reset()
+
+    def test_agent_id_cached(self):
+        """Agent ID lookup via the agent cache.
+        """
+        ldr = top.Loader(agent_cache_size=10)
+        agent_fields = {'code': 'N031',
+                        'dp_id': 1}
+        ldr.db(ldr.db._agent.insert_sql(agent_fields))
+
+        received = ldr.get_agent_id('N031')
+        expected = 1
+        msg = 'Cached agent lookup (miss) error'
+        self.assertEqual(received, expected, msg)
+
+        received = ldr.get_agent_id('N031')
+        msg = 'Cached agent lookup (hit) error'
+        self.assertEqual(received, expected, msg)
+
+        received = ldr.cache_stats().split('|')[0]
+        expected = 'agent cache size:1 hits:1 misses:1'
+        msg = 'Agent cache stats error'
+        self.assertEqual(received, expected, msg)
+
+        # Rollback clears the cache.
+        ldr.reset()
+        received = len(ldr.agent_cache)
+        expected = 0
+        msg = 'Agent cache should be cleared on rollback'
+        self.assertEqual(received, expected, msg)
+
+    def test_check_agent_stamp(self):
+        """Agent cache invalidation via agent stamp file.
+        """
+        ldr = top.Loader(agent_cache_size=10)
+        stamp_fh = tempfile.NamedTemporaryFile()
+        ldr.set_agent_stamp(stamp_fh.name)
+
+        msg = 'First agent stamp check should not invalidate'
+        self.assertFalse(ldr.check_agent_stamp(), msg)
+
+        ldr.agent_cache.put('N031', 1)
+        os.utime(stamp_fh.name, (0, 0))
+        msg = 'Modified agent stamp should invalidate'
+        self.assertTrue(ldr.check_agent_stamp(), msg)
+
+        received = ldr.agent_cache.get('N031')
+        msg = 'Agent cache should be empty after invalidation'
+        self.assertIsNone(received, msg)
+
+        # Clean up.
+        stamp_fh.close()
+
     def test_get_agent_delivery_partner(self):
         """Return the Agent Delivery Partner.
         """
@@ -7,6 +7,9 @@ from top.utils.files import (create_dir,
                              get_directory_files_list,
                              copy_file,
                              remove_files)
+from top.loaderdaemon import (checkpoint_path,
+                              read_checkpoint,
+                              write_checkpoint)
 
 
 class TestLoaderDaemon(unittest2.TestCase):
@@ -589,6 +592,49 @@ class TestLoaderDaemon(unittest2.TestCase):
         self._d.config.set_archive_dir(old_archive_dir)
         self._d.config.set_aggregator_dirs(old_agg_dir)
 
+    def test_partition_files(self):
+        """Partition T1250 files by Business Unit.
+        """
+        files = ['T1250_TOLP_20130821011327.txt',
+                 'T1250_TOLI_20130828202901.txt',
+                 'T1250_xxxx_20130821011327.txt',
+                 'T1250_TOLP_20130822011327.txt']
+        partitions = self._d.partition_files(files)
+
+        received = [[x.get('file') for x in p] for p in partitions]
+        expected = [['T1250_TOLP_20130821011327.txt',
+                     'T1250_TOLP_20130822011327.txt'],
+                    ['T1250_TOLI_20130828202901.txt']]
+        msg = 'BU file partition error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_checkpoint(self):
+        """Write and read a T1250 file checkpoint.
+        """
+        dir = tempfile.mkdtemp()
+        file = os.path.join(dir, 'T1250_TOLI_20130828202901.txt')
+        copy_file(self._file, file)
+
+        received = read_checkpoint(file)
+        expected = (0, 0)
+        msg = 'Missing checkpoint should return start of file'
+        self.assertTupleEqual(received, expected, msg)
+
+        write_checkpoint(file, 100, 2)
+        received = read_checkpoint(file)
+        expected = (100, 2)
+        msg = 'Checkpoint state error'
+        self.assertTupleEqual(received, expected, msg)
+
+        received = os.path.basename(checkpoint_path(file))
+        expected = '.T1250_TOLI_20130828202901.txt.ckpt'
+        msg = 'Checkpoint sidecar should be a hidden file'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        remove_files([file, checkpoint_path(file)])
+        os.removedirs(dir)
+
     def test_get_comms_delivery_partners(self):
         """Verify the comms delivery partners per BU.
         """
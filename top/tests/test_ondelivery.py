@@ -67,6 +67,48 @@ class TestOnDelivery(unittest2.TestCase):
         msg = 'Primary elect job no recipients should produce empty list'
         self.assertListEqual(received, expected, msg)
 
+    def test_get_uncollected_job_items_by_bu(self):
+        """Uncollected job items partitioned by Business Unit.
+        """
+        kwargs = {'service_code': 3,
+                  'bu_delivery_partners': {1: ('Nparcel', ),
+                                           2: ('ParcelPoint', )}}
+        received = self._on.get_uncollected_job_items_by_bu(**kwargs)
+        expected = {1: [(3, 'pe_connote', 'pe_item_nbr'),
+                        (10, 'ARTZ124110', '00393403250085050506'),
+                        (12, 'ANWD011307', 'ANWD011307001'),
+                        (13, 'IANZ012764', 'IANZ012764')],
+                    2: []}
+        msg = 'Uncollected job items per BU not as expected'
+        self.assertListEqual(sorted(received[1]), expected[1], msg)
+        self.assertListEqual(received[2], expected[2], msg)
+
+    def test_get_uncollected_job_items_by_bu_mixed_case(self):
+        """Uncollected job items partitioned by mixed case Delivery
+        Partner.
+        """
+        # The DB matches without regard to case (as per MSSQL).
+        jobitem = self._on.db.jobitem
+        uncollected_jobitems_sql = jobitem.uncollected_jobitems_sql
+
+        def nocase_uncollected_jobitems_sql(**kwargs):
+            dps = [x.capitalize() for x in kwargs['delivery_partners']]
+            kwargs['delivery_partners'] = tuple(dps)
+            return uncollected_jobitems_sql(**kwargs)
+
+        jobitem.uncollected_jobitems_sql = nocase_uncollected_jobitems_sql
+        kwargs = {'service_code': 3,
+                  'bu_delivery_partners': {1: ('NPARCEL', )}}
+        received = self._on.get_uncollected_job_items_by_bu(**kwargs)
+        del jobitem.uncollected_jobitems_sql
+
+        expected = [(3, 'pe_connote', 'pe_item_nbr'),
+                    (10, 'ARTZ124110', '00393403250085050506'),
+                    (12, 'ANWD011307', 'ANWD011307001'),
+                    (13, 'IANZ012764', 'IANZ012764')]
+        msg = 'Mixed case Delivery Partner job items not as expected'
+        self.assertListEqual(sorted(received[1]), expected, msg)
+
     def test_process_dry_run(self):
         """Check processing -- dry run.
         """
@@ -120,6 +162,38 @@ class TestOnDelivery(unittest2.TestCase):
         # Cleanup.
         remove_files(received)
 
+    def test_process_shared_delivery_index(self):
+        """Check processing -- shared delivery index.
+        """
+        dry = False
+
+        self._on.load_delivery_index([self._test_file])
+        msg = 'Delivery index should be loaded'
+        self.assertTrue(self._on.parser.size > 0, msg)
+
+        kwargs = {'template': 'pe',
+                  'service_code': 3,
+                  'bu_ids': (1, 2, 3),
+                  'delivery_partners': ('Nparcel', ),
+                  'dry': dry}
+        received = self._on.process(**kwargs)
+        expected = [10, 12]
+        msg = 'List of processed items (shared index) incorrect'
+        self.assertListEqual(received, expected, msg)
+
+        msg = 'Delivery index should survive process without in_files'
+        self.assertTrue(self._on.parser.size > 0, msg)
+
+        self._on.purge_delivery_index()
+        received = self._on.parser.size
+        expected = 0
+        msg = 'Delivery index should be released after purge'
+        self.assertEqual(received, expected, msg)
+
+        # Cleanup.
+        remove_files([os.path.join(self._comms_dir,
+                                   x) for x in os.listdir(self._comms_dir)])
+
     def test_process_erred_comms(self):
         """Check processing -- error comms already exists.
         """
@@ -296,6 +370,25 @@ class TestOnDelivery(unittest2.TestCase):
         # Clean up.
         self._on.set_scan_desc_keys(old_scan_keys)
 
+    def test_connotes_delivered(self):
+        """Bulk query delivered status against TransSend.
+        """
+        old_chunk_size = self._on.ts_chunk_size
+        self._on.set_ts_chunk_size(1)
+
+        connotes = [('ANWD011307', 'ANWD011307001'),
+                    ('ANWD011307', 'banana'),
+                    ('APLD029228', 'APLD029228001'),
+                    ('IANZ012769', 'IANZ012769'),
+                    ('banana', 'banana')]
+        received = self._on.connotes_delivered(connotes)
+        expected = set([('ANWD011307', 'ANWD011307001')])
+        msg = 'TransSend bulk delivery check set not as expected'
+        self.assertSetEqual(received, expected, msg)
+
+        # Clean up.
+        self._on.set_ts_chunk_size(old_chunk_size)
+
     @classmethod
     def tearDownClass(cls):
         cls._on = None
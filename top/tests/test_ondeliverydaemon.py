@@ -278,6 +278,27 @@ class TestOnDeliveryDaemon(unittest2.TestCase):
         msg = 'Report files from get_files() error'
         self.assertListEqual(received, expected, msg)
 
+    def test_uncollected_job_items(self):
+        """Uncollected job items for all BUs in a single query.
+        """
+        received = self._odd.uncollected_job_items(3, (1, 3))
+        expected = {1: [(3, 'pe_connote', 'pe_item_nbr'),
+                        (10, 'ARTZ124110', '00393403250085050506'),
+                        (12, 'ANWD011307', 'ANWD011307001'),
+                        (13, 'IANZ012764', 'IANZ012764')],
+                    3: []}
+        msg = 'Uncollected job items BU keys error'
+        self.assertListEqual(sorted(received.keys()), [1, 3], msg)
+        msg = 'Uncollected job items (Priority) error'
+        self.assertListEqual(sorted(received[1]), expected[1], msg)
+        msg = 'Uncollected job items (IPEC) error'
+        self.assertListEqual(received[3], expected[3], msg)
+
+        received = self._odd.uncollected_job_items(3, ())
+        expected = {}
+        msg = 'Uncollected job items with no BUs error'
+        self.assertDictEqual(received, expected, msg)
+
     def test_delivery_partner_lookup(self):
         """Delivery partner lookups.
         """
@@ -40,6 +40,47 @@ VALUES ('xxx')"""
         msg = 'Dummy table column names not as expected'
         self.assertListEqual(received, expected, msg)
 
+    def test_call_with_bind_variables(self):
+        """Execute SQL with bind variables.
+        """
+        sql = """INSERT INTO dummy (dummy_field)
+VALUES (:dummy_field)"""
+        for value in ['aaa', 'bbb', 'ccc']:
+            self._db(sql, {'dummy_field': value})
+
+        sql = """SELECT dummy_field
+FROM dummy
+WHERE dummy_field = :dummy_field"""
+        self._db(sql, {'dummy_field': 'bbb'})
+        received = list(self._db.rows())
+        expected = [('bbb', )]
+        msg = 'Bind variable query return value not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        # and clean up.
+        self._db.connection.rollback()
+
+    def test_rows_array_fetch(self):
+        """Stream rows in arraysize batches.
+        """
+        sql = """INSERT INTO dummy (dummy_field)
+VALUES (:dummy_field)"""
+        for i in range(5):
+            self._db(sql, {'dummy_field': 'field_%d' % i})
+
+        old_arraysize = self._db.arraysize
+        self._db.set_arraysize(2)
+
+        self._db('SELECT dummy_field FROM dummy ORDER BY id')
+        received = [x[0] for x in self._db.rows()]
+        expected = ['field_%d' % i for i in range(5)]
+        msg = 'Array fetch rows not as expected'
+        self.assertListEqual(received, expected, msg)
+
+        # and clean up.
+        self._db.set_arraysize(old_arraysize)
+        self._db.connection.rollback()
+
     def test_initialisation_to_real_oracle_db(self):
         """Placeholder for real DB connectivity (disabled by default).
         """
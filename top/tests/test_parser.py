@@ -200,6 +200,38 @@ class TestParser(unittest2.TestCase):
         msg = 'All field parse incorrect'
         self.assertEqual(received, expected, msg)
 
+    def test_parse_record(self):
+        """Line parse to a tuple record.
+        """
+        p = top.Parser(fields=self._fields)
+        received = dict(zip(p.field_names, p.parse_record(self._line)))
+        expected = p.parse_line(self._line)
+        msg = 'Tuple record parse incorrect'
+        self.assertDictEqual(received, expected, msg)
+
+    def test_parse_lines(self):
+        """Bulk line parse.
+        """
+        p = top.Parser(fields={'Conn Note': {'offset': 0,
+                                             'length': 20}})
+        received = list(p.parse_lines([self._line, self._line]))
+        expected = [('006499335802',), ('006499335802',)]
+        msg = 'Bulk line parse incorrect'
+        self.assertListEqual(received, expected, msg)
+
+    def test_set_fields_recompiles(self):
+        """Line parse after fields update.
+        """
+        p = top.Parser(fields={'Conn Note': {'offset': 0,
+                                             'length': 20}})
+        p.set_fields({'Post code': {'offset': 171,
+                                    'length': 4}})
+        received = p.parse_line(self._line)
+        expected = {'Conn Note': '006499335802',
+                    'Post code': '2048'}
+        msg = 'Line parse after fields update incorrect'
+        self.assertDictEqual(received, expected, msg)
+
     @classmethod
     def tearDownClass(cls):
         cls._p = None
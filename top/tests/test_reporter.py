@@ -50,6 +50,30 @@ class TestReporter(unittest2.TestCase):
         self._r.reset()
         self._r.set_identifier(old_id)
 
+    def test_merge(self):
+        """Merge the counts of another reporter.
+        """
+        old_id = self._r.identifier
+
+        self._r.reset(identifier='merged')
+        self._r(True)
+
+        other = top.Reporter()
+        other(True)
+        other(False)
+        other(None)
+        other.report()
+
+        self._r.merge(other)
+        received = self._r.report(set_end=False)
+        expected = 'merged success:2 error:1 other:1 total:4 - duration:'
+        msg = 'Merged report() return message error'
+        self.assertEqual(received[0:52], expected, msg)
+
+        # Clean up.
+        self._r.reset()
+        self._r.set_identifier(old_id)
+
     @classmethod
     def tearDownClass(cls):
         cls._r = None
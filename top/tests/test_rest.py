@@ -1,4 +1,5 @@
 import unittest2
+import socket
 
 import top
 
@@ -15,6 +16,67 @@ class TestRest(unittest2.TestCase):
         msg = 'Object is not an top.Rest'
         self.assertIsInstance(self._r, top.Rest, msg)
 
+    def test_parse_proxy(self):
+        """Split the proxy string into host, port and credentials.
+        """
+        rest = top.Rest(proxy='loumar:<passwd>@auproxy-farm.toll.com.au:8080',
+                        proxy_scheme='https')
+
+        received = rest.parse_proxy()
+        expected = ('auproxy-farm.toll.com.au', 8080, 'loumar:<passwd>')
+        msg = 'Proxy string parse error'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_connection_pool(self):
+        """Check out and return pooled connections.
+        """
+        pool = top.HttpConnectionPool(max_size=1)
+        key = ('https', 'api.esendex.com', 443, None)
+
+        msg = 'Empty pool should not return a connection'
+        self.assertIsNone(pool.get(key), msg)
+
+        conn = self._r.connect('https', 'api.esendex.com', 443)
+        pool.put(key, conn)
+        received = pool.get(key)
+        msg = 'Pooled connection should be reused'
+        self.assertEqual(received, conn, msg)
+
+        msg = 'Checked out connection should not be reused'
+        self.assertIsNone(pool.get(key), msg)
+
+        # Idle connections are discarded after the idle timeout.
+        pool.set_idle_timeout(-1)
+        pool.put(key, conn)
+        msg = 'Expired connection should not be reused'
+        self.assertIsNone(pool.get(key), msg)
+
+        # Clean up.
+        pool.clear()
+
+    def test_connection_pool_stale(self):
+        """Discard pooled connections closed by the server.
+        """
+        pool = top.HttpConnectionPool()
+        key = ('http', 'localhost', 80, None)
+
+        conn = self._r.connect('http', 'localhost', 80)
+        (conn.sock, server) = socket.socketpair()
+
+        pool.put(key, conn)
+        received = pool.get(key)
+        msg = 'Open idle connection should be reused'
+        self.assertEqual(received, conn, msg)
+
+        server.close()
+        pool.put(key, conn)
+        msg = 'Connection closed by the server should not be reused'
+        self.assertIsNone(pool.get(key), msg)
+
+        # Clean up.
+        conn.close()
+        pool.clear()
+
     @classmethod
     def tearDownClass(cls):
         cls._r = None
@@ -1,6 +1,7 @@
 import unittest2
 import os
 import socket
+from elementtree import ElementTree
 
 import top
 
@@ -229,6 +230,123 @@ class TestRestSmser(unittest2.TestCase):
         msg = 'SMS conversion for test error'
         self.assertEqual(received, expected, msg)
 
+    def test_merge_comms(self):
+        """Merge SMS XML messages into a single batch payload.
+        """
+        d = {'name': 'Auburn Newsagency',
+             'address': '119 Auburn Road',
+             'suburb': 'HAWTHORN EAST',
+             'postcode': '3123',
+             'connote_nbr': '1234567890_connote',
+             'item_nbr': '1234567890_item_nbr',
+             'phone_nbr': '0431602145'}
+        sms_1 = self._rsms.create_comms(data=dict(d), prod=self._hostname)
+        d['phone_nbr'] = '0431602146'
+        sms_2 = self._rsms.create_comms(data=dict(d), prod=self._hostname)
+
+        merged = self._rsms.merge_comms([sms_1, sms_2])
+        content = ElementTree.fromstring(merged)
+
+        received = [x.findtext('to') for x in content.findall('message')]
+        expected = ['0431602145', '0431602146']
+        msg = 'Merged SMS batch recipients error'
+        self.assertListEqual(received, expected, msg)
+
+        received = content.findtext('accountreference')
+        expected = 'EX0111642'
+        msg = 'Merged SMS batch account reference error'
+        self.assertEqual(received, expected, msg)
+
+    def test_parse_batch_response(self):
+        """Parse the SMS API batch response.
+        """
+        response = """<?xml version="1.0" encoding="utf-8"?>
+<messageheaders batchid="F8BF9867" xmlns="http://api.esendex.com/ns/">
+  <messageheader uri="https://api.esendex.com/v1.0/MessageHeaders/1" id="1"/>
+  <messageheader uri="https://api.esendex.com/v1.0/MessageHeaders/2" id="2"/>
+</messageheaders>"""
+        received = self._rsms.parse_batch_response(response)
+        expected = ['1', '2']
+        msg = 'SMS batch response message ids error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_parse_batch_response_invalid(self):
+        """Parse an invalid SMS API batch response.
+        """
+        received = self._rsms.parse_batch_response('banana')
+        msg = 'Invalid SMS batch response should return no message ids'
+        self.assertListEqual(received, [], msg)
+
+    def test_match_batch_response(self):
+        """Match the SMS API batch response to the messages sent.
+        """
+        d = {'name': 'Auburn Newsagency',
+             'address': '119 Auburn Road',
+             'suburb': 'HAWTHORN EAST',
+             'postcode': '3123',
+             'connote_nbr': '1234567890_connote',
+             'item_nbr': '1234567890_item_nbr',
+             'phone_nbr': '0431602145'}
+        messages = []
+        for phone_nbr in ['0431602145', '0431602146', '0431602147']:
+            d['phone_nbr'] = phone_nbr
+            messages.append(self._rsms.create_comms(data=dict(d),
+                                                    prod=self._hostname))
+
+        header = """  <messageheader id="%s">
+    <status>%s</status>
+    <to><phonenumber>%s</phonenumber></to>
+  </messageheader>"""
+        response = """<messageheaders xmlns="http://api.esendex.com/ns/">
+%s
+%s
+</messageheaders>""" % (header % ('1', 'Submitted', '61431602147'),
+                        header % ('2', 'Failed', '61431602145'))
+        received = self._rsms.match_batch_response(messages, response)
+        expected = [False, False, True]
+        msg = 'SMS batch response recipient match error'
+        self.assertListEqual(received, expected, msg)
+
+        header = '  <messageheader id="%s"/>'
+        response = """<messageheaders xmlns="http://api.esendex.com/ns/">
+%s
+%s
+</messageheaders>""" % (header % '1', header % '2')
+        received = self._rsms.match_batch_response(messages, response)
+        expected = [False, False, False]
+        msg = 'Unmatched SMS batch response should fail the batch'
+        self.assertListEqual(received, expected, msg)
+
+        received = self._rsms.match_batch_response(messages[:2], response)
+        expected = [True, True]
+        msg = 'Complete SMS batch response should accept the batch'
+        self.assertListEqual(received, expected, msg)
+
+    def test_send_batch(self):
+        """Send REST SMS batch.
+        """
+        dry = True
+
+        d = {'name': 'Auburn Newsagency',
+             'address': '119 Auburn Road',
+             'suburb': 'HAWTHORN EAST',
+             'postcode': '3123',
+             'connote_nbr': '1234567890_connote',
+             'item_nbr': '1234567890_item_nbr',
+             'phone_nbr': '0431602145'}
+        sms = self._rsms.create_comms(data=d, prod=self._hostname)
+
+        old_batch_size = self._rsms.batch_size
+        self._rsms.set_batch_size(2)
+        received = self._rsms.send_batch([sms, 'banana', sms, sms],
+                                         dry=dry)
+        expected = [True, False, True, True]
+        msg = 'SMS batch send statuses error'
+        self.assertListEqual(received, expected, msg)
+
+        # Clean up.
+        self._rsms.set_batch_size(old_batch_size)
+
     @classmethod
     def tearDownClass(cls):
         del cls._rsms
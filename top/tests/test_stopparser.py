@@ -85,6 +85,30 @@ class TestStopParser(unittest2.TestCase):
         # Cleanup.
         self._sp.set_in_files(old_in_files)
 
+    def test_set_item(self):
+        """Delivery index -- first connote/item occurrence is kept.
+        """
+        sp = top.StopParser()
+        sp.set_item('connote', 'item_1', None)
+        sp.set_item('connote', 'item_1', '20140206')
+        sp.set_item('connote', 'item_2', '20140207')
+
+        received = sp.connote_lookup('connote')
+        expected = {'item_1': None, 'item_2': '20140207'}
+        msg = 'Connote delivery index items not as expected'
+        self.assertDictEqual(received, expected, msg)
+
+        received = sp.connote_delivered('connote', 'item_1')
+        msg = 'Duplicate delivered item should not override first entry'
+        self.assertFalse(received, msg)
+
+        received = sp.connote_delivered('connote')
+        msg = 'Connote with a delivered item should be delivered'
+        self.assertTrue(received, msg)
+
+        # Clean up.
+        sp.purge()
+
     @classmethod
     def tearDownClass(cls):
         cls._sp = None
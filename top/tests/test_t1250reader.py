@@ -0,0 +1,93 @@
+import unittest2
+import tempfile
+import os
+
+import top
+from top.utils.files import remove_files
+
+
+class TestT1250Reader(unittest2.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._file = os.path.join('top',
+                                 'tests',
+                                 'files',
+                                 'T1250_TOLI_20130828202901.txt')
+        cls._r = top.T1250Reader(cls._file)
+
+    def test_init(self):
+        """Initialise a T1250Reader object.
+        """
+        msg = 'Object is not a top.T1250Reader'
+        self.assertIsInstance(self._r, top.T1250Reader, msg)
+
+    def test_check_eof(self):
+        """Check T1250 file EOF trailer.
+        """
+        msg = 'T1250 file should have an EOF trailer'
+        self.assertTrue(self._r.check_eof(), msg)
+
+    def test_check_eof_missing_trailer(self):
+        """Check T1250 file EOF trailer -- missing trailer.
+        """
+        fh = tempfile.NamedTemporaryFile(delete=False)
+        fh.write('record 1\r\nrecord 2\r\n')
+        fh.close()
+
+        reader = top.T1250Reader(fh.name)
+        msg = 'T1250 file without trailer should fail EOF check'
+        self.assertFalse(reader.check_eof(), msg)
+
+        msg = 'Records should be returned without a trailer'
+        self.assertTrue(reader.open(), msg)
+        received = list(reader.lines())
+        expected = ['record 1\r\n', 'record 2\r\n']
+        self.assertListEqual(received, expected, msg)
+
+        # Clean up.
+        reader.close()
+        remove_files(fh.name)
+
+    def test_check_eof_empty_file(self):
+        """Check T1250 file EOF trailer -- empty file.
+        """
+        fh = tempfile.NamedTemporaryFile()
+        reader = top.T1250Reader(fh.name)
+        msg = 'Empty T1250 file should fail EOF check'
+        self.assertFalse(reader.check_eof(), msg)
+
+        # Clean up.
+        fh.close()
+
+    def test_records(self):
+        """Read T1250 records.
+        """
+        self._r.open()
+
+        received = self._r.record_count()
+        expected = 6
+        msg = 'T1250 record count error'
+        self.assertEqual(received, expected, msg)
+
+        fh = open(self._file)
+        expected = fh.readlines()[:-1]
+        fh.close()
+        received = list(self._r.lines())
+        msg = 'T1250 records error'
+        self.assertListEqual(received, expected, msg)
+
+        # Resume from the second record.
+        (record, offset) = self._r.records().next()
+        received = list(self._r.lines(offset))
+        msg = 'T1250 records from offset error'
+        self.assertListEqual(received, expected[1:], msg)
+
+        # Clean up.
+        self._r.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._r = None
+        del cls._r
+        del cls._file
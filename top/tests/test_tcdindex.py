@@ -0,0 +1,137 @@
+import unittest2
+import tempfile
+import datetime
+import time
+import os
+
+import top
+from top.utils.files import remove_files
+
+
+class TestTcdIndex(unittest2.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._dir = tempfile.mkdtemp()
+        cls._db_file = os.path.join(cls._dir, 'tcd_index.db')
+
+        today = datetime.date.today().strftime('%Y%m%d')
+        rows = ['connote_1 20140101 item_1 %s' % today,
+                'connote_1 20140101 item_2',
+                'connote_2 20140101 item_1',
+                'connote_3 20140101',
+                'connote_4 20140101 item_1 20000101',
+                'connote_5 20140101 item_1 %s' % today]
+        cls._tcd_file = os.path.join(cls._dir,
+                                     'TCD_Deliveries_20140207111019.DAT')
+        f = open(cls._tcd_file, 'w')
+        f.write('\n'.join(rows) + '\n')
+        f.close()
+
+    def setUp(self):
+        self._index = top.TcdIndex(self._db_file)
+
+    def test_init(self):
+        """Initialise a TcdIndex object.
+        """
+        msg = 'Object is not a top.TcdIndex'
+        self.assertIsInstance(self._index, top.TcdIndex, msg)
+
+    def test_read(self):
+        """Index a TCD file.
+        """
+        self._index.set_in_files([self._tcd_file])
+        self._index.read()
+
+        msg = 'TCD file should be flagged as indexed'
+        self.assertTrue(self._index.indexed(self._tcd_file), msg)
+
+        received = self._index.size
+        expected = 2
+        msg = 'Delivered connote/items (expired pruned) count error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._index.connote_delivered('connote_1', 'item_1')
+        msg = 'Delivered connote/item should return True'
+        self.assertTrue(received, msg)
+
+        received = self._index.connote_delivered('connote_1', 'item_2')
+        msg = 'Undelivered connote/item should return False'
+        self.assertFalse(received, msg)
+
+        received = self._index.connote_delivered('connote_1')
+        msg = 'Connote with a delivered item should return True'
+        self.assertTrue(received, msg)
+
+        received = self._index.connote_delivered('connote_2')
+        msg = 'Undelivered connote should return False'
+        self.assertFalse(received, msg)
+
+        received = self._index.connote_delivered('connote_4', 'item_1')
+        msg = 'Expired delivered connote/item should return False'
+        self.assertFalse(received, msg)
+
+        received = self._index.connote_lookup('banana')
+        msg = 'Unknown connote should return None'
+        self.assertIsNone(received, msg)
+
+        # The index persists across instances (and purges).
+        self._index.purge()
+        index = top.TcdIndex(self._db_file)
+        received = index.connote_delivered('connote_1', 'item_1')
+        msg = 'Delivered connote/item should persist'
+        self.assertTrue(received, msg)
+
+        # Clean up.
+        index.purge()
+        remove_files(self._db_file)
+
+    def test_read_already_indexed(self):
+        """Index a TCD file -- file already indexed is not parsed.
+        """
+        self._index.set_in_files([self._tcd_file])
+        self._index.read()
+
+        self._index.connection.execute('DELETE FROM tcd_delivered')
+        self._index.read()
+
+        received = self._index.size
+        expected = 0
+        msg = 'Already indexed TCD file should not be re-parsed'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        self._index.purge()
+        remove_files(self._db_file)
+
+    def test_prune(self):
+        """Prune expired delivered connote/items.
+        """
+        self._index.set_in_files([self._tcd_file])
+        self._index.read()
+
+        received = self._index.prune(now=time.time() + 15 * 86400)
+        expected = 2
+        msg = 'Pruned connote/item count error'
+        self.assertEqual(received, expected, msg)
+
+        received = self._index.indexed(self._tcd_file)
+        msg = 'Expired TCD file record should be pruned'
+        self.assertFalse(received, msg)
+
+        # Clean up.
+        self._index.purge()
+        remove_files(self._db_file)
+
+    def tearDown(self):
+        self._index.purge()
+        self._index = None
+        del self._index
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_files(cls._tcd_file)
+        os.removedirs(cls._dir)
+        del cls._dir
+        del cls._db_file
+        del cls._tcd_file
@@ -0,0 +1,172 @@
+__all__ = [
+    "Cache",
+]
+import time
+import collections
+
+from top.utils.log import log
+
+
+class Cache(object):
+    """Size bounded key/value store with optional time-to-live expiry.
+
+    Entries are evicted in least recently used order once the store
+    holds :attr:`max_size` entries.  Recency is tracked in an access log
+    (:class:`collections.deque`) whose stale items are skipped at
+    eviction time and compacted once the log outgrows the store.
+
+    .. attribute:: max_size
+
+        maximum number of entries to hold (default 1024)
+
+    .. attribute:: ttl
+
+        time (seconds) that an entry remains valid.  ``None`` (default)
+        means that entries do not expire
+
+    .. attribute:: hits
+
+        number of successful :meth:`get` lookups
+
+    .. attribute:: misses
+
+        number of unsuccessful or expired :meth:`get` lookups
+
+    """
+    _max_size = 1024
+    _ttl = None
+
+    def __init__(self, max_size=None, ttl=None):
+        """:class:`top.utils.Cache` initialiser.
+        """
+        self._store = {}
+        self._order = collections.deque()
+        self._tick = 0
+        self._hits = 0
+        self._misses = 0
+
+        if max_size is not None:
+            self.set_max_size(max_size)
+
+        if ttl is not None:
+            self.set_ttl(ttl)
+
+    def __len__(self):
+        return len(self._store)
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def set_max_size(self, value):
+        self._max_size = value
+        log.debug('Cache max_size set to %d' % self.max_size)
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    def set_ttl(self, value):
+        self._ttl = value
+        log.debug('Cache ttl set to %s' % str(self.ttl))
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def get(self, key, default=None):
+        """Retrieve the value stored against *key*.
+
+        **Args:**
+            *key*: the cache key
+
+        **Kwargs:**
+            *default*: value to return if *key* is not cached or has
+            expired
+
+        **Returns:**
+            the cached value or *default*
+
+        """
+        value = default
+
+        entry = self._store.get(key)
+        if entry is not None:
+            (cached_value, timestamp) = entry[:2]
+            if self.ttl is not None and time.time() - timestamp > self.ttl:
+                del self._store[key]
+                entry = None
+            else:
+                self._touch(key, entry)
+                value = cached_value
+
+        if entry is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+
+        return value
+
+    def put(self, key, value):
+        """Store *value* against *key*, evicting the least recently used
+        entry if the cache is full.
+
+        **Args:**
+            *key*: the cache key
+
+            *value*: the value to cache
+
+        """
+        entry = [value, time.time(), None]
+        self._store[key] = entry
+        self._touch(key, entry)
+
+        while len(self._store) > self.max_size:
+            (tick, expired) = self._order.popleft()
+            expired_entry = self._store.get(expired)
+            if expired_entry is not None and expired_entry[2] == tick:
+                del self._store[expired]
+
+    def _touch(self, key, entry):
+        """Mark *key* as the most recently used entry.
+        """
+        self._tick += 1
+        entry[2] = self._tick
+        self._order.append((self._tick, key))
+
+        if len(self._order) > 2 * len(self._store) + 64:
+            live = [(x[2], k) for (k, x) in self._store.iteritems()]
+            live.sort()
+            self._order = collections.deque(live)
+
+    def invalidate(self, key=None):
+        """Remove *key* from the cache.  If *key* is ``None`` then all
+        entries are removed.
+
+        **Kwargs:**
+            *key*: the cache key
+
+        """
+        if key is None:
+            log.debug('Clearing %d cache entries' % len(self._store))
+            self._store.clear()
+            self._order.clear()
+        else:
+            self._store.pop(key, None)
+
+    def stats(self):
+        """Dump of the cache counters.
+
+        **Returns:**
+            string representation of the counters.  Similar construct
+            is::
+
+                size:2 hits:10 misses:2
+
+        """
+        return ('size:%d hits:%d misses:%d' %
+                (len(self._store), self.hits, self.misses))
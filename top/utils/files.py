@@ -1,20 +1,26 @@
 __all__ = [
     "create_dir",
     "get_directory_files",
+    "FileScanner",
     "get_directory_files_list",
     "check_eof_flag",
     "load_template",
     "remove_files",
+    "touch_file",
     "move_file",
     "copy_file",
     "check_filename",
     "gen_digest",
     "gen_digest_path",
     "xlsx_to_csv_converter",
+    "get_template",
+    "clear_template_cache",
     "templater",
+    "wrapped_templater",
 ]
 import os
 import re
+import stat
 import string
 import shutil
 import md5
@@ -24,6 +30,11 @@ import csv
 
 from top.utils.log import log
 
+# Process-wide cache of parsed templates.  Keyed by template path (or
+# tuple of paths for composed templates).  Values are tuples of the
+# form (<file signatures>, <string.Template>).
+TEMPLATE_CACHE = {}
+
 
 def create_dir(dir):
     """Helper method to manage the creation of a directory.
@@ -74,14 +85,17 @@ def get_directory_files(path, filter=None):
         each file in the directory as a generator
 
     """
+    r = None
+    if filter is not None:
+        r = re.compile(filter)
+
     try:
         for file in os.listdir(path):
             file = os.path.join(path, file)
             if os.path.isfile(file):
-                if filter is None:
+                if r is None:
                     yield file
                 else:
-                    r = re.compile(filter)
                     m = r.match(os.path.basename(file))
                     if m:
                         yield file
@@ -89,6 +103,165 @@ def get_directory_files(path, filter=None):
         log.error('Directory listing error for %s: %s' % (path, err))
 
 
+class FileScanner(object):
+    """Incremental directory scanner.
+
+    Remembers the ``(inode, size, mtime)`` signature of each file found
+    between scans and only re-validates files that are new or whose
+    signature has changed.  Filename filters are compiled once and the
+    filename match result is remembered for each directory entry.
+
+    .. attribute:: formats
+
+        list of :mod:`re` format strings to match filenames against.
+        An empty list matches all files
+
+    .. attribute:: validator
+
+        optional callable that takes the file path and returns ``True``
+        if the file is ready to be processed (for example,
+        :func:`check_eof_flag`).  The result is cached against the file
+        signature
+
+    """
+
+    def __init__(self, formats=None, validator=None):
+        """:class:`top.utils.files.FileScanner` initialiser.
+        """
+        self._formats = []
+        self._regexes = []
+        self._validator = None
+        self._names = {}
+        self._state = {}
+
+        if formats is not None:
+            self.set_formats(formats)
+
+        if validator is not None:
+            self.set_validator(validator)
+
+    @property
+    def formats(self):
+        return self._formats
+
+    def set_formats(self, values=None):
+        """Set the filename formats.  The formats are only recompiled
+        (and the scanner state reset) if *values* differ from the
+        current :attr:`formats`.
+
+        """
+        if values is None:
+            values = []
+
+        if list(values) != self._formats:
+            self._formats = list(values)
+            self._regexes = [re.compile(x) for x in self._formats]
+            self.reset()
+            log.debug('File scanner formats set to "%s"' % self._formats)
+
+    @property
+    def validator(self):
+        return self._validator
+
+    def set_validator(self, value=None):
+        if value != self._validator:
+            self._validator = value
+            self._state.clear()
+
+    def reset(self):
+        """Clear the cached filename matches and file signatures.
+        """
+        self._names.clear()
+        self._state.clear()
+
+    def match(self, name):
+        """Check *name* against the :attr:`formats`.  The result is
+        cached for subsequent scans.
+
+        **Args:**
+            *name*: the base filename
+
+        **Returns:**
+            boolean ``True`` if *name* matches one of the :attr:`formats`
+
+            boolean ``False`` otherwise
+
+        """
+        status = self._names.get(name)
+
+        if status is None:
+            status = not self._regexes
+            for r in self._regexes:
+                if r.match(name):
+                    status = True
+                    break
+            self._names[name] = status
+
+        return status
+
+    def scan(self, dirs):
+        """Search *dirs* for files that match :attr:`formats` and pass
+        the :attr:`validator`.
+
+        **Args:**
+            *dirs*: list of directories to search
+
+        **Returns:**
+            sorted list of the fully qualified file names found
+
+        """
+        files = []
+        names_seen = set()
+        files_seen = set()
+
+        for dir in dirs:
+            log.debug('Scanning for files at: %s ...' % dir)
+            try:
+                names = os.listdir(dir)
+            except (TypeError, OSError), err:
+                log.error('Directory listing error for %s: %s' % (dir, err))
+                continue
+
+            for name in names:
+                names_seen.add(name)
+                if not self.match(name):
+                    continue
+
+                file = os.path.join(dir, name)
+                try:
+                    st = os.stat(file)
+                except OSError, err:
+                    log.debug('File "%s" stat error: %s' % (file, err))
+                    continue
+
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+
+                files_seen.add(file)
+                signature = (st.st_ino, st.st_size, st.st_mtime)
+                cached = self._state.get(file)
+                if cached is not None and cached[0] == signature:
+                    valid = cached[1]
+                else:
+                    valid = True
+                    if self.validator is not None:
+                        valid = self.validator(file)
+                    self._state[file] = (signature, valid)
+
+                if valid:
+                    files.append(file)
+
+        # Forget the files that have gone away.
+        for name in set(self._names.keys()) - names_seen:
+            del self._names[name]
+        for file in set(self._state.keys()) - files_seen:
+            del self._state[file]
+
+        files.sort()
+
+        return files
+
+
 def check_eof_flag(file):
     """Checks if *file* is a standard T1250 file by verifying if the last
     line contains the string ``%%EOF``
@@ -248,17 +421,9 @@ def load_template(template, base_dir=None, **kwargs):
     query = None
     query_file = os.path.join(dir, template)
     log.debug('Extracting SQL from template: "%s"' % query_file)
-    f = None
-    try:
-        f = open(query_file)
-    except IOError, err:
-        log.error('Unable to open SQL template "%s": %s' %
-                    (query_file, err))
-
-    if f is not None:
-        query_t = f.read()
-        f.close()
-        query_s = string.Template(query_t)
+
+    query_s = get_template(query_file)
+    if query_s is not None:
         query = query_s.substitute(**kwargs)
 
         return query
@@ -294,6 +459,37 @@ def remove_files(files):
     return files_removed
 
 
+def touch_file(file):
+    """Create *file* if it does not exist and set its modified time
+    to the current time.
+
+    Checks if the *file* directory exists.  If not, will attempt to
+    create it first.
+
+    **Args:**
+        *file*: name of the file to touch
+
+    **Returns:**
+        boolean ``True`` if the touch was successful
+
+        boolean ``False`` otherwise
+
+    """
+    log.debug('Touching file "%s"' % file)
+    status = False
+
+    if create_dir(os.path.dirname(file)):
+        try:
+            fh = open(file, 'a')
+            fh.close()
+            os.utime(file, None)
+            status = True
+        except (OSError, IOError), err:
+            log.error('"%s" touch failed: %s' % (file, err))
+
+    return status
+
+
 def check_filename(file, format):
     """Parse filename string supplied by *file* and check that it
     conforms to *format*.
@@ -431,10 +627,117 @@ def xlsx_to_csv_converter(xlsx_file):
     return target_file
 
 
+def _template_signature(template_file):
+    stat_info = os.stat(template_file)
+
+    return (stat_info.st_mtime, stat_info.st_size)
+
+
+def get_template(template_file, wrapper_file=None, token='body'):
+    """Source the parsed :class:`string.Template` for *template_file*
+    from the process-wide template cache.
+
+    The template file is only read and parsed on first use or if its
+    modified time (or size) has changed since it was cached.
+
+    If *wrapper_file* is provided, the content of *template_file* is
+    pre-composed into the *token* placeholder of the *wrapper_file*
+    template.  For example, an email body within the main HTML
+    container.
+
+    **Args**:
+        *template_file*: full path to the template file
+
+    **Kwargs**:
+        *wrapper_file*: full path to the wrapper template file
+
+        *token*: the *wrapper_file* placeholder to replace with the
+        content of *template_file* (default ``body``)
+
+    **Returns**:
+        :class:`string.Template` object or ``None`` if a template file
+        could not be read
+
+    """
+    files = [template_file]
+    key = template_file
+    if wrapper_file is not None:
+        files.append(wrapper_file)
+        key = (template_file, wrapper_file, token)
+
+    try:
+        signature = tuple([_template_signature(x) for x in files])
+    except OSError, err:
+        log.error('Unable to source template file at "%s": %s' %
+                  (' | '.join(files), err))
+        TEMPLATE_CACHE.pop(key, None)
+        return None
+
+    cached = TEMPLATE_CACHE.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    contents = []
+    for file in files:
+        try:
+            f = open(file)
+            contents.append(f.read())
+            f.close()
+        except IOError, err:
+            log.error('Unable to source template file at "%s"' % file)
+            return None
+
+    content = contents[0]
+    if wrapper_file is not None:
+        body = content.rstrip('\n')
+
+        def compose(match):
+            # Only replace the token placeholder.  Everything else
+            # (including "$$" escapes) is left for substitution time.
+            name = match.group('named') or match.group('braced')
+            if name == token:
+                return body
+            return match.group(0)
+
+        content = string.Template.pattern.sub(compose, contents[1])
+
+    log.debug('Caching template: "%s"' % str(key))
+    template = string.Template(content)
+    TEMPLATE_CACHE[key] = (signature, template)
+
+    return template
+
+
+def clear_template_cache():
+    """Remove all templates from the process-wide template cache.
+    """
+    TEMPLATE_CACHE.clear()
+
+
+def _substitute(template, template_name, kwargs):
+    template_str = None
+    if template is not None:
+        try:
+            template_str = template.substitute(kwargs)
+        except KeyError, err:
+            log.error('Template "%s" substitute failed: %s' %
+                      (template_name, err))
+
+    if template_str is not None:
+        template_str = template_str.rstrip('\n')
+
+    log.debug('Template substitution (%s|%s) produced: "%s"' %
+              (template_name, str(kwargs), template_str))
+
+    return template_str
+
+
 def templater(template_file, **kwargs):
     """Attemptes to parse *template* file and substitute template
     parameters with *kwargs* construct.
 
+    Parsed templates are cached (see :func:`get_template`).
+
     **Args**:
         *template_file*: full path to the template file
 
@@ -460,27 +763,33 @@ def templater(template_file, **kwargs):
     """
     log.debug('Processing template: "%s"' % template_file)
 
-    t = None
-    try:
-        f = open(template_file)
-        t = f.read()
-        f.close()
-    except IOError, err:
-        log.error('Unable to source template file at "%s"' % template_file)
+    template = get_template(template_file)
 
-    template_str = None
-    if t is not None:
-        s = string.Template(t)
-        try:
-            template_str = s.substitute(kwargs)
-        except KeyError, err:
-            log.error('Template "%s" substitute failed: %s' %
-                      (template_file, err))
+    return _substitute(template, template_file, kwargs)
 
-    if template_str is not None:
-        template_str = template_str.rstrip('\n')
 
-    log.debug('Template substitution (%s|%s) produced: "%s"' %
-              (template_file, str(kwargs), template_str))
+def wrapped_templater(template_file, wrapper_file, **kwargs):
+    """Similar to :func:`templater` except that *template_file* is first
+    composed into the ``${body}`` placeholder of the *wrapper_file*
+    template.  Substitution is then performed once across the composed
+    template.
 
-    return template_str
+    **Args**:
+        *template_file*: full path to the template file
+
+        *wrapper_file*: full path to the wrapper template file
+
+        *kwargs*: dictionary structure of items expected by
+        *template_file*
+
+    **Returns**:
+        string representation of the composed template with parameters
+        substition or ``None`` if the process fails
+
+    """
+    log.debug('Processing template: "%s" (wrapper "%s")' %
+              (template_file, wrapper_file))
+
+    template = get_template(template_file, wrapper_file=wrapper_file)
+
+    return _substitute(template, template_file, kwargs)
@@ -0,0 +1,215 @@
+__all__ = [
+    "Inotify",
+]
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from top.utils.log import log
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+# struct inotify_event {int wd; uint32_t mask, cookie, len; char name[];}
+EVENT_HEADER = struct.Struct('iIII')
+EVENT_BUFFER_SIZE = 64 * 1024
+
+
+def load_libc():
+    """Load the C library that provides the Linux inotify system calls.
+
+    **Returns:**
+        the :mod:`ctypes` C library handle or ``None`` if inotify is not
+        supported on this platform
+
+    """
+    libc = None
+
+    if sys.platform.startswith('linux'):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                               use_errno=True)
+            for call in ['inotify_init1',
+                         'inotify_add_watch',
+                         'inotify_rm_watch']:
+                getattr(libc, call)
+        except (OSError, AttributeError), err:
+            log.warn('inotify not supported: %s' % err)
+            libc = None
+
+    return libc
+
+
+class Inotify(object):
+    """Minimal :mod:`ctypes` wrapper around the Linux inotify API.
+
+    Used to wake a daemon as soon as a file has been written to (or
+    moved into) one of the directories being watched rather than waiting
+    out a fixed polling interval.
+
+    .. attribute:: mask
+
+        inotify event mask to watch for (default ``IN_CLOSE_WRITE`` and
+        ``IN_MOVED_TO``)
+
+    .. attribute:: watches
+
+        dictionary of watch descriptors and the directory watched
+
+    """
+    _mask = IN_CLOSE_WRITE | IN_MOVED_TO
+    _libc = None
+    _fd = None
+
+    def __init__(self, mask=None):
+        """:class:`top.utils.Inotify` initialiser.
+        """
+        self._watches = {}
+
+        if mask is not None:
+            self._mask = mask
+
+    @property
+    def mask(self):
+        return self._mask
+
+    @property
+    def watches(self):
+        return self._watches
+
+    @property
+    def available(self):
+        return self._fd is not None
+
+    def open(self):
+        """Create the inotify instance.
+
+        **Returns:**
+            boolean ``True`` if inotify is available
+
+            boolean ``False`` otherwise
+
+        """
+        if self._fd is None:
+            if self._libc is None:
+                self._libc = load_libc()
+
+            if self._libc is not None:
+                fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+                if fd < 0:
+                    err = ctypes.get_errno()
+                    log.error('inotify init error: %s' % os.strerror(err))
+                else:
+                    self._fd = fd
+
+        return self.available
+
+    def close(self):
+        """Release the inotify instance and all of its watches.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._watches.clear()
+
+    def add_watch(self, path):
+        """Watch directory *path* for :attr:`mask` events.  Directories
+        that are already watched are ignored.
+
+        **Args:**
+            *path*: directory to watch
+
+        **Returns:**
+            boolean ``True`` if *path* is being watched
+
+            boolean ``False`` otherwise
+
+        """
+        status = False
+
+        if path in self._watches.values():
+            status = True
+        elif self.available:
+            wd = self._libc.inotify_add_watch(self._fd, path, self.mask)
+            if wd < 0:
+                err = ctypes.get_errno()
+                log.error('inotify watch error "%s": %s' %
+                          (path, os.strerror(err)))
+            else:
+                log.debug('inotify watching "%s"' % path)
+                self._watches[wd] = path
+                status = True
+
+        return status
+
+    def wait(self, timeout):
+        """Block until a watched event occurs or *timeout* expires.  If
+        inotify is not available then simply sleep for *timeout*.
+
+        **Args:**
+            *timeout*: time (seconds) to wait for an event
+
+        **Returns:**
+            list of the fully qualified file names that triggered an
+            event.  An empty list is returned if *timeout* expired
+
+        """
+        files = []
+
+        if not self.available or not self._watches:
+            time.sleep(timeout)
+        else:
+            try:
+                (ready, _, _) = select.select([self._fd], [], [], timeout)
+                if ready:
+                    files.extend(self.read_events())
+            except select.error, err:
+                # Interrupted by a signal (for example, SIGTERM).
+                if err.args[0] != errno.EINTR:
+                    raise
+
+        return files
+
+    def read_events(self):
+        """Drain and decode the pending inotify events.
+
+        **Returns:**
+            list of the fully qualified file names that triggered an
+            event
+
+        """
+        files = []
+
+        try:
+            data = os.read(self._fd, EVENT_BUFFER_SIZE)
+        except OSError, err:
+            if err.errno != errno.EAGAIN:
+                log.error('inotify read error: %s' % err)
+            data = ''
+
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            (wd, mask, cookie, length) = EVENT_HEADER.unpack_from(data,
+                                                                  offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip('\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                log.warn('inotify event queue overflow')
+            elif mask & IN_IGNORED:
+                # Watched directory has gone.  Re-added on the next wait.
+                self._watches.pop(wd, None)
+            elif wd in self._watches and name:
+                files.append(os.path.join(self._watches[wd], name))
+
+        return files
@@ -0,0 +1,222 @@
+__all__ = [
+    "Backoff",
+    "CircuitBreaker",
+]
+import time
+import random
+import threading
+
+from top.utils.log import log
+
+
+class Backoff(object):
+    """Exponential backoff with jitter.
+
+    The delay before retry *n* (starting at ``1``) is
+    ``delay * 2 ** (n - 1)`` capped at :attr:`max_delay`, less a random
+    fraction (up to :attr:`jitter`) of itself so that retries of events
+    that failed together are spread out.
+
+    .. attribute:: attempts
+
+        maximum number of attempts (including the first).  ``1``
+        disables retries
+
+    .. attribute:: delay
+
+        delay (seconds) before the first retry
+
+    .. attribute:: max_delay
+
+        upper bound (seconds) of the retry delay
+
+    .. attribute:: jitter
+
+        fraction (0 to 1) of the delay that is randomised
+
+    """
+    _attempts = 3
+    _delay = 60
+    _max_delay = 3600
+    _jitter = 0.5
+
+    def __init__(self, attempts=None, delay=None, max_delay=None,
+                 jitter=None):
+        """:class:`top.utils.retry.Backoff` initialiser.
+        """
+        if attempts is not None:
+            self._attempts = attempts
+        if delay is not None:
+            self._delay = delay
+        if max_delay is not None:
+            self._max_delay = max_delay
+        if jitter is not None:
+            self._jitter = jitter
+
+    @property
+    def attempts(self):
+        return self._attempts
+
+    @property
+    def delay(self):
+        return self._delay
+
+    @property
+    def max_delay(self):
+        return self._max_delay
+
+    @property
+    def jitter(self):
+        return self._jitter
+
+    def retry(self, attempt):
+        """Check if another attempt is allowed after *attempt* attempts.
+
+        **Args:**
+            *attempt*: the number of attempts made so far
+
+        **Returns:**
+            boolean ``True`` if another attempt can be made
+
+        """
+        return attempt < self.attempts
+
+    def wait(self, attempt):
+        """Delay before the retry that follows *attempt* attempts.
+
+        **Args:**
+            *attempt*: the number of attempts made so far
+
+        **Returns:**
+            delay in seconds
+
+        """
+        wait = min(self.max_delay, self.delay * 2 ** max(0, attempt - 1))
+        wait -= wait * self.jitter * random.random()
+
+        return wait
+
+
+class CircuitBreaker(object):
+    """Thread-safe circuit breaker.
+
+    After :attr:`threshold` consecutive failures the circuit *opens* and
+    :meth:`allow` refuses all requests for :attr:`reset_timeout`
+    seconds.  After that, a single trial request is allowed (the circuit
+    is *half-open*).  A trial success closes the circuit while a trial
+    failure opens it again.  A trial that records no outcome is given
+    up after another :attr:`reset_timeout`.
+
+    .. attribute:: name
+
+        identifier used in log messages
+
+    .. attribute:: threshold
+
+        consecutive failures that open the circuit.  ``0`` disables the
+        breaker
+
+    .. attribute:: reset_timeout
+
+        time (seconds) the circuit stays open
+
+    """
+    _name = None
+    _threshold = 5
+    _reset_timeout = 300
+
+    def __init__(self, name=None, threshold=None, reset_timeout=None):
+        """:class:`top.utils.retry.CircuitBreaker` initialiser.
+        """
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_ts = None
+        self._trial_ts = None
+
+        self._name = name
+        if threshold is not None:
+            self._threshold = threshold
+        if reset_timeout is not None:
+            self._reset_timeout = reset_timeout
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def threshold(self):
+        return self._threshold
+
+    def set_threshold(self, value):
+        self._threshold = value
+
+    @property
+    def reset_timeout(self):
+        return self._reset_timeout
+
+    def set_reset_timeout(self, value):
+        self._reset_timeout = value
+
+    @property
+    def state(self):
+        """Circuit state: ``closed``, ``open`` or ``half-open``.
+        """
+        state = 'closed'
+        if self._opened_ts is not None:
+            state = 'open'
+            if time.time() - self._opened_ts >= self.reset_timeout:
+                state = 'half-open'
+
+        return state
+
+    def allow(self):
+        """Check if a request can be made.
+
+        **Returns:**
+            boolean ``True`` if the circuit is closed (or this is the
+            half-open trial request)
+
+        """
+        self._lock.acquire()
+        try:
+            allow = True
+            state = self.state
+            if state == 'open':
+                allow = False
+            elif state == 'half-open':
+                now = time.time()
+                allow = (self._trial_ts is None or
+                         now - self._trial_ts >= self.reset_timeout)
+                if allow:
+                    self._trial_ts = now
+        finally:
+            self._lock.release()
+
+        return allow
+
+    def record(self, success):
+        """Record the outcome of a request.
+
+        **Args:**
+            *success*: boolean ``True`` if the request succeeded
+        """
+        self._lock.acquire()
+        try:
+            self._trial_ts = None
+            if success:
+                if self._opened_ts is not None:
+                    log.info('Circuit "%s" closed' % self.name)
+                self._failures = 0
+                self._opened_ts = None
+            else:
+                self._failures += 1
+                if (self.threshold and
+                    (self._opened_ts is not None or
+                     self._failures >= self.threshold)):
+                    log.warn('Circuit "%s" open for %d (sec) after %d '
+                             'failures' % (self.name,
+                                           self.reset_timeout,
+                                           self._failures))
+                    self._opened_ts = time.time()
+        finally:
+            self._lock.release()
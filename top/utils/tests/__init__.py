@@ -1,3 +1,7 @@
 from test_files import TestFiles
 from test_utils import TestUtils
 from test_setter import TestSetter
+from test_cache import TestCache
+from test_inotify import TestInotify
+from test_throttle import TestTokenBucket
+from test_retry import TestRetry
@@ -0,0 +1,92 @@
+import unittest2
+import time
+
+from top.utils.cache import Cache
+
+
+class TestCache(unittest2.TestCase):
+
+    def test_init(self):
+        """Initialise a Cache object.
+        """
+        cache = Cache()
+        msg = 'Object is not a top.utils.cache.Cache'
+        self.assertIsInstance(cache, Cache, msg)
+
+    def test_get_put(self):
+        """Cache put and get with hit/miss counters.
+        """
+        cache = Cache()
+        msg = 'Missing key should return default'
+        self.assertIsNone(cache.get('N031'), msg)
+
+        cache.put('N031', 1)
+        received = cache.get('N031')
+        expected = 1
+        msg = 'Cached value error'
+        self.assertEqual(received, expected, msg)
+
+        received = (cache.hits, cache.misses)
+        expected = (1, 1)
+        msg = 'Cache hit/miss counter error'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_max_size_eviction(self):
+        """Cache evicts least recently used entry when full.
+        """
+        cache = Cache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        msg = 'Least recently used entry should be evicted'
+        self.assertIsNone(cache.get('b'), msg)
+        msg = 'Recently used entry should be retained'
+        self.assertEqual(cache.get('a'), 1, msg)
+
+    def test_max_size_eviction_repeated_access(self):
+        """Cache eviction order after repeated access of the same entry.
+        """
+        cache = Cache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        for i in range(200):
+            cache.get('a')
+        cache.put('b', 3)
+        cache.put('c', 4)
+
+        msg = 'Least recently used entry should be evicted'
+        self.assertIsNone(cache.get('a'), msg)
+
+        received = (cache.get('b'), cache.get('c'), len(cache))
+        expected = (3, 4, 2)
+        msg = 'Recently used entries should be retained'
+        self.assertTupleEqual(received, expected, msg)
+
+    def test_ttl_expiry(self):
+        """Cache entries expire after ttl.
+        """
+        cache = Cache(ttl=0)
+        cache.put('a', 1)
+        time.sleep(0.01)
+
+        msg = 'Expired entry should return default'
+        self.assertIsNone(cache.get('a'), msg)
+
+    def test_invalidate(self):
+        """Cache invalidation.
+        """
+        cache = Cache()
+        cache.put('a', 1)
+        cache.put('b', 2)
+
+        cache.invalidate('a')
+        msg = 'Invalidated key should be removed'
+        self.assertIsNone(cache.get('a'), msg)
+
+        cache.invalidate()
+        received = len(cache)
+        expected = 0
+        msg = 'Cache clear error'
+        self.assertEqual(received, expected, msg)
@@ -6,12 +6,16 @@ from top.utils.files import (load_template,
                              get_directory_files,
                              get_directory_files_list,
                              remove_files,
+                             touch_file,
                              check_filename,
                              gen_digest,
                              copy_file,
                              gen_digest_path,
                              xlsx_to_csv_converter,
-                             templater)
+                             templater,
+                             wrapped_templater,
+                             get_template,
+                             FileScanner)
 
 
 class TestFiles(unittest2.TestCase):
@@ -171,6 +175,79 @@ class TestFiles(unittest2.TestCase):
         remove_files(target)
         source_fh.close()
 
+    def test_touch_file(self):
+        """Touch a file.
+        """
+        dir = tempfile.mkdtemp()
+        target = os.path.join(dir, 'stamp', 'agent.stamp')
+
+        msg = 'Touch of a new file should succeed'
+        self.assertTrue(touch_file(target), msg)
+        msg = 'Touched file should exist'
+        self.assertTrue(os.path.exists(target), msg)
+
+        # Clean up.
+        remove_files(target)
+        os.removedirs(os.path.dirname(target))
+
+    def test_file_scanner(self):
+        """Incremental directory scan.
+        """
+        dir = tempfile.mkdtemp()
+        validated = []
+
+        def validator(file):
+            validated.append(file)
+            return open(file).read().endswith('%%EOF')
+
+        scanner = FileScanner(formats=['T1250_TOL[IPF]_\d{14}\.dat'],
+                              validator=validator)
+
+        complete = os.path.join(dir, 'T1250_TOLI_20131011115618.dat')
+        f = open(complete, 'w')
+        f.write('%%EOF')
+        f.close()
+        partial = os.path.join(dir, 'T1250_TOLP_20131011115618.dat')
+        f = open(partial, 'w')
+        f.close()
+        other = os.path.join(dir, 'T1250_TOLI_20131011115618.txt')
+        f = open(other, 'w')
+        f.close()
+
+        received = scanner.scan([dir])
+        expected = [complete]
+        msg = 'Initial scan file list error'
+        self.assertListEqual(received, expected, msg)
+
+        received = sorted(validated)
+        expected = [complete, partial]
+        msg = 'Initial scan should validate matching files only'
+        self.assertListEqual(received, expected, msg)
+
+        # Unchanged files are not re-validated.
+        del validated[:]
+        received = scanner.scan([dir])
+        expected = [complete]
+        msg = 'Repeat scan file list error'
+        self.assertListEqual(received, expected, msg)
+        msg = 'Repeat scan should not re-validate unchanged files'
+        self.assertListEqual(validated, [], msg)
+
+        # Completing the partial file triggers re-validation.
+        f = open(partial, 'a')
+        f.write('%%EOF')
+        f.close()
+        received = scanner.scan([dir])
+        expected = [complete, partial]
+        msg = 'Changed file scan file list error'
+        self.assertListEqual(received, expected, msg)
+        msg = 'Changed file should be re-validated'
+        self.assertListEqual(validated, [partial], msg)
+
+        # Clean up.
+        remove_files([complete, partial, other])
+        os.removedirs(dir)
+
     def test_xlsx_to_csv_converter(self):
         """Convert a xlsx file to csv.
         """
@@ -286,3 +363,61 @@ class TestFiles(unittest2.TestCase):
         received = templater(path_to_template_file, **d)
         msg = 'Template string error -- incomplete data'
         self.assertIsNone(received, msg)
+
+    def test_templater_cache(self):
+        """Cached template is refreshed when the template file changes.
+        """
+        template_dir = tempfile.mkdtemp()
+        path_to_template_file = os.path.join(template_dir, 'test.t')
+        fh = open(path_to_template_file, 'w')
+        fh.write('Hello ${name}\n')
+        fh.close()
+
+        received = templater(path_to_template_file, name='Auburn')
+        expected = 'Hello Auburn'
+        msg = 'Template string error -- initial load'
+        self.assertEqual(received, expected, msg)
+
+        received = get_template(path_to_template_file)
+        expected = get_template(path_to_template_file)
+        msg = 'Unchanged template should be sourced from the cache'
+        self.assertIs(received, expected, msg)
+
+        fh = open(path_to_template_file, 'w')
+        fh.write('Goodbye ${name}\n')
+        fh.close()
+        mtime = os.stat(path_to_template_file).st_mtime + 10
+        os.utime(path_to_template_file, (mtime, mtime))
+
+        received = templater(path_to_template_file, name='Auburn')
+        expected = 'Goodbye Auburn'
+        msg = 'Template string error -- template file changed'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        remove_files(path_to_template_file)
+        os.rmdir(template_dir)
+
+    def test_wrapped_templater(self):
+        """Parse and substitute body template composed into a wrapper.
+        """
+        template_dir = tempfile.mkdtemp()
+        path_to_template_file = os.path.join(template_dir, 'body.t')
+        fh = open(path_to_template_file, 'w')
+        fh.write('<p>${name} $$5</p>\n')
+        fh.close()
+        path_to_wrapper_file = os.path.join(template_dir, 'main.t')
+        fh = open(path_to_wrapper_file, 'w')
+        fh.write('<html>$$${body}</html>\n')
+        fh.close()
+
+        received = wrapped_templater(path_to_template_file,
+                                     path_to_wrapper_file,
+                                     name='Auburn')
+        expected = '<html>$<p>Auburn $5</p></html>'
+        msg = 'Wrapped template string error'
+        self.assertEqual(received, expected, msg)
+
+        # Clean up.
+        remove_files([path_to_template_file, path_to_wrapper_file])
+        os.rmdir(template_dir)
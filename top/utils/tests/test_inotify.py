@@ -0,0 +1,58 @@
+import unittest2
+import tempfile
+import os
+import sys
+
+from top.utils.inotify import Inotify
+from top.utils.files import remove_files
+
+
+class TestInotify(unittest2.TestCase):
+
+    def test_init(self):
+        """Initialise an Inotify object.
+        """
+        watcher = Inotify()
+        msg = 'Object is not a top.utils.inotify.Inotify'
+        self.assertIsInstance(watcher, Inotify, msg)
+
+    @unittest2.skipUnless(sys.platform.startswith('linux'), 'Linux only')
+    def test_wait_close_write(self):
+        """Wait wakes on a file written to a watched directory.
+        """
+        dir = tempfile.mkdtemp()
+        watcher = Inotify()
+        watcher.open()
+
+        msg = 'Directory watch should succeed'
+        self.assertTrue(watcher.add_watch(dir), msg)
+
+        received = watcher.wait(0)
+        expected = []
+        msg = 'Wait with no events should return an empty list'
+        self.assertListEqual(received, expected, msg)
+
+        file = os.path.join(dir, 'T1250_TOLI_20131011115618.txt')
+        f = open(file, 'w')
+        f.write('%%EOF')
+        f.close()
+
+        received = watcher.wait(5)
+        expected = [file]
+        msg = 'Wait on close write event error'
+        self.assertListEqual(received, expected, msg)
+
+        # Clean up.
+        watcher.close()
+        remove_files(file)
+        os.removedirs(dir)
+
+    def test_wait_not_available(self):
+        """Wait falls back to sleep when inotify is not open.
+        """
+        watcher = Inotify()
+
+        received = watcher.wait(0)
+        expected = []
+        msg = 'Fallback wait should return an empty list'
+        self.assertListEqual(received, expected, msg)
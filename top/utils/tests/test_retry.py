@@ -0,0 +1,75 @@
+import unittest2
+import time
+
+from top.utils.retry import (Backoff,
+                             CircuitBreaker)
+
+
+class TestRetry(unittest2.TestCase):
+
+    def test_backoff(self):
+        """Exponential backoff delays are capped and jittered.
+        """
+        backoff = Backoff(attempts=4, delay=10, max_delay=30, jitter=0.5)
+
+        received = [backoff.retry(x) for x in range(1, 6)]
+        expected = [True, True, True, False, False]
+        msg = 'Backoff retry attempts error'
+        self.assertListEqual(received, expected, msg)
+
+        for attempt, upper in [(1, 10), (2, 20), (3, 30), (4, 30)]:
+            received = backoff.wait(attempt)
+            msg = 'Backoff wait after attempt %d out of range' % attempt
+            self.assertLessEqual(received, upper, msg)
+            self.assertGreaterEqual(received, upper * 0.5, msg)
+
+    def test_backoff_no_jitter(self):
+        """Exponential backoff without jitter.
+        """
+        backoff = Backoff(delay=10, max_delay=3600, jitter=0)
+
+        received = [backoff.wait(x) for x in range(1, 5)]
+        expected = [10, 20, 40, 80]
+        msg = 'Backoff wait without jitter error'
+        self.assertListEqual(received, expected, msg)
+
+    def test_circuit_breaker(self):
+        """Circuit breaker opens, half-opens and closes.
+        """
+        breaker = CircuitBreaker('test', threshold=2, reset_timeout=0.1)
+
+        breaker.record(False)
+        msg = 'Circuit should be closed under the failure threshold'
+        self.assertTrue(breaker.allow(), msg)
+
+        breaker.record(False)
+        msg = 'Circuit should be open at the failure threshold'
+        self.assertEqual(breaker.state, 'open', msg)
+        self.assertFalse(breaker.allow(), msg)
+
+        time.sleep(0.1)
+        msg = 'Half-open circuit should allow a single trial'
+        self.assertEqual(breaker.state, 'half-open', msg)
+        self.assertTrue(breaker.allow(), msg)
+        self.assertFalse(breaker.allow(), msg)
+
+        breaker.record(False)
+        msg = 'Failed trial should open the circuit'
+        self.assertEqual(breaker.state, 'open', msg)
+
+        time.sleep(0.1)
+        breaker.allow()
+        breaker.record(True)
+        msg = 'Successful trial should close the circuit'
+        self.assertEqual(breaker.state, 'closed', msg)
+        self.assertTrue(breaker.allow(), msg)
+
+    def test_circuit_breaker_disabled(self):
+        """Circuit breaker with no threshold never opens.
+        """
+        breaker = CircuitBreaker('test', threshold=0)
+        for i in range(10):
+            breaker.record(False)
+
+        msg = 'Disabled circuit breaker should never open'
+        self.assertTrue(breaker.allow(), msg)
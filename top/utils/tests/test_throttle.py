@@ -0,0 +1,56 @@
+import unittest2
+import time
+
+from top.utils.throttle import TokenBucket
+
+
+class TestTokenBucket(unittest2.TestCase):
+
+    def test_init(self):
+        """Initialise a TokenBucket object.
+        """
+        bucket = TokenBucket()
+        msg = 'Object is not a top.utils.throttle.TokenBucket'
+        self.assertIsInstance(bucket, TokenBucket, msg)
+
+    def test_unlimited(self):
+        """Unlimited bucket never waits.
+        """
+        bucket = TokenBucket()
+
+        received = [bucket.try_acquire() for i in range(100)]
+        expected = [0] * 100
+        msg = 'Unlimited bucket should not wait'
+        self.assertListEqual(received, expected, msg)
+
+    def test_rate_limit(self):
+        """Bucket limits to the token rate once the burst is spent.
+        """
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        msg = 'Burst tokens should be available immediately'
+        self.assertEqual(bucket.try_acquire(), 0, msg)
+        self.assertEqual(bucket.try_acquire(), 0, msg)
+
+        msg = 'Empty bucket should return a wait time'
+        self.assertGreater(bucket.try_acquire(), 0, msg)
+
+        start = time.time()
+        bucket.acquire()
+        msg = 'Blocking acquire should wait for a token'
+        self.assertGreater(time.time() - start, 0.05, msg)
+
+    def test_acquire_over_capacity(self):
+        """Request more tokens than the bucket can hold.
+        """
+        bucket = TokenBucket(rate=5)
+
+        start = time.time()
+        bucket.acquire(50)
+        msg = 'Full bucket should serve an over capacity request'
+        self.assertLess(time.time() - start, 1, msg)
+
+        received = bucket.try_acquire()
+        msg = 'Over capacity request should be repaid at the rate'
+        self.assertGreater(received, 9, msg)
+        self.assertLess(received, 9.5, msg)
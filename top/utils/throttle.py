@@ -0,0 +1,112 @@
+__all__ = [
+    "TokenBucket",
+]
+import time
+import threading
+
+from top.utils.log import log
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket rate limiter.
+
+    Tokens are added to the bucket at :attr:`rate` tokens per second up
+    to a maximum of :attr:`capacity`.  Each :meth:`acquire` removes a
+    token, blocking until one is available.
+
+    A request for more tokens than :attr:`capacity` can never be met
+    from the bucket alone.  It waits until the bucket is full and then
+    puts the bucket into debt, which later requests repay at
+    :attr:`rate` before they are served.
+
+    .. attribute:: rate
+
+        tokens added per second.  ``0`` or ``None`` disables the rate
+        limit
+
+    .. attribute:: capacity
+
+        maximum number of tokens held (the allowable burst).  Defaults
+        to :attr:`rate` (one second worth of tokens)
+
+    """
+    _rate = None
+    _capacity = None
+
+    def __init__(self, rate=None, capacity=None):
+        """:class:`top.utils.throttle.TokenBucket` initialiser.
+        """
+        self._lock = threading.Lock()
+
+        if rate:
+            self._rate = float(rate)
+            if capacity is None:
+                capacity = max(1.0, self._rate)
+            self._capacity = float(capacity)
+
+        self._tokens = self._capacity
+        self._timestamp = time.time()
+
+    @property
+    def rate(self):
+        return self._rate
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def _refill(self):
+        now = time.time()
+        elapsed = now - self._timestamp
+        self._timestamp = now
+        self._tokens = min(self.capacity,
+                           self._tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens=1):
+        """Remove *tokens* from the bucket without blocking.
+
+        **Kwargs:**
+            *tokens*: number of tokens to take (default 1)
+
+        **Returns:**
+            ``0`` if the tokens were taken.  Otherwise, the time
+            (seconds) until the tokens will be available
+
+        """
+        wait = 0
+
+        if self.rate is not None:
+            self._lock.acquire()
+            try:
+                self._refill()
+                needed = min(tokens, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                else:
+                    wait = (needed - self._tokens) / self.rate
+            finally:
+                self._lock.release()
+
+        return wait
+
+    def acquire(self, tokens=1):
+        """Remove *tokens* from the bucket, blocking until they are
+        available.
+
+        **Kwargs:**
+            *tokens*: number of tokens to take (default 1)
+
+        **Returns:**
+            total time (seconds) spent waiting
+
+        """
+        waited = 0.0
+
+        wait = self.try_acquire(tokens)
+        while wait:
+            log.debug('Rate limited -- waiting %.3f (sec)' % wait)
+            time.sleep(wait)
+            waited += wait
+            wait = self.try_acquire(tokens)
+
+        return waited